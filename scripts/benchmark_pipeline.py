@@ -0,0 +1,130 @@
+"""Benchmark the camera pipeline with the synthetic cameras, no camera
+hardware is needed. Frames go through the whole chain: capture -> debayer
+-> preview downscale -> video encoder, the camera metrics are printed.
+
+Usage:
+    python scripts/benchmark_pipeline.py [--cameras N] [--fps FPS] [--seconds S]
+        [--width W] [--height H] [--jitter-ms MS] [--incomplete RATE]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2  # noqa: E402
+from PySide6.QtCore import QCoreApplication  # noqa: E402
+from src.app.config import (  # noqa: E402
+    CAMERA_PROCESSING,
+    MINI_FRAME_SIZE,
+    VIDEO_FPS,
+    VIDEO_RESOLUTION,
+)
+from src.cameras.camera_handler import CameraHandler  # noqa: E402
+from src.cameras.frame_dispatch import QueueConfig, QueuePolicy  # noqa: E402
+from src.cameras.frame_handlers import BasicFrameHandler, VideoWriter  # noqa: E402
+from src.cameras.synthetic_vmb import (  # noqa: E402
+    SyntheticConfig,
+    SyntheticVmbSystem,
+)
+
+
+class PreviewProbe(BasicFrameHandler):
+    """Preview without the window, the frame is downscaled like in FrameDisplay"""
+
+    QUEUE = QueueConfig(1, QueuePolicy.DROP_OLDEST)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._running = False
+
+    def start(self) -> None:
+        self._running = True
+        super().start()
+
+    def stop(self) -> None:
+        self._running = False
+        super().stop()
+
+    def add_frame(self, frame, info=None) -> None:
+        start_ns = time.monotonic_ns()
+        cv2.resize(frame, MINI_FRAME_SIZE, interpolation=cv2.INTER_AREA)
+
+        if self._metrics and info:
+            done_ns = time.monotonic_ns()
+            self._metrics.record_time("display_time", done_ns - start_ns)
+            self._metrics.record_latency("exposure_to_display", info.timestamp, done_ns)
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Camera pipeline benchmark")
+    parser.add_argument("--cameras", type=int, default=4, help="number of cameras")
+    parser.add_argument("--fps", type=float, default=30, help="camera fps")
+    parser.add_argument("--seconds", type=float, default=10, help="duration")
+    parser.add_argument("--width", type=int, default=1936, help="sensor width")
+    parser.add_argument("--height", type=int, default=1216, help="sensor height")
+    parser.add_argument("--jitter-ms", type=float, default=1, help="period jitter")
+    parser.add_argument(
+        "--incomplete", type=float, default=0.0, help="incomplete frames rate"
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    app = QCoreApplication(sys.argv)  # noqa: F841, needed by the Qt threads
+    config = SyntheticConfig(
+        [f"SYNTHETIC_{index}" for index in range(args.cameras)],
+        args.width,
+        args.height,
+        args.fps,
+        args.jitter_ms,
+        args.incomplete,
+    )
+
+    with tempfile.TemporaryDirectory() as out_dir, SyntheticVmbSystem(config) as vmb:
+        handlers = []
+        for camera in vmb.get_all_cameras():
+            handler = CameraHandler(camera)
+            handler.set_processing_config(CAMERA_PROCESSING)
+            writer = VideoWriter(
+                camera.get_id(),
+                VIDEO_FPS,
+                VIDEO_RESOLUTION,
+                out_dir,
+                CAMERA_PROCESSING.color,
+            )
+            writer.prepare()
+            preview = PreviewProbe()
+            handler.register_frame_handler(writer)
+            handler.register_frame_handler(preview)
+            handlers.append((handler, writer, preview))
+
+        for handler, writer, preview in handlers:
+            handler.start()
+            writer.start()
+            preview.start()
+
+        time.sleep(args.seconds)
+
+        for handler, writer, preview in handlers:
+            writer.stop()
+            preview.stop()
+            handler.quit()
+            writer.shutdown()
+
+    for handler, _, _ in handlers:
+        print(json.dumps(handler.metrics.snapshot(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Encode the raw camera recording to a video file.
+
+Usage:
+    python scripts/encode_raw.py <recording_folder> [--fps FPS]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.cameras.raw_frames import encode_raw_recording  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Encode the raw camera recording")
+    parser.add_argument("folder", help="raw recording folder")
+    parser.add_argument(
+        "--fps",
+        type=float,
+        default=None,
+        help="video fps, estimated from the camera timestamps by default",
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # the processing stored in the raw chunks is used
+    videos = encode_raw_recording(args.folder, args.fps)
+
+    for video in videos:
+        print(f"--> {video}")
+
+
+if __name__ == "__main__":
+    main()
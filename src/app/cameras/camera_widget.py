@@ -1,7 +1,15 @@
 from PySide6.QtWidgets import QLabel, QPushButton, QHBoxLayout
-from src.cameras.frame_handlers import BasicFrameHandler, FrameDisplay, VideoWriter
+from src.cameras.frame_handlers import (
+    BasicFrameHandler,
+    FrameDisplay,
+    VideoWriter,
+    RawFrameWriter,
+    SyncTap,
+)
 from src.app.cameras.camera_widget_utils import CameraStatus, STATUS_TO_COLOR
 from src.cameras.q_camera import QCamera
+from src.cameras.camera_handler import CameraState
+from src.cameras.frame_processing import ProcessingConfig
 from typing import override
 
 DISPLAY_BUTTON_OPEN = "Open"
@@ -15,6 +23,7 @@ class QCameraWidget(QCamera):
 
     HANDLER_DISPLAY = 0
     HANDLER_WRITER = 1
+    HANDLER_SYNC = 2  # optional, frames passed to the FrameSyncGroup
     HANDLER_UNKNOWN = 99
 
     def __init__(
@@ -23,6 +32,7 @@ class QCameraWidget(QCamera):
         id: str,
         handlers: list[BasicFrameHandler],
         camera_config_file: str = None,
+        processing_config: ProcessingConfig = None,
     ) -> None:
         """Constructor
 
@@ -31,9 +41,11 @@ class QCameraWidget(QCamera):
             id (str): camera id
             handlers (list[BasicFrameHandler]): list of handlers
             camera_config_file (str, optional): camera config file. Defaults to None.
+            processing_config (ProcessingConfig, optional): frame processing.
+            Defaults to None.
         """
         # The handlers will be loaded later, so we pass None
-        super().__init__(name, id, None, camera_config_file)
+        super().__init__(name, id, None, camera_config_file, processing_config)
 
         self._load_handlers(handlers)
         self._connect_to_frame_display_signals()
@@ -60,8 +72,10 @@ class QCameraWidget(QCamera):
         for handler in handlers:
             if isinstance(handler, FrameDisplay):
                 self._handlers[self.HANDLER_DISPLAY] = handler
-            elif isinstance(handler, VideoWriter):
+            elif isinstance(handler, (VideoWriter, RawFrameWriter)):
                 self._handlers[self.HANDLER_WRITER] = handler
+            elif isinstance(handler, SyncTap):
+                self._handlers[self.HANDLER_SYNC] = handler
             else:
                 raise ValueError(f"Unknown handler type: {handler}")
 
@@ -89,6 +103,7 @@ class QCameraWidget(QCamera):
         """
         self.name_label = QLabel(f"{self.name}:")
         self.status_label = QLabel()
+        self.metrics_label = QLabel()
 
         self.display_button = QPushButton(DISPLAY_BUTTON_OPEN)
         self.display_button.clicked.connect(self._on_open_button_clicked)
@@ -99,6 +114,7 @@ class QCameraWidget(QCamera):
         self.layout = QHBoxLayout()
         self.layout.addWidget(self.name_label)
         self.layout.addWidget(self.status_label)
+        self.layout.addWidget(self.metrics_label)
         self.layout.addWidget(self.display_button)
         self.layout.addWidget(self.write_button)
 
@@ -130,7 +146,11 @@ class QCameraWidget(QCamera):
 
     def _update_gui(self, status: CameraStatus):
         """Update the GUI elements"""
-        if (status == CameraStatus.MISSING) or (status == CameraStatus.NOT_INITIALIZED):
+        if status in (
+            CameraStatus.MISSING,
+            CameraStatus.NOT_INITIALIZED,
+            CameraStatus.ERROR,
+        ):
             self.display_button.setText(DISPLAY_BUTTON_OPEN)
             self.display_button.setEnabled(False)
             self.write_button.setEnabled(False)
@@ -150,6 +170,11 @@ class QCameraWidget(QCamera):
 
             self._previous_status = status
 
+        if self._metrics is not None and self._detected:
+            self.metrics_label.setText(self._metrics.status_text())
+        else:
+            self.metrics_label.clear()
+
     def get_str_status(self) -> str:
         """Get the status of the camera widget.
 
@@ -160,6 +185,8 @@ class QCameraWidget(QCamera):
 
         if not self._detected:
             status = CameraStatus.MISSING
+        elif self._camera_state == CameraState.ERROR:
+            status = CameraStatus.ERROR
         elif (
             handlers_states[self.HANDLER_DISPLAY]
             and handlers_states[self.HANDLER_WRITER]
@@ -12,9 +12,17 @@ class CameraStatus(Enum):
     WRITING_AND_DISPLAYING = "Writing and Displaying"
     # DETECTED = "Detected"
     NOT_INITIALIZED = "Initializing ..."
+    ERROR = "Error"
     UNKNOWN = "Unknown"
 
 
+class RecordingMode(Enum):
+    """Camera recording mode"""
+
+    VIDEO = "video"  # processed frames encoded during the recording
+    RAW = "raw"  # raw frames written to the chunk files, encoded afterwards
+
+
 STATUS_TO_COLOR = {
     CameraStatus.MISSING: "#FF204E",
     CameraStatus.RUNNING: "#9BEC00",
@@ -22,6 +30,7 @@ STATUS_TO_COLOR = {
     CameraStatus.WRITING: "#AF47D2",
     CameraStatus.WRITING_AND_DISPLAYING: "#B8B5FF",
     CameraStatus.NOT_INITIALIZED: "#A3D8FF",
+    CameraStatus.ERROR: "#FF8F00",
     CameraStatus.UNKNOWN: "#F6FA70",
 }
 
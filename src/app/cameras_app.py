@@ -1,18 +1,48 @@
+from PySide6.QtCore import QTimer, Slot
+from PySide6.QtWidgets import QPushButton
 from src.app.cameras.camera_widget import QCameraWidget
 from src.cameras.q_cameras_menager import QCamerasManager
-from src.cameras.frame_handlers import FrameDisplay, VideoWriter
+from src.cameras.frame_handlers import (
+    FrameDisplay,
+    VideoWriter,
+    RawFrameWriter,
+    FrameSyncGroup,
+    SyncTap,
+)
+from src.cameras.frame_processing import ColorMode
+from src.cameras.camera_features import CaptureMode, CaptureProfile
+from src.app.cameras.camera_widget_utils import RecordingMode
+from src.cameras.camera_handler import logger
 from src.app.config import (
     OCTOPUS_CAM_WIN,
     MACKI_LOGO_PATH,
     DEFAULT_FRAME_SIZE,
     MINI_FRAME_SIZE,
     FRAME_FORMAT,
+    PREVIEW_FPS,
     VIDEO_FPS,
     VIDEO_RESOLUTION,
     VIDEO_DIR,
+    VIDEO_SEGMENT_S,
+    VIDEO_MIN_FREE_MB,
     CAMERA_CONFIG,
+    CAMERA_PROCESSING,
+    RECORDING_MODE,
+    RAW_CHUNK_FRAMES,
+    CAMERA_METRICS_FILE,
+    SYNC_TILE_SIZE,
+    SYNC_TOLERANCE_MS,
+    SYNC_RECORDING,
+    CAPTURE_PROFILES,
+    CAPTURE_MODE,
+    PRE_TRIGGER_S,
+    PRE_TRIGGER_MB,
 )
 
+MOSAIC_NAME = "MOSAIC"
+MOSAIC_BUTTON_OPEN = "Open mosaic"
+MOSAIC_BUTTON_CLOSE = "Close mosaic"
+
 
 class QCameraApp(QCamerasManager):
     """
@@ -26,19 +56,111 @@ class QCameraApp(QCamerasManager):
         "CAM3": "DEV_000A4722822F",
         "CAM4": "DEV_000A4715D9F0",
     }
+    # frame processing per camera, cameras not listed use CAMERA_PROCESSING
+    CAMERAS_PROCESSING = {
+        "CAM1": CAMERA_PROCESSING,
+        "CAM2": CAMERA_PROCESSING,
+        "CAM3": CAMERA_PROCESSING,
+        "CAM4": CAMERA_PROCESSING,
+    }
+    # time the cameras reload the settings, the writers waiting longer are started
+    CAPTURE_PROFILE_TIMEOUT_MS = 5000
 
     def __init__(self):
         self._video_writers = []
         self._frame_displays = []
         self._cameras = []
+        self._sync_group = self._create_sync_group()
+
+        for tap, (name, camera_id) in zip(self._sync_group.taps, self.CAMERAS.items()):
+            self._create_camera_widget(name, camera_id, tap)
+
+        super().__init__(
+            self._cameras,
+            metrics_file=CAMERA_METRICS_FILE,
+            capture_profile=self._idle_capture_profile(),
+        )
+
+        # cameras reloading the settings, their writers start after the reload
+        self._pending_writers: set[str] = set()
+        self._profile_timer = QTimer(self)
+        self._profile_timer.setSingleShot(True)
+        self._profile_timer.timeout.connect(self._on_capture_profile_timeout)
+        self.capture_profile_applied.connect(self._on_capture_profile_applied)
+
+    def _create_sync_group(self) -> FrameSyncGroup:
+        """Create the mosaic of all cameras, with a single display window"""
+        mosaic_display = FrameDisplay(
+            MOSAIC_NAME,
+            MACKI_LOGO_PATH,
+            DEFAULT_FRAME_SIZE,
+            MINI_FRAME_SIZE,
+            FRAME_FORMAT,
+            OCTOPUS_CAM_WIN,
+            PREVIEW_FPS,
+        )
+        group = FrameSyncGroup(
+            MOSAIC_NAME,
+            list(self.CAMERAS),
+            SYNC_TILE_SIZE,
+            SYNC_TOLERANCE_MS,
+            mosaic_display,
+        )
+
+        if SYNC_RECORDING:
+            writer = VideoWriter(
+                MOSAIC_NAME,
+                VIDEO_FPS,
+                group.mosaic_size,
+                VIDEO_DIR,
+                ColorMode.BGR,
+                VIDEO_SEGMENT_S,
+                VIDEO_MIN_FREE_MB,
+            )
+            writer.prepare()
+            group.set_writer(writer)
+            self._video_writers.append(writer)
+
+        return group
 
-        for name, camera_id in self.CAMERAS.items():
-            self._create_camera_widget(name, camera_id)
+    def _init_ui(self) -> None:
+        super()._init_ui()
 
-        super().__init__(self._cameras)
+        self._mosaic_button = QPushButton(MOSAIC_BUTTON_OPEN)
+        self._mosaic_button.clicked.connect(self._on_mosaic_button_clicked)
+        self._sync_group.display.close_event.connect(self._on_mosaic_closed)
+        self.layout().addWidget(self._mosaic_button)
 
-    def _create_camera_widget(self, name: str, camera_id: str) -> None:
-        video_writer = VideoWriter(name, VIDEO_FPS, VIDEO_RESOLUTION, VIDEO_DIR)
+    def _on_mosaic_button_clicked(self) -> None:
+        if self._sync_group.is_running:
+            self._sync_group.stop()
+            self._mosaic_button.setText(MOSAIC_BUTTON_OPEN)
+        else:
+            self._sync_group.start()
+            self._mosaic_button.setText(MOSAIC_BUTTON_CLOSE)
+
+    def _on_mosaic_closed(self) -> None:
+        self._mosaic_button.setText(MOSAIC_BUTTON_OPEN)
+
+    def _create_camera_widget(self, name: str, camera_id: str, tap: SyncTap) -> None:
+        processing = self.CAMERAS_PROCESSING.get(name, CAMERA_PROCESSING)
+        if RECORDING_MODE == RecordingMode.RAW:
+            video_writer = RawFrameWriter(name, VIDEO_DIR, RAW_CHUNK_FRAMES)
+        else:
+            video_writer = VideoWriter(
+                name,
+                VIDEO_FPS,
+                VIDEO_RESOLUTION,
+                VIDEO_DIR,
+                processing.color,
+                VIDEO_SEGMENT_S,
+                VIDEO_MIN_FREE_MB,
+            )
+            # the encoder process is started with the app, not with the recording
+            if PRE_TRIGGER_S > 0:
+                video_writer.arm(PRE_TRIGGER_S, PRE_TRIGGER_MB)
+            else:
+                video_writer.prepare()
         frame_display = FrameDisplay(
             name,
             MACKI_LOGO_PATH,
@@ -46,25 +168,94 @@ class QCameraApp(QCamerasManager):
             MINI_FRAME_SIZE,
             FRAME_FORMAT,
             OCTOPUS_CAM_WIN,
+            PREVIEW_FPS,
         )
         camera = QCameraWidget(
-            name, camera_id, [frame_display, video_writer], CAMERA_CONFIG
+            name,
+            camera_id,
+            [frame_display, video_writer, tap],
+            CAMERA_CONFIG,
+            processing,
         )
 
         self._video_writers.append(video_writer)
         self._frame_displays.append(frame_display)
         self._cameras.append(camera)
 
+    @staticmethod
+    def _idle_capture_profile() -> CaptureProfile:
+        """Capture profile outside the recordings"""
+        if PRE_TRIGGER_S > 0:
+            return CAPTURE_PROFILES[CaptureMode.RECORD]
+
+        return CAPTURE_PROFILES[CAPTURE_MODE]
+
     def change_output_dir(self, new_dir: str) -> None:
         for writer in self._video_writers:
             if not writer.change_output_dir(new_dir):
                 raise RuntimeError(f"Failed to change output dir for {writer.name}")
 
     def start_video_recording(self) -> None:
-        for writer, camera in zip(self._video_writers, self._cameras):
-            if camera.initialized:
-                writer.start()
+        """Start the writers, called before the procedure is started.
+        The cameras reload the settings with the record profile first, each
+        writer is started once its camera streams with the profile, the mosaic
+        writer once all of them are started.
+        """
+        self.set_capture_profile(CAPTURE_PROFILES[CaptureMode.RECORD])
+        self._pending_writers = {
+            camera.id for camera in self._cameras if camera.initialized
+        }
+
+        for camera_id in list(self._pending_writers):
+            if self.is_capture_profile_applied(camera_id):
+                self._start_writer(camera_id)
+
+        if self._pending_writers:
+            self._profile_timer.start(self.CAPTURE_PROFILE_TIMEOUT_MS)
+        else:
+            self._sync_group.start_recording()
+
+    def _start_writer(self, camera_id: str) -> None:
+        """Start the pending writer of the camera, the mosaic writer
+        is started with the last one
+
+        Args:
+            camera_id (str): camera id
+        """
+        self._pending_writers.discard(camera_id)
+        self._cameras_backend_dict[camera_id].handlers[
+            QCameraWidget.HANDLER_WRITER
+        ].start()
+
+        if not self._pending_writers:
+            self._profile_timer.stop()
+            self._sync_group.start_recording()
+
+    @Slot(str)
+    def _on_capture_profile_applied(self, camera_id: str) -> None:
+        if camera_id in self._pending_writers:
+            self._start_writer(camera_id)
+
+    @Slot()
+    def _on_capture_profile_timeout(self) -> None:
+        logger.warning("Recording started before the record profile was applied")
+        for camera_id in list(self._pending_writers):
+            self._start_writer(camera_id)
 
     def stop_video_recording(self) -> None:
+        self._pending_writers.clear()
+        self._profile_timer.stop()
+
+        for camera in self._cameras:
+            writer = camera.handlers[QCameraWidget.HANDLER_WRITER]
+            if writer.is_running:
+                writer.stop()
+
+        self._sync_group.stop_recording()
+        self.set_capture_profile(self._idle_capture_profile())
+
+    def quit(self) -> None:
+        super().quit()
+
         for writer in self._video_writers:
-            writer.stop()
+            writer.shutdown()
@@ -6,14 +6,22 @@ from PySide6.QtWidgets import (
     QPushButton,
     QGroupBox,
     QGridLayout,
-    QTextEdit,
+    QLineEdit,
     QVBoxLayout,
+    QHBoxLayout,
 )
 
 from PySide6.QtCore import Qt, QTimer, Signal
-from PySide6.QtGui import QTextCursor, QTextCharFormat
-from src.com.serial import QSerial, QSerialState, QSerialStateControlThread
+from src.com.serial import (
+    QSerial,
+    QSerialState,
+    QSerialStateControlThread,
+    SerialCallbackBus,
+    SerialDirection,
+    SerialEvent,
+)
 from src.utils.qt.better_combo_box import BetterComboBox
+from src.utils.qt.console_view import QConsoleView
 from src.utils.colors import Colors
 
 from datetime import datetime
@@ -29,14 +37,22 @@ class MacusWidget(QWidget):
     RX_PREFIX = "RX: "
     TX_DISPLAY_EXCLUDE = ["data"]
     PORTS_TIMER_INTERVAL_MS = 1000
+    CONSOLE_MAX_LINES = 1000
+    BUTTON_PAUSE = "Pause"
+    BUTTON_RESUME = "Resume"
 
     def __init__(self) -> None:
         """This method initializes the MacusWidget class"""
         super().__init__()
 
+        # serial callbacks are called from the I/O thread, the bus passes
+        # them to the GUI thread in batches
+        self._serial_bus = SerialCallbackBus(self)
+        self._serial_bus.subscribe(self._on_serial_events)
+
         self._com_serial = QSerial(baudrate=self.BAUDRATES[0])
-        self._com_serial.set_rx_callback(self._add_rx_message_to_text_box)
-        self._com_serial.set_tx_callback(self._add_tx_message_to_text_box)
+        self._com_serial.set_rx_callback(self._serial_bus.post_rx)
+        self._com_serial.set_tx_callback(self._serial_bus.post_tx)
 
         self._com_serial_state = QSerialStateControlThread(self._com_serial)
         self._com_serial_state.state_changed.connect(self._update_state_label)
@@ -104,14 +120,25 @@ class MacusWidget(QWidget):
         Returns:
             QGroupBox: text box
         """
-        self._text_edit = QTextEdit()
-        self._text_edit.setLineWrapMode(QTextEdit.NoWrap)
-        self._text_edit.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
-        self._text_edit.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
-        self._text_edit.setReadOnly(True)
+        self._console = QConsoleView(self.CONSOLE_MAX_LINES)
+        self._console.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+        self._console.setHorizontalScrollBarPolicy(Qt.ScrollBarAsNeeded)
+
+        self._filter_edit = QLineEdit()
+        self._filter_edit.setPlaceholderText("Filter")
+        self._filter_edit.textChanged.connect(self._console.set_filter)
+
+        self._pause_button = QPushButton(self.BUTTON_PAUSE)
+        self._pause_button.setCheckable(True)
+        self._pause_button.toggled.connect(self._on_pause_button_toggled)
+
+        controls_layout = QHBoxLayout()
+        controls_layout.addWidget(self._filter_edit)
+        controls_layout.addWidget(self._pause_button)
 
         layout = QVBoxLayout()
-        layout.addWidget(self._text_edit)
+        layout.addWidget(self._console)
+        layout.addLayout(controls_layout)
 
         box = QGroupBox("Preview")
         box.setLayout(layout)
@@ -172,15 +199,17 @@ class MacusWidget(QWidget):
         self._state_label.setText(state.name)
         self._state_label.setStyleSheet(f"color: {color.value};")
 
-    def _add_message_to_text_box(self, data: str, message_prefix: str = "") -> None:
+    def _add_message_to_text_box(
+        self, data: str, message_prefix: str = "", timestamp: float | None = None
+    ) -> None:
         """This method adds a message to the text box
 
         Args:
             data (str): The data to add
             message_prefix (str, optional): The message prefix. Defaults to "".
+            timestamp (float, optional): The message time. Defaults to now.
         """
         data = data.strip()
-        data += "\n"
 
         if data.startswith(self._com_serial.ACK):
             color = Qt.green
@@ -189,35 +218,55 @@ class MacusWidget(QWidget):
         else:
             color = Qt.white
 
-        cursor = self._text_edit.textCursor()
-        cursor.movePosition(QTextCursor.Start)
+        time = datetime.fromtimestamp(timestamp) if timestamp else datetime.now()
+        text = time.strftime("%H:%M:%S") + " " + message_prefix + data
+        self._console.append_line(text, color)
 
-        char_format = QTextCharFormat()
-        char_format.setForeground(color)
-        cursor.setCharFormat(char_format)
+    def _on_pause_button_toggled(self, paused: bool) -> None:
+        """This method pauses or resumes the console preview
 
-        text = datetime.now().strftime("%H:%M:%S") + " " + message_prefix + data
-        cursor.insertText(text)
-        self._text_edit.setTextCursor(cursor)
+        Args:
+            paused (bool): True if the console should be paused
+        """
+        self._console.set_paused(paused)
+        self._pause_button.setText(self.BUTTON_RESUME if paused else self.BUTTON_PAUSE)
 
-    def _add_tx_message_to_text_box(self, message: str) -> None:
+    def _add_tx_message_to_text_box(
+        self, message: str, timestamp: float | None = None
+    ) -> None:
         """This method adds a TX message to the text box
 
         Args:
             message (str): The message to add
+            timestamp (float, optional): The message time. Defaults to now.
         """
         if any(excd in message for excd in self.TX_DISPLAY_EXCLUDE):
             return
 
-        self._add_message_to_text_box(message, self.TX_PREFIX)
+        self._add_message_to_text_box(message, self.TX_PREFIX, timestamp)
 
-    def _add_rx_message_to_text_box(self, message: str) -> None:
+    def _add_rx_message_to_text_box(
+        self, message: str, timestamp: float | None = None
+    ) -> None:
         """This method adds a RX message to the text box
 
         Args:
             message (str): The message to add
+            timestamp (float, optional): The message time. Defaults to now.
+        """
+        self._add_message_to_text_box(message, self.RX_PREFIX, timestamp)
+
+    def _on_serial_events(self, events: list[SerialEvent]) -> None:
+        """This method adds a batch of serial events to the text box
+
+        Args:
+            events (list[SerialEvent]): The serial events
         """
-        self._add_message_to_text_box(message, self.RX_PREFIX)
+        for event in events:
+            if event.direction == SerialDirection.TX:
+                self._add_tx_message_to_text_box(event.message, event.timestamp)
+            else:
+                self._add_rx_message_to_text_box(event.message, event.timestamp)
 
     def _timer_routine(self):
         """This method updates the status"""
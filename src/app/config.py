@@ -1,5 +1,10 @@
 import os
+import cv2
+from vmbpy import PixelFormat
 from src.cameras.frame_handlers import FrameDisplayFormats
+from src.cameras.frame_processing import ColorMode, ProcessingConfig
+from src.cameras.camera_features import CaptureMode, CaptureProfile
+from src.app.cameras.camera_widget_utils import RecordingMode
 
 
 CONFIG_DIR = os.path.join(os.getcwd(), "config")
@@ -8,6 +13,7 @@ COMMANDS_CONFIG_FILE = os.path.join(CONFIG_DIR, "service_commands.json")
 DATA_PLOT_CONFIG_FILE = os.path.join(CONFIG_DIR, "experiment_data_plot.json")
 DATA_TEXT_CONFIG_FILE = os.path.join(CONFIG_DIR, "experiment_data_text.json")
 PARSER_CONFIG_FILE = os.path.join(CONFIG_DIR, "data_parser.json")
+DERIVED_CHANNELS_CONFIG_FILE = os.path.join(CONFIG_DIR, "derived_channels.json")
 PROCEDURES_CONFIG_FILE = os.path.join(CONFIG_DIR, "procedures.json")
 
 RESOURCES_DIR = os.path.join(os.getcwd(), "resources")
@@ -27,11 +33,34 @@ CAMERA_CONFIG = os.path.join("config", "DEV_000A4727B2BF_settings.xml")
 MACKI_LOGO_PATH = os.path.join("resources", "MACKI_patch.png")
 DEFAULT_FRAME_SIZE = (500, 500)
 MINI_FRAME_SIZE = (300, 300)
-FRAME_FORMAT = FrameDisplayFormats.RGB
+FRAME_FORMAT = FrameDisplayFormats.BGR
+PREVIEW_FPS = 15  # preview rate limit, independent of the camera frame rate
+# frames are converted once to BGR, displayed and written without conversion
+CAMERA_PROCESSING = ProcessingConfig(ColorMode.BGR, cv2.ROTATE_90_COUNTERCLOCKWISE)
 
 VIDEO_FPS = 10
 VIDEO_RESOLUTION = (1216, 1936)
 VIDEO_DIR = "data"
+VIDEO_SEGMENT_S = 60  # a crash loses only the last segment
+VIDEO_MIN_FREE_MB = 2048  # recording is not started or stopped below it
+# mosaic of the synchronised cameras, frames grouped by the receive time
+SYNC_TILE_SIZE = (304, 484)  # quarter of the rotated camera frame
+SYNC_TOLERANCE_MS = 20
+SYNC_RECORDING = False  # record the mosaic next to the camera videos
+# sensor readout per use, the recording profile is used during the recording
+CAPTURE_PROFILES = {
+    CaptureMode.PREVIEW: CaptureProfile(binning=2, fps=PREVIEW_FPS),
+    CaptureMode.RECORD: CaptureProfile(fps=VIDEO_FPS),
+    CaptureMode.HIGH_SPEED: CaptureProfile(PixelFormat.Mono8, binning=2),
+}
+CAPTURE_MODE = CaptureMode.PREVIEW  # profile used outside the recording
+# seconds kept before the recording start, 0 - disabled. The cameras stream
+# all the time and the record profile is used, so the profile is not switched
+PRE_TRIGGER_S = 3
+PRE_TRIGGER_MB = 64  # per camera, JPEG compressed frames
+# RAW - lossless recording, encode with scripts/encode_raw.py
+RECORDING_MODE = RecordingMode.VIDEO
+RAW_CHUNK_FRAMES = 256
 
 
 LOG_DIR = os.path.join(os.getcwd(), "data", "logs")
@@ -39,6 +68,7 @@ if not os.path.exists(LOG_DIR):
     os.makedirs(LOG_DIR)
 
 LOG_FILE = os.path.join(LOG_DIR, "app.log")
+CAMERA_METRICS_FILE = os.path.join(LOG_DIR, "camera_metrics.jsonl")
 
 LOGGING_CONFIG = {
     "version": 1,
@@ -1,12 +1,12 @@
 import logging
 from typing import Any
 from PySide6.QtWidgets import QTabWidget, QWidget, QGridLayout, QVBoxLayout, QMessageBox
-from PySide6.QtCore import QThread
 from src.app.config import (
     COMMANDS_CONFIG_FILE,
     DATA_PLOT_CONFIG_FILE,
     DATA_TEXT_CONFIG_FILE,
     PARSER_CONFIG_FILE,
+    DERIVED_CHANNELS_CONFIG_FILE,
     PROCEDURES_CONFIG_FILE,
     OCTOPUS_EXP_WIN,
 )
@@ -18,11 +18,13 @@ from src.com.serial import QSerial
 from app.cameras_app import QCameraApp
 from src.procedures.procedures_widget import ProceduresWidget
 from src.procedures.procedure_parameters import ProcedureParameters
+from src.procedures.procedure_upload import ProcedureUploader
 from src.data_displays import DataDisplayText, DataDisplayPlot, DataTextBasic
 
 # from src.data_parser import DataParser
 from src.data_logger import DataLogger
 from src.data_parser.data_parser_string import DataParserString
+from src.data_parser.derived_channels import DerivedChannels
 
 logger = logging.getLogger("experiment_window")
 
@@ -33,7 +35,6 @@ class ExperimentWindow(QTabWidget):
     IDX_TAB_EXPERIMENT = 0
     # TODO: move the all available commands to a separate file
     READ_DATA_COMMAND = "data"
-    PROCEDURE_START_COMMAND = "procedure"
     PROCEDURE_STOP_COMMAND = "procedure_stop"
     SERVICE_DATA_NAME = "Data"
     PROCEDURE_PLOT_TIME = "procedure_time"
@@ -55,6 +56,10 @@ class ExperimentWindow(QTabWidget):
         self._parser = DataParserString.from_JSON(PARSER_CONFIG_FILE)
         self._parser.set_prefix(self._protocol.ACK)
         self._parser.set_postfix(self._protocol.EOL)
+        self._derived_channels = DerivedChannels.from_JSON(
+            DERIVED_CHANNELS_CONFIG_FILE, self._parser.data_names
+        )
+        self._parser.set_derived_channels(self._derived_channels)
         self._continous_nack_counter = 0
 
         # Tabs
@@ -91,8 +96,8 @@ class ExperimentWindow(QTabWidget):
         self._procedures.stop_procedure_clicked.connect(self._on_stop_procedure)
 
         self._cameras = QCameraApp()
+        # cameras are started as they are detected, the GUI does not wait
         self._cameras.enable_cameras()
-        QThread.sleep(3)  # a delay to allow the cameras to start
         self._cameras.start_cameras()
 
         self._data_plots = DataDisplayPlot.from_JSON(DATA_PLOT_CONFIG_FILE)
@@ -226,6 +231,8 @@ class ExperimentWindow(QTabWidget):
 
     def _start_procedure_data_logging(self, procedure: ProcedureParameters) -> None:
         """Starts the data logging"""
+        # the windowed channels do not mix the samples of the procedures
+        self._derived_channels.clear_history()
         self._data_logger.create_procedure_logger(procedure.name)
 
         if not self._data_logger.procedure_folder:
@@ -249,7 +256,8 @@ class ExperimentWindow(QTabWidget):
 
         try:
             args = procedure.procedure_profile_args()
-            self._protocol.write_command(self.PROCEDURE_START_COMMAND, *args)
+            # the profile is sent in chunks, commit starts the procedure
+            ProcedureUploader(self._protocol).upload(*args)
             self._procedures.disable_config()
         except Exception as e:
             self._stop_procedure_data_logging()
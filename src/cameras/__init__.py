@@ -1,2 +1,2 @@
-from src.cameras.camera_handler import CameraHandler
+from src.cameras.camera_handler import CameraHandler, CameraState
 from src.cameras.cameras_manager import CamerasManager, CamerasManagerState
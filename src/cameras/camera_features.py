@@ -0,0 +1,240 @@
+import logging
+from dataclasses import dataclass, replace
+from enum import Enum
+from typing import Any
+from vmbpy import Camera, PixelFormat, VmbFeatureError
+from src.cameras.frame_processing import CameraOffload, ProcessingConfig
+
+logger = logging.getLogger("cameras")
+
+
+def get_feature(camera: Camera, name: str, default: Any = None) -> Any:
+    """Read the camera feature
+
+    Args:
+        camera (Camera): opened camera
+        name (str): feature name
+        default (Any, optional): value returned if the feature is not available.
+        Defaults to None.
+
+    Returns:
+        Any: feature value
+    """
+    try:
+        return camera.get_feature_by_name(name).get()
+    except VmbFeatureError:
+        return default
+
+
+def set_feature(camera: Camera, name: str, value: Any) -> bool:
+    """Write the camera feature
+
+    Args:
+        camera (Camera): opened camera
+        name (str): feature name
+        value (Any): feature value
+
+    Returns:
+        bool: True if the feature was set, False if the feature is not available,
+        not writeable or the value is invalid
+    """
+    try:
+        feature = camera.get_feature_by_name(name)
+        if not feature.is_writeable():
+            logger.warning(f"Camera {camera.get_id()}: {name} is not writeable")
+            return False
+
+        feature.set(value)
+    except VmbFeatureError as e:
+        logger.warning(f"Camera {camera.get_id()}: unable to set {name}: {e}")
+        return False
+
+    return True
+
+
+def _set_roi(camera: Camera, roi: tuple[int, int, int, int]) -> bool:
+    """Set the camera region of interest, the full sensor is restored on failure
+
+    Args:
+        camera (Camera): opened camera
+        roi (tuple[int, int, int, int]): x, y, width, height
+
+    Returns:
+        bool: True if the region was set
+    """
+    x, y, width, height = roi
+    # offsets are cleared first, so the new size is always valid
+    features = [
+        ("OffsetX", 0),
+        ("OffsetY", 0),
+        ("Width", width),
+        ("Height", height),
+        ("OffsetX", x),
+        ("OffsetY", y),
+    ]
+
+    if all(set_feature(camera, name, value) for name, value in features):
+        return True
+
+    set_feature(camera, "OffsetX", 0)
+    set_feature(camera, "OffsetY", 0)
+    set_feature(camera, "Width", get_feature(camera, "WidthMax"))
+    set_feature(camera, "Height", get_feature(camera, "HeightMax"))
+
+    return False
+
+
+def apply_processing_features(
+    camera: Camera, config: ProcessingConfig
+) -> CameraOffload:
+    """Move the processing steps to the camera, where it is possible:
+    flips and 180 degrees rotation to ReverseX/ReverseY, crop to the ROI.
+    The ROI is set only if the image is not reversed, so the crop is always
+    in the sensor coordinates.
+
+    Args:
+        camera (Camera): opened camera, not streaming
+        config (ProcessingConfig): frame processing configuration
+
+    Returns:
+        CameraOffload: steps done by the camera
+    """
+    offload = CameraOffload()
+    if not config.camera_features:
+        return offload
+
+    reverse_x, reverse_y = config.camera_reverse()
+    if reverse_x or reverse_y:
+        if set_feature(camera, "ReverseX", reverse_x) and set_feature(
+            camera, "ReverseY", reverse_y
+        ):
+            offload.reverse_x = reverse_x
+            offload.reverse_y = reverse_y
+        else:
+            set_feature(camera, "ReverseX", False)
+            set_feature(camera, "ReverseY", False)
+
+    if config.crop and not (offload.reverse_x or offload.reverse_y):
+        offload.roi = _set_roi(camera, config.crop)
+
+    logger.info(f"Camera {camera.get_id()} processing offload: {offload}")
+
+    return offload
+
+
+class CaptureMode(Enum):
+    """Active use of the camera"""
+
+    PREVIEW = "preview"
+    RECORD = "record"
+    HIGH_SPEED = "high_speed"
+
+
+@dataclass(frozen=True)
+class CaptureProfile:
+    """Sensor readout settings, fewer bytes are sent by the camera.
+    None and 1 values keep the settings from the camera config file.
+    """
+
+    pixel_format: PixelFormat | None = None  # e.g. Mono8 or BayerRG8, not RGB8
+    binning: int = 1  # decimation is used, if the camera has no binning
+    fps: float | None = None  # frame rate limit
+    # sensor region x, y, width, height, in the binned pixels,
+    # used only if the processing config has no crop
+    roi: tuple[int, int, int, int] | None = None
+
+
+def _set_frame_rate(camera: Camera, fps: float) -> bool:
+    """Limit the camera frame rate, Alvium and Mako features are supported
+
+    Args:
+        camera (Camera): opened camera
+        fps (float): frame rate
+
+    Returns:
+        bool: True if the frame rate was set
+    """
+    if get_feature(camera, "AcquisitionFrameRateEnable") is not None:
+        set_feature(camera, "AcquisitionFrameRateEnable", True)
+        return set_feature(camera, "AcquisitionFrameRate", fps)
+
+    return set_feature(camera, "AcquisitionFrameRateAbs", fps)
+
+
+def _set_binning(camera: Camera, factor: int) -> bool:
+    """Set the binning, or the decimation if the camera has no binning
+
+    Args:
+        camera (Camera): opened camera
+        factor (int): horizontal and vertical factor
+
+    Returns:
+        bool: True if the binning or decimation was set
+    """
+    for prefix in ("Binning", "Decimation"):
+        if get_feature(camera, f"{prefix}Horizontal") is None:
+            continue
+
+        if set_feature(camera, f"{prefix}Horizontal", factor) and set_feature(
+            camera, f"{prefix}Vertical", factor
+        ):
+            return True
+
+        set_feature(camera, f"{prefix}Horizontal", 1)
+        set_feature(camera, f"{prefix}Vertical", 1)
+
+    return False
+
+
+def _bin_crop(config: ProcessingConfig, factor: int) -> ProcessingConfig:
+    """Scale the processing crop to the binned frame, the values are kept even
+
+    Args:
+        config (ProcessingConfig): processing with the crop on the full sensor
+        factor (int): binning factor
+
+    Returns:
+        ProcessingConfig: processing with the crop on the binned sensor
+    """
+    if factor == 1 or not config.crop:
+        return config
+
+    crop = tuple(value // factor // 2 * 2 for value in config.crop)
+
+    return replace(config, crop=crop)
+
+
+def apply_capture_profile(
+    camera: Camera, profile: CaptureProfile, config: ProcessingConfig
+) -> ProcessingConfig:
+    """Apply the readout settings, before the processing features, because
+    the binning changes the sensor size. Settings not supported by the camera
+    are skipped with a warning.
+
+    Args:
+        camera (Camera): opened camera, not streaming
+        profile (CaptureProfile): readout settings
+        config (ProcessingConfig): frame processing configuration
+
+    Returns:
+        ProcessingConfig: the processing configuration for the binned frames
+    """
+    if profile.pixel_format is not None:
+        set_feature(camera, "PixelFormat", profile.pixel_format.name)
+
+    binning = 1
+    if profile.binning > 1:
+        if _set_binning(camera, profile.binning):
+            binning = profile.binning
+        else:
+            logger.warning(f"Camera {camera.get_id()}: binning is not available")
+
+    if profile.fps is not None:
+        _set_frame_rate(camera, profile.fps)
+
+    if profile.roi and not config.crop:
+        _set_roi(camera, profile.roi)
+
+    logger.info(f"Camera {camera.get_id()} capture profile: {profile}")
+
+    return _bin_crop(config, binning)
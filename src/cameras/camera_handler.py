@@ -1,23 +1,57 @@
-import copy
 import logging
+import threading
+import time
 import numpy as np
 import numpy.typing as npt
+from enum import Enum
 from typing import override
-from queue import Queue
-from vmbpy import Camera, Frame, Stream, FrameStatus, PersistType, PixelFormat
+from collections import deque
+from concurrent.futures import Future
+from queue import Queue, Empty, Full
+from vmbpy import Camera, Frame, Stream, FrameStatus, PersistType
 from PySide6.QtCore import QThread, QMutex, Slot, Qt, Signal
 from src.cameras.frame_handlers.basic_frame_handler import BasicFrameHandler
+from src.cameras.frame_pool import FramePool, PooledFrame, FrameInfo
+from src.cameras.frame_processing import FrameProcessor, ProcessingConfig
+from src.cameras.camera_features import (
+    CaptureProfile,
+    apply_capture_profile,
+    apply_processing_features,
+)
+from src.cameras.camera_metrics import CameraMetrics
+from src.cameras.frame_dispatch import HandlerDispatcher
 from src.utils.qt.thread_event import ThreadEvent
 import traceback
-import cv2
 
 logger = logging.getLogger("cameras")
 
 
+class StreamingCommand(Enum):
+    START = "start"
+    STOP = "stop"
+
+
+class CameraState(Enum):
+    """Camera handler thread states"""
+
+    STOPPED = "stopped"
+    OPENING = "opening"  # opening the camera and loading the settings
+    READY = "ready"  # settings loaded, frames can be streamed
+    ERROR = "error"
+
+
 class CameraHandler(QThread):
     FRAME_QUEUE_SIZE = 1
+    # frames processed by the worker pool at the same time
+    MAX_FRAMES_IN_PROCESSING = 2
+    # queued frame + frames in processing + spare for the callback
+    FRAME_POOL_SIZE = FRAME_QUEUE_SIZE + MAX_FRAMES_IN_PROCESSING + 1
+    # maximum time the thread sleeps on the frame queue, when nothing happens
+    FRAME_WAIT_TIMEOUT_S = 0.5
     error = Signal(str)
     initialized = Signal()
+    state_changed = Signal(CameraState)
+    profile_applied = Signal(str)  # camera id, streams with the capture profile
 
     def __init__(
         self,
@@ -33,12 +67,27 @@ class CameraHandler(QThread):
         self._id = self._camera.get_id()  # camera name
 
         self._frame_queue = Queue(self.FRAME_QUEUE_SIZE)
+        self._frame_pool = FramePool(self.FRAME_POOL_SIZE)
+        self._metrics = CameraMetrics(self._id)
+        self._processing_config = ProcessingConfig()
+        self._processor = FrameProcessor(self._processing_config)
+        # processed frames futures with the frames metadata, in the frames order
+        self._processing: deque[tuple[Future, FrameInfo]] = deque()
         self._handlers: list[BasicFrameHandler] = []
+        # each handler gets the frames from its own thread and queue
+        self._dispatchers: dict[BasicFrameHandler, HandlerDispatcher] = {}
         self._handler_mutex = QMutex()
         self._stop_signal = ThreadEvent()
-        self._streaming = ThreadEvent()
+        # streaming requests, applied by the handler thread
+        self._commands: Queue[StreamingCommand] = Queue()
+        self._streaming_requested = False
         self._config_file = None  # camera config file, None means no config file
         self._initialized = False
+        self._state = CameraState.STOPPED
+        self._capture_profile = CaptureProfile()
+        self._profile_changed = False  # settings are reloaded by the thread
+        self._profile_applied = threading.Event()  # camera streams with the profile
+        self._profile_applied.set()
 
     @Slot()
     def on_handler_started(self):
@@ -68,6 +117,9 @@ class CameraHandler(QThread):
             return False
 
         self._handlers.append(handler)
+        handler.set_metrics(self._metrics)
+        handler.set_processing(self._processor.config, self._processor.offload)
+        self._start_dispatcher(handler)
         # Connect handler signals, to inform the camera handler thread
         # that the handler has started or stopped and request to start/stop
         # streaming (start/stop the camera handler thread)
@@ -104,100 +156,289 @@ class CameraHandler(QThread):
 
         handler.stop()
         self._handlers.remove(handler)
+        dispatcher = self._dispatchers.pop(handler)
 
         self._handler_mutex.unlock()
+        dispatcher.stop()
 
         return True
 
+    def _start_dispatcher(self, handler: BasicFrameHandler) -> None:
+        """Start the frame dispatcher of the handler, handler mutex must be locked.
+        The raw frames queued for the handler hold the pool buffers, so the pool
+        is extended by the queue depth.
+
+        Args:
+            handler (BasicFrameHandler): registered handler
+        """
+        dispatcher = HandlerDispatcher(
+            handler, f"{self._id}_{type(handler).__name__}", self._metrics
+        )
+        self._dispatchers[handler] = dispatcher
+        dispatcher.start()
+
+        if handler.RAW_FRAMES:
+            raw_depth = sum(
+                other.QUEUE.depth for other in self._handlers if other.RAW_FRAMES
+            )
+            self._frame_pool.reserve(self.FRAME_POOL_SIZE + raw_depth)
+
+    def _start_dispatchers(self) -> None:
+        """Start the dispatchers stopped by the previous quit"""
+        self._handler_mutex.lock()
+        for handler in self._handlers:
+            if handler not in self._dispatchers:
+                self._start_dispatcher(handler)
+        self._handler_mutex.unlock()
+
+    def _stop_dispatchers(self) -> None:
+        """Stop the frame dispatchers and then their handlers, the queued frames
+        are passed to the handlers. The stopped handlers are not stopped again.
+        """
+        self._handler_mutex.lock()
+        dispatchers = self._dispatchers
+        self._dispatchers = {}
+        self._handler_mutex.unlock()
+
+        for dispatcher in dispatchers.values():
+            dispatcher.stop()
+
+        for handler in dispatchers:
+            handler.stop()
+
     def set_config_file(self, config_file: str) -> None:
         """Set the camera config file that will be loaded when
         the camera handler thread starts
         """
         self._config_file = config_file
 
+    def set_processing_config(self, config: ProcessingConfig) -> None:
+        """Set the frame processing, must be called before the thread starts
+
+        Args:
+            config (ProcessingConfig): frame processing configuration
+        """
+        self._processing_config = config
+        self._set_processor(FrameProcessor(config))
+
+    def _set_processor(self, processor: FrameProcessor) -> None:
+        """Use the frame processor, the handlers are informed
+
+        Args:
+            processor (FrameProcessor): processor of the camera frames
+        """
+        self._processor = processor
+        for handler in list(self._handlers):
+            handler.set_processing(processor.config, processor.offload)
+
+    def set_capture_profile(self, profile: CaptureProfile) -> None:
+        """Set the sensor readout settings. When the thread is running,
+        the streaming is paused and the camera settings are reloaded.
+
+        Args:
+            profile (CaptureProfile): readout settings
+        """
+        self._capture_profile = profile
+        if self.isRunning():
+            self._profile_applied.clear()
+            self._profile_changed = True
+            self._wake()
+
     def _on_frame(self, camera: Camera, stream: Stream, frame: Frame):
-        """Frame callback function
+        """Frame callback function, copies the raw frame into the pooled buffer
+        and gives the VmbPy frame back to the camera
 
         Args:
             camera (Camera): camera object
             stream (Stream): stream object
             frame (Frame): frame
         """
-        if frame.get_status() == FrameStatus.Complete:
-            frame_cpy = copy.deepcopy(frame)
+        try:
+            if frame.get_status() == FrameStatus.Complete:
+                self._copy_frame_to_pool(frame)
+            else:
+                self._metrics.count("frames_incomplete")
+        finally:
+            camera.queue_frame(frame)
 
-            if self._frame_queue.full():
-                self._frame_queue.get_nowait()
-                logger.warning(f"Camera {self._id} lost one frame")
+    def _copy_frame_to_pool(self, frame: Frame) -> None:
+        """Copy the raw frame data to the pooled buffer and put it on the queue
 
-            debayered_frame = frame_cpy.convert_pixel_format(PixelFormat.Rgb8)
-            self._frame_queue.put_nowait(debayered_frame.as_numpy_ndarray())
+        Args:
+            frame (Frame): complete VmbPy frame
+        """
+        receive_time_ns = time.monotonic_ns()
+        self._metrics.frame_received(frame.get_timestamp(), receive_time_ns)
+        raw_data = frame.as_numpy_ndarray()
+        pooled_frame = self._frame_pool.acquire(raw_data.shape)
+
+        # drops are counted in the metrics, logging here would slow down the callback
+        if pooled_frame is None:
+            self._metrics.count("dropped_pool")
+            return
 
-        camera.queue_frame(frame)
+        np.copyto(pooled_frame.data, raw_data)
+        pooled_frame.info = FrameInfo(
+            self._id,
+            frame.get_id(),
+            frame.get_timestamp(),
+            receive_time_ns,
+            frame.get_pixel_format(),
+            time.time_ns(),
+        )
 
-    def _frame_available(self) -> bool:
-        """Check if there is a frame available in the queue
+        if self._frame_queue.full():
+            try:
+                dropped_frame = self._frame_queue.get_nowait()
+            except Empty:
+                dropped_frame = None  # the frame was taken by the handler thread
 
-        Returns:
-            bool: True if there is a frame available, False otherwise
-        """
-        return not self._frame_queue.empty()
+            if dropped_frame is not None:
+                dropped_frame.release()
+                self._metrics.count("dropped_queue")
 
-    def _get_the_newest_frame(self) -> np.ndarray | None:
-        """Get the newest frame from the queue
-        This methode also removes all the other frames from the queue
+        try:
+            self._frame_queue.put_nowait(pooled_frame)
+        except Full:
+            pooled_frame.release()
+            self._metrics.count("dropped_queue")
+
+    def _wake(self) -> None:
+        """Wake the handler thread waiting on the frame queue.
+        None is put on the queue, if the queue is full the thread is awake anyway.
         """
-        frames_on_queue = self._frame_queue.qsize()
-
-        if frames_on_queue == 0:
-            return None
+        try:
+            self._frame_queue.put_nowait(None)
+        except Full:
+            pass
 
-        # if frames_on_queue > 1:
-        #     logger.warn(
-        #         f"Camera {self._id} thread is delayed"
-        #     )
+    def _get_the_newest_frame(self, timeout_s: float = None) -> PooledFrame | None:
+        """Get the newest frame from the queue
 
-        # while frames_on_queue > 0:
-        #     # we checked empty before, no need to handle exception
-        #     frame = self._frame_queue.get_nowait()
-        #     frames_on_queue -= 1
-        frame = self._frame_queue.get_nowait()
-        # print("New frame")
+        Args:
+            timeout_s (float, optional): time to wait for the frame,
+            None means no waiting. Defaults to None.
 
-        return frame
+        Returns:
+            PooledFrame | None: frame, None if there is no frame or
+            the thread was woken up
+        """
+        try:
+            if timeout_s is None:
+                return self._frame_queue.get_nowait()
+            return self._frame_queue.get(timeout=timeout_s)
+        except Empty:
+            return None
 
-    def _add_frame_to_handlers(self, frame: npt.ArrayLike) -> None:
-        """Add the frame to all the registered handlers
+    def _add_frame_to_handlers(
+        self,
+        frame: npt.ArrayLike,
+        info: FrameInfo,
+        pooled_frame: PooledFrame = None,
+    ) -> None:
+        """Queue the frame for the running handlers, the queues are filled
+        outside the handler mutex, so a busy handler cannot hold it
 
         Args:
             frame (npt.ArrayLike): The frame to be added
+            info (FrameInfo): The frame metadata
+            pooled_frame (PooledFrame, optional): the raw frame, passed to
+            the raw frame handlers. Defaults to None, the processed frame.
         """
         if frame is None:
             logger.warning(f"Camera {self._id}, frame is None :C")
             return
 
-        for handler in self._handlers:
-            handler.add_frame(frame)
-
-    def _handle_frames(self):
-        """Handle the frames that are available in the queue"""
-        if not self._frame_available():
-            return
-
         if not self._handler_mutex.tryLock(1000):
-            logger.error(f"Camera {self._id}: Unable to lock mutex for frame handling")
+            logger.error(f"Camera {self._id}: Unable to lock mutex for handling")
             return
 
-        try:
-            frame = self._get_the_newest_frame()
-            # FIXME:
-            # to not call rotate for each handlers, this is a temporary solution
-            # and should be replaced with preprocessing function specified in constructor
-            frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
+        raw = pooled_frame is not None
+        dispatchers = [
+            self._dispatchers[handler]
+            for handler in self._handlers
+            if handler.RAW_FRAMES == raw and handler.wants_frames
+        ]
+        self._handler_mutex.unlock()
 
-            self._add_frame_to_handlers(frame)
-        finally:
-            self._handler_mutex.unlock()
+        # a dispatcher stopped meanwhile releases the frame at once
+        for dispatcher in dispatchers:
+            dispatcher.put(frame, info, pooled_frame)
+
+    def _needs_processing(self) -> bool:
+        """Check if any running handler needs the processed frames
+
+        Returns:
+            bool: True if the frame should be processed
+        """
+        return any(
+            handler.wants_frames and not handler.RAW_FRAMES
+            for handler in self._handlers
+        )
+
+    def _add_raw_frame_to_handlers(self, pooled_frame: PooledFrame) -> None:
+        """Pass the raw frame to the raw frame handlers, the queued frames
+        keep the pool buffer until they are handled
+
+        Args:
+            pooled_frame (PooledFrame): raw frame
+        """
+        self._add_frame_to_handlers(pooled_frame.data, pooled_frame.info, pooled_frame)
+
+    def _dispatch_processed_frames(self, wait: bool = False) -> None:
+        """Pass the processed frames to the handlers, in the frames order
+
+        Args:
+            wait (bool, optional): wait for the oldest frame in processing.
+            Defaults to False.
+        """
+        while self._processing and (wait or self._processing[0][0].done()):
+            wait = False
+            future, info = self._processing.popleft()
+
+            try:
+                frame = future.result()
+            except Exception as e:
+                logger.error(f"Camera {self._id}: frame processing failed: {e}")
+                self._metrics.count("dropped_handler")
+                continue
+
+            self._add_frame_to_handlers(frame, info)
+
+    def _submit_frame(self, pooled_frame: PooledFrame) -> None:
+        """Submit the raw frame to the processing pool
+
+        Args:
+            pooled_frame (PooledFrame): raw frame, released after the processing
+        """
+        if len(self._processing) >= self.MAX_FRAMES_IN_PROCESSING:
+            self._dispatch_processed_frames(wait=True)
+
+        future = self._processor.submit(pooled_frame)
+        # wake the thread, to pass the frame to the handlers right away
+        future.add_done_callback(lambda _: self._wake())
+        self._processing.append((future, pooled_frame.info))
+        self._metrics.queue_depth(len(self._processing))
+
+    def _handle_frames(self, timeout_s: float = None):
+        """Submit the queued raw frame to the processing pool and pass
+        the processed frames to the handlers
+
+        Args:
+            timeout_s (float, optional): time to wait for the frame,
+            None means no waiting. Defaults to None.
+        """
+        pooled_frame = self._get_the_newest_frame(timeout_s)
+
+        if pooled_frame is not None:
+            self._add_raw_frame_to_handlers(pooled_frame)
+
+            if self._needs_processing():
+                self._submit_frame(pooled_frame)
+            else:
+                pooled_frame.release()
+
+        self._dispatch_processed_frames()
 
     def _load_config_file(self) -> None:
         """Handle the camera config file update"""
@@ -207,8 +448,28 @@ class CameraHandler(QThread):
         logger.info(f"Loading camera config file for {self._id} {self._config_file}")
         self._camera.load_settings(self._config_file, PersistType.NoLUT)
         logger.info(f"Config loaded {self._id}")
+
+        # the settings file may overwrite the features, so they are set after it
+        config = apply_capture_profile(
+            self._camera, self._capture_profile, self._processing_config
+        )
+        offload = apply_processing_features(self._camera, config)
+        self._set_processor(FrameProcessor(config, offload))
         self._initialized = True
 
+    def _set_state(self, state: CameraState) -> None:
+        """Change the thread state and inform the GUI
+
+        Args:
+            state (CameraState): new state
+        """
+        logger.info(f"Camera {self._id}: {self._state.value} -> {state.value}")
+        self._state = state
+        self.state_changed.emit(state)
+
+        if state == CameraState.READY:
+            self.initialized.emit()
+
     def _handle_exception(self, e: Exception) -> None:
         """Handle the exception
 
@@ -219,75 +480,140 @@ class CameraHandler(QThread):
         logger.error(message)
         self.error.emit(message)
 
+    def _process_commands(self) -> None:
+        """Apply the streaming requests"""
+        while True:
+            try:
+                command = self._commands.get_nowait()
+            except Empty:
+                break
+
+            self._streaming_requested = command == StreamingCommand.START
+
+        if self._profile_changed:
+            self._profile_changed = False
+            if self._camera.is_streaming():
+                self._camera.stop_streaming()
+            # the settings file resets the previous profile
+            self._load_config_file()
+
+        if self._streaming_requested and not self._camera.is_streaming():
+            logger.info("Streaming started")
+            self._camera.start_streaming(self._on_frame)
+
+        if not self._streaming_requested and self._camera.is_streaming():
+            logger.info("Streaming stopped")
+            self._camera.stop_streaming()
+
+        if not self._profile_changed and not self._profile_applied.is_set():
+            self._profile_applied.set()
+            self.profile_applied.emit(self._id)
+
     def _thread_loop(self) -> None:
-        """Thread main loop"""
+        """Thread main loop, the thread sleeps on the frame queue until a frame,
+        a processed frame, a command or the stop request arrives
+        """
         while not self._stop_signal.occurs():
-            self._handle_frames()
-            self._handle_config_file()
+            self._process_commands()
+            self._handle_frames(self.FRAME_WAIT_TIMEOUT_S)
+
+        if self._camera.is_streaming():
+            self._camera.stop_streaming()
 
     def _clean_up(self):
         """Clean up the camera handler thread"""
         while not self._frame_queue.empty():
-            self._frame_queue.get_nowait()
-
+            pooled_frame = self._get_the_newest_frame()
+            if pooled_frame is not None:
+                pooled_frame.release()
+
+        # the workers release the pooled frames, only wait for them
+        while self._processing:
+            self._processing.popleft()[0].exception()
+
+        if not self._profile_applied.is_set():
+            # nobody waits for the stopped thread
+            self._profile_applied.set()
+            self.profile_applied.emit(self._id)
         logger.info(f"Frame handler thread stopped for camera {self._id}")
 
     def start_streaming(self):
         """Start the camera streaming"""
-        self._streaming.set()
+        self._commands.put(StreamingCommand.START)
+        self._wake()
 
     def stop_streaming(self):
         """Stop the camera streaming"""
-        if all(handler.is_running is False for handler in self._handlers):
-            self._streaming.clear()
+        if all(handler.wants_frames is False for handler in self._handlers):
+            self._commands.put(StreamingCommand.STOP)
+            self._wake()
+
+    @override
+    def start(self, *args, **kwargs) -> None:
+        """Start the thread, the stop signal is cleared before the thread
+        starts, so the stop requested meanwhile is not lost
+        """
+        self._stop_signal.clear()
+        super().start(*args, **kwargs)
 
     @override
     def run(self) -> None:
         """Thread main loop"""
         logger.info(f"Frame handler thread started for camera {self._id}")
-        self._stop_signal.clear()
+        self._start_dispatchers()
         self._initialized = False
-        QThread.sleep(0.5)  # TODO: check if it is needed
+        self._set_state(CameraState.OPENING)
 
-        with self._camera:
-            try:
+        try:
+            with self._camera:
                 self._load_config_file()
-                self.initialized.emit()
-
-                while not self._stop_signal.occurs():
-                    if self._streaming.occurs() and not self._camera.is_streaming():
-                        logger.info("Streaming started")
-                        self._camera.start_streaming(self._on_frame)
-
-                    if not self._streaming.occurs() and self._camera.is_streaming():
-                        logger.info("Streaming stopped")
-                        self._camera.stop_streaming()
+                self._set_state(CameraState.READY)
+                self._thread_loop()
 
-                    self._handle_frames()
-
-            except Exception as e:
-                self._handle_exception(e)
+        except Exception as e:
+            self._set_state(CameraState.ERROR)
+            self._handle_exception(e)
 
         self._clean_up()
+        if self._state != CameraState.ERROR:
+            self._set_state(CameraState.STOPPED)
+
+    def request_stop(self) -> None:
+        """Ask the thread to stop without waiting for it, e.g. when the camera
+        is gone. quit finishes the teardown once the thread has finished.
+        """
+        self._stop_signal.set()
+        self._wake()
 
     @override
     def quit(self) -> None:
-        """Stops the camera handler thread"""
+        """Stops the camera handler thread, the dispatchers and the frame handlers"""
         logger.info(f"Waiting for frame handler to stop for camera {self._id}")
 
-        if self._stop_signal.occurs():
-            return
-
-        self._stop_signal.set()
+        self.request_stop()
         super().wait()
 
-        for handler in self._handlers:
-            handler.stop()
+        self._stop_dispatchers()
 
     @property
     def id(self) -> str:
         return self._id
 
+    @property
+    def metrics(self) -> CameraMetrics:
+        return self._metrics
+
     @property
     def initialzed(self) -> bool:
         return self._initialized
+
+    @property
+    def capture_profile_applied(self) -> bool:
+        """The settings are reloaded with the capture profile and the requested
+        streaming is restarted, profile_applied is emitted when it becomes True
+        """
+        return self._profile_applied.is_set()
+
+    @property
+    def state(self) -> CameraState:
+        return self._state
@@ -0,0 +1,310 @@
+import threading
+import time
+import numpy as np
+from dataclasses import dataclass, asdict
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram, with the constant relative precision
+    like in the HDR histograms. Values are stored in microseconds, each power
+    of two range is split into SUB_BUCKETS buckets, so the error is below 12.5%.
+    Recording a value is a few integer operations, without allocations.
+    """
+
+    SUB_BITS = 3
+    SUB_BUCKETS = 1 << SUB_BITS
+    MAX_EXPONENT = 30  # about 2^33 us, more than two hours
+
+    def __init__(self) -> None:
+        """Constructor"""
+        self._counts = np.zeros(
+            self.SUB_BUCKETS * (self.MAX_EXPONENT + 1), dtype=np.int64
+        )
+        self._count = 0
+        self._total_us = 0
+        self._max_us = 0
+
+    @classmethod
+    def _bucket(cls, value_us: int) -> int:
+        """Bucket index of the value
+
+        Args:
+            value_us (int): value [us], not negative
+
+        Returns:
+            int: bucket index
+        """
+        if value_us < cls.SUB_BUCKETS:
+            return value_us
+
+        exponent = value_us.bit_length() - cls.SUB_BITS - 1
+        exponent = min(exponent, cls.MAX_EXPONENT - 1)
+        sub_bucket = min((value_us >> exponent) - cls.SUB_BUCKETS, cls.SUB_BUCKETS - 1)
+
+        return cls.SUB_BUCKETS * (exponent + 1) + sub_bucket
+
+    @classmethod
+    def _bucket_value(cls, bucket: int) -> int:
+        """Lowest value of the bucket
+
+        Args:
+            bucket (int): bucket index
+
+        Returns:
+            int: value [us]
+        """
+        if bucket < cls.SUB_BUCKETS:
+            return bucket
+
+        exponent, sub_bucket = divmod(bucket - cls.SUB_BUCKETS, cls.SUB_BUCKETS)
+        return (cls.SUB_BUCKETS + sub_bucket) << exponent
+
+    def record(self, value_ns: int) -> None:
+        """Add the value to the histogram
+
+        Args:
+            value_ns (int): value [ns], negative values are recorded as 0
+        """
+        value_us = max(0, int(value_ns) // 1000)
+        self._counts[self._bucket(value_us)] += 1
+        self._count += 1
+        self._total_us += value_us
+        self._max_us = max(self._max_us, value_us)
+
+    def percentile(self, percent: float) -> float:
+        """Value below which the given percent of the values fall
+
+        Args:
+            percent (float): percent, from 0 to 100
+
+        Returns:
+            float: value [ms], 0.0 if the histogram is empty
+        """
+        if not self._count:
+            return 0.0
+
+        rank = max(1, int(np.ceil(self._count * percent / 100)))
+        bucket = int(np.searchsorted(np.cumsum(self._counts), rank))
+
+        return min(self._bucket_value(bucket), self._max_us) / 1000
+
+    def summary(self) -> dict[str, float]:
+        """Histogram summary, values in milliseconds
+
+        Returns:
+            dict[str, float]: count, mean, p50, p90, p99 and max
+        """
+        mean = self._total_us / self._count / 1000 if self._count else 0.0
+
+        return {
+            "count": self._count,
+            "mean": round(mean, 3),
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self._max_us / 1000,
+        }
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+
+class ClockOffset:
+    """Camera clock to host clock offset, estimated with the minimum of
+    host receive time - camera timestamp. The minimum is the offset plus the
+    shortest transfer time, the latencies are measured above it. The minimum
+    is restarted every WINDOW frames, so the clock drift is followed.
+    """
+
+    WINDOW = 1000
+
+    def __init__(self) -> None:
+        """Constructor"""
+        self._offset = None
+        self._window_min = None
+        self._window_samples = 0
+
+    def update(self, camera_ns: int, host_ns: int) -> None:
+        """Add the frame times
+
+        Args:
+            camera_ns (int): camera timestamp [ns]
+            host_ns (int): host monotonic receive time [ns]
+        """
+        sample = host_ns - camera_ns
+
+        if self._offset is None or sample < self._offset:
+            self._offset = sample
+        if self._window_min is None or sample < self._window_min:
+            self._window_min = sample
+
+        self._window_samples += 1
+        if self._window_samples >= self.WINDOW:
+            self._offset = self._window_min
+            self._window_min = None
+            self._window_samples = 0
+
+    def to_host(self, camera_ns: int) -> int | None:
+        """Convert the camera timestamp to the host monotonic time
+
+        Args:
+            camera_ns (int): camera timestamp [ns]
+
+        Returns:
+            int | None: host time [ns], None if there are no samples yet
+        """
+        if self._offset is None:
+            return None
+
+        return camera_ns + self._offset
+
+
+@dataclass
+class CameraCounters:
+    """Camera pipeline counters"""
+
+    frames_received: int = 0
+    frames_incomplete: int = 0
+    dropped_pool: int = 0  # no free buffer in the frame pool
+    dropped_queue: int = 0  # replaced by a newer frame in the frame queue
+    dropped_handler: int = 0  # processing failed or the handler was too slow
+    queue_depth_max: int = 0  # frames in processing
+    fps: float = 0.0
+
+
+class CameraMetrics:
+    """Per camera pipeline metrics: counters, frame rate, stage times and
+    latencies from the exposure to the display and to the disk.
+
+    .. note::
+        The methods are thread-safe, they are called from the camera,
+        the handler and the GUI threads.
+    """
+
+    FPS_WINDOW_NS = 1_000_000_000
+    HISTOGRAMS = [
+        "encode_time",  # frame encoding in the encoder process
+        "display_time",  # preview downscale in the camera thread
+        "exposure_to_display",
+        "exposure_to_disk",
+    ]
+
+    def __init__(self, camera_id: str) -> None:
+        """Constructor
+
+        Args:
+            camera_id (str): camera id
+        """
+        self._camera_id = camera_id
+        self._lock = threading.Lock()
+        self._counters = CameraCounters()
+        self._clock = ClockOffset()
+        self._histograms = {name: LatencyHistogram() for name in self.HISTOGRAMS}
+        self._fps_window_start = time.monotonic_ns()
+        self._fps_window_frames = 0
+
+    def frame_received(self, camera_ns: int, host_ns: int) -> None:
+        """Count the complete frame and update the clock offset
+
+        Args:
+            camera_ns (int): camera timestamp [ns]
+            host_ns (int): host monotonic receive time [ns]
+        """
+        with self._lock:
+            self._counters.frames_received += 1
+            self._clock.update(camera_ns, host_ns)
+
+            self._fps_window_frames += 1
+            elapsed = host_ns - self._fps_window_start
+            if elapsed >= self.FPS_WINDOW_NS:
+                self._counters.fps = self._fps_window_frames * 1e9 / elapsed
+                self._fps_window_start = host_ns
+                self._fps_window_frames = 0
+
+    def count(self, counter: str, value: int = 1) -> None:
+        """Increase the counter
+
+        Args:
+            counter (str): CameraCounters field name
+            value (int, optional): increment. Defaults to 1.
+        """
+        with self._lock:
+            setattr(self._counters, counter, getattr(self._counters, counter) + value)
+
+    def queue_depth(self, depth: int) -> None:
+        """Record the number of the frames in processing
+
+        Args:
+            depth (int): frames in processing
+        """
+        if depth > self._counters.queue_depth_max:
+            with self._lock:
+                self._counters.queue_depth_max = max(
+                    self._counters.queue_depth_max, depth
+                )
+
+    def record_time(self, histogram: str, duration_ns: int) -> None:
+        """Record the stage duration
+
+        Args:
+            histogram (str): histogram name, see HISTOGRAMS
+            duration_ns (int): duration [ns]
+        """
+        with self._lock:
+            self._histograms[histogram].record(duration_ns)
+
+    def record_latency(self, histogram: str, camera_ns: int, host_ns: int) -> None:
+        """Record the latency from the exposure to the host time
+
+        Args:
+            histogram (str): histogram name, see HISTOGRAMS
+            camera_ns (int): camera timestamp of the frame [ns]
+            host_ns (int): host monotonic time of the event [ns]
+        """
+        with self._lock:
+            exposure_ns = self._clock.to_host(camera_ns)
+            if exposure_ns is not None:
+                self._histograms[histogram].record(host_ns - exposure_ns)
+
+    def snapshot(self) -> dict:
+        """Metrics snapshot, ready to be saved as JSON
+
+        Returns:
+            dict: camera id, counters and histogram summaries
+        """
+        with self._lock:
+            data = {"camera_id": self._camera_id, "time": time.time()}
+            data.update(asdict(self._counters))
+            data.update(
+                {name: hist.summary() for name, hist in self._histograms.items()}
+            )
+
+        return data
+
+    def status_text(self) -> str:
+        """Short status, displayed next to the camera
+
+        Returns:
+            str: frame rate, drops and the display latency
+        """
+        with self._lock:
+            counters = self._counters
+            dropped = (
+                counters.dropped_pool
+                + counters.dropped_queue
+                + counters.dropped_handler
+            )
+            display = self._histograms["exposure_to_display"].percentile(50)
+
+            return (
+                f"{counters.fps:.1f} fps, dropped {dropped}, display {display:.0f} ms"
+            )
+
+    @property
+    def camera_id(self) -> str:
+        return self._camera_id
+
+    @property
+    def counters(self) -> CameraCounters:
+        return self._counters
@@ -1,10 +1,12 @@
+import os
 from typing import override
 from enum import Enum
+from queue import Queue, Empty
 from PySide6.QtCore import QObject, QThread, Signal, QMutex
-from PySide6.QtWidgets import QMessageBox
 from vmbpy import VmbSystem, Camera, CameraEvent
 
 from src.cameras.camera_handler import CameraHandler, logger
+from src.cameras.synthetic_vmb import SyntheticConfig, SyntheticVmbSystem
 from src.utils.qt.thread_event import ThreadEvent
 
 
@@ -18,8 +20,20 @@ class CamerasManagerState(Enum):
 
 
 class CamerasManager(QThread):
+    """Cameras lifecycle thread. The VmbPy camera change callback only queues
+    the events, they are handled by this thread. A missing camera handler is
+    stopped without waiting, camera_removed is emitted once its thread has
+    finished, the receiver finishes the teardown with CameraHandler.quit.
+    """
+
+    EVENT_WAIT_TIMEOUT_S = 0.25
+    # synthetic cameras are used instead of VmbPy, when the variable is set,
+    # e.g. "camera_ids=DEV_1,DEV_2 fps=30", see SyntheticConfig.from_spec
+    SYNTHETIC_CAMERAS_ENV = "MACKI_SYNTHETIC_CAMERAS"
     camera_registered = Signal(CameraHandler)
     camera_missing = Signal(str)  # camera id
+    camera_removed = Signal(CameraHandler)  # missing camera thread finished
+    camera_error = Signal(str)  # error message
 
     def __init__(self, parent: QObject | None = None) -> None:
         super().__init__(parent)
@@ -27,6 +41,12 @@ class CamerasManager(QThread):
         self._menager_state: CamerasManagerState = CamerasManagerState.IDLE
         self._mutex = QMutex()
         self._stop_signal = ThreadEvent()
+        # VmbPy camera change events, handled by the manager thread
+        self._camera_events: Queue[tuple[Camera, CameraEvent]] = Queue()
+        # handlers of the missing cameras, until their threads finish
+        self._retired_handlers: dict[str, CameraHandler] = {}
+        # cameras detected again before the previous handler finished
+        self._pending_cameras: dict[str, Camera] = {}
 
     def _change_state(self, state: CamerasManagerState) -> bool:
         """Changes the state of the cameras menager.
@@ -66,6 +86,11 @@ class CamerasManager(QThread):
         Returns:
             VmbSystem: The VmbSystem instance.
         """
+        spec = os.environ.get(self.SYNTHETIC_CAMERAS_ENV)
+        if spec is not None:
+            logger.warning(f"Using synthetic cameras: {spec}")
+            return SyntheticVmbSystem(SyntheticConfig.from_spec(spec))
+
         return VmbSystem.get_instance()
 
     def _register_available_cameras(self, vmb: VmbSystem) -> bool:
@@ -100,9 +125,13 @@ class CamerasManager(QThread):
         """
         camera_id = camera.get_id()
 
-        if camera_id not in self._cameras_handlers:
+        if camera_id in self._retired_handlers:
+            # the frame handlers are still used by the previous handler
+            logger.info(f"Camera {camera_id} detected, waiting for the old handler")
+            self._pending_cameras[camera_id] = camera
+        elif camera_id not in self._cameras_handlers:
             self._cameras_handlers[camera_id] = CameraHandler(camera)
-            self._cameras_handlers[camera_id].error.connect(self._handle_error)
+            self._cameras_handlers[camera_id].error.connect(self.camera_error)
 
             self.camera_registered.emit(self._cameras_handlers[camera_id])
         else:
@@ -111,35 +140,82 @@ class CamerasManager(QThread):
         # print(self._cameras_handlers)
 
     def _on_camera_missing(self, camera: Camera) -> None:
-        """Handles the camera missing event.
+        """Handles the camera missing event. The handler thread is asked
+        to stop, the other cameras are not blocked by its teardown.
 
         Args:
             camera (Camera): The camera that is missing.
         """
         camera_id = camera.get_id()
+        self._pending_cameras.pop(camera_id, None)
 
         if camera_id in self._cameras_handlers:
-            self._cameras_handlers[camera_id].quit()
+            handler = self._cameras_handlers.pop(camera_id)
+            handler.request_stop()
+            self._retired_handlers[camera_id] = handler
 
-            del self._cameras_handlers[camera_id]
             self.camera_missing.emit(camera_id)
             logger.info(f"Camera {camera_id} removed from the list")
         else:
             logger.warning(f"Camera {camera_id} is not in the list!")
 
+    def _remove_finished_handlers(self) -> None:
+        """Emit camera_removed for the missing cameras handlers which
+        have finished, the cameras detected meanwhile are registered
+        """
+        for camera_id, handler in list(self._retired_handlers.items()):
+            if handler.isRunning():
+                continue
+
+            del self._retired_handlers[camera_id]
+            self.camera_removed.emit(handler)
+            logger.info(f"Camera {camera_id} handler finished")
+
+            if camera_id in self._pending_cameras:
+                self._on_camera_detected(self._pending_cameras.pop(camera_id))
+
     def _camera_change_handler(self, camera: Camera, event: CameraEvent) -> None:
-        """Handles the camera change event.
+        """VmbPy camera change callback, the event is queued for the
+        manager thread, so the VmbPy thread is never blocked.
         By default the lifetime of this callback is limited to the RUNNING
         state,but to leave additional message, a warning log is sent, when
         event was recived on different state than RUNNING
 
         Args:
-            camera_id (str): The id of the camera that changed.
+            camera (Camera): The camera that changed.
+            event (CameraEvent): The camera event.
         """
         logger.info(f"Camera {camera.get_id()} changed")
         if self.get_state() != CamerasManagerState.RUNNING:
             logger.warning("Camera change received in state other than running")
 
+        self._camera_events.put((camera, event))
+
+    def _process_camera_events(self, timeout_s: float) -> None:
+        """Handle the queued camera change events
+
+        Args:
+            timeout_s (float): time to wait for the first event
+        """
+        try:
+            camera, event = self._camera_events.get(timeout=timeout_s)
+        except Empty:
+            return
+
+        while True:
+            self._handle_camera_event(camera, event)
+            try:
+                camera, event = self._camera_events.get_nowait()
+            except Empty:
+                return
+
+    def _handle_camera_event(self, camera: Camera, event: CameraEvent) -> None:
+        """Handles the camera change event.
+
+        Args:
+            camera (Camera): The camera that changed.
+            event (CameraEvent): The camera event.
+        """
         match event:
             case CameraEvent.Detected:
                 self._on_camera_detected(camera)
@@ -151,17 +227,13 @@ class CamerasManager(QThread):
             case CameraEvent.Unknown:
                 logger.warning("Unknown camera event")
 
-    def _start_cameras(self) -> None:
-        """Starts the threads for all the cameras."""
-        for camera_handler in self._cameras_handlers.values():
-            camera_handler.start()
-
     def stop_cameras(self) -> None:
-        for camera_handler in self._cameras_handlers.values():
+        # the handlers are added and removed by the manager thread
+        for camera_handler in list(self._cameras_handlers.values()):
             camera_handler.quit()
 
     def stop_streaming(self) -> None:
-        for camera_handler in self._cameras_handlers.values():
+        for camera_handler in list(self._cameras_handlers.values()):
             camera_handler.stop_streaming()
 
     def _register_vmb_callbacks(self, vmb: VmbSystem) -> None:
@@ -183,25 +255,18 @@ class CamerasManager(QThread):
     def _clean_up_menager(self) -> None:
         """Cleans up the threads for all the cameras."""
         self.stop_cameras()
+        for camera_handler in self._retired_handlers.values():
+            camera_handler.quit()
 
         self._cameras_handlers.clear()
+        self._retired_handlers.clear()
+        self._pending_cameras.clear()
 
     def _wait_until_stop_signal(self):
-        """Waits until the stop signal is received."""
+        """Handles the camera events until the stop signal is received."""
         while not self._stop_signal.occurs():
-            QThread.msleep(250)
-
-    def _handle_error(self, message: str) -> None:
-        """Handles the error message.
-
-        Args:
-            message (str): The error message.
-        """
-        error_dialog = QMessageBox()
-        error_dialog.setWindowTitle("Error")
-        error_dialog.setText(message)
-        error_dialog.setIcon(QMessageBox.Icon.Critical)
-        error_dialog.exec()
+            self._process_camera_events(self.EVENT_WAIT_TIMEOUT_S)
+            self._remove_finished_handlers()
 
     @override
     def run(self) -> None:
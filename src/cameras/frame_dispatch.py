@@ -0,0 +1,206 @@
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+logger = logging.getLogger("cameras")
+
+
+class QueuePolicy(Enum):
+    DROP_OLDEST = "drop_oldest"  # the newest frames are kept, for the previews
+    DROP_NEWEST = "drop_newest"  # the queued frames are kept, for the writers
+
+
+@dataclass(frozen=True)
+class QueueConfig:
+    """Frame queue of a handler, the producer never waits for it. A handler
+    waiting for its own resources, e.g. the encoder, fills the queue instead.
+    """
+
+    depth: int = 1
+    policy: QueuePolicy = QueuePolicy.DROP_OLDEST
+
+
+class FrameQueue:
+    """Bounded thread-safe queue, the policy decides which item is dropped
+    when the queue is full. Dropped items are returned to the producer,
+    so it can release them.
+    """
+
+    def __init__(self, config: QueueConfig) -> None:
+        """Constructor
+
+        Args:
+            config (QueueConfig): queue depth and policy
+
+        Raises:
+            ValueError: depth is lower than 1
+        """
+        if config.depth < 1:
+            raise ValueError("Queue depth must be greater than 0")
+
+        self._config = config
+        self._items: deque = deque()
+        self._condition = threading.Condition()
+        self._closed = False
+
+    def put(self, item: Any) -> Any | None:
+        """Put the item on the queue
+
+        Args:
+            item (Any): queued item
+
+        Returns:
+            Any | None: the dropped item, None if nothing was dropped
+        """
+        with self._condition:
+            if self._closed:
+                return item
+
+            if len(self._items) >= self._config.depth:
+                dropped = self._make_room(item)
+                if dropped is item:
+                    return item
+            else:
+                dropped = None
+
+            self._items.append(item)
+            self._condition.notify()
+
+            return dropped
+
+    def _make_room(self, item: Any) -> Any | None:
+        """Make room for the item in the full queue, the condition must be held
+
+        Args:
+            item (Any): new item
+
+        Returns:
+            Any | None: the dropped item, the new item if it does not fit
+        """
+        match self._config.policy:
+            case QueuePolicy.DROP_OLDEST:
+                return self._items.popleft()
+            case QueuePolicy.DROP_NEWEST:
+                return item
+
+    def get(self, timeout_s: float = None) -> Any | None:
+        """Take the oldest item from the queue
+
+        Args:
+            timeout_s (float, optional): time to wait for the item.
+            Defaults to None, wait until an item arrives or the queue is closed.
+
+        Returns:
+            Any | None: the oldest item, None on timeout or if the queue
+            is closed and empty
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._items or self._closed, timeout_s)
+
+            if not self._items:
+                return None
+
+            return self._items.popleft()
+
+    def close(self) -> None:
+        """Close the queue, the queued items can be still taken"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def config(self) -> QueueConfig:
+        return self._config
+
+
+class HandlerDispatcher:
+    """Passes the frames to a single frame handler from its own thread,
+    so a slow handler does not stall the camera and the other handlers.
+    """
+
+    STOP_TIMEOUT_S = 5
+
+    def __init__(self, handler, name: str, metrics=None) -> None:
+        """Constructor, the thread is started with start
+
+        Args:
+            handler (BasicFrameHandler): frame handler, handler.QUEUE
+            is the queue configuration
+            name (str): thread name
+            metrics (CameraMetrics, optional): camera metrics, the dropped
+            frames are counted. Defaults to None.
+        """
+        self._handler = handler
+        self._metrics = metrics
+        self._queue = FrameQueue(handler.QUEUE)
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self) -> None:
+        """Start the dispatcher thread"""
+        self._thread.start()
+
+    def put(self, frame, info, pooled_frame=None) -> None:
+        """Queue the frame for the handler
+
+        Args:
+            frame (npt.ArrayLike): frame
+            info (FrameInfo): frame metadata
+            pooled_frame (PooledFrame, optional): pooled frame owning the frame
+            buffer, it is retained until the handler is done. Defaults to None.
+        """
+        if pooled_frame is not None:
+            pooled_frame.retain()
+
+        dropped = self._queue.put((frame, info, pooled_frame))
+
+        if dropped is not None:
+            self._release(dropped)
+            if self._metrics:
+                self._metrics.count("dropped_handler")
+        elif self._metrics:
+            self._metrics.queue_depth(len(self._queue))
+
+    @staticmethod
+    def _release(item: tuple) -> None:
+        """Release the pooled frame of the queued item"""
+        pooled_frame = item[2]
+        if pooled_frame is not None:
+            pooled_frame.release()
+
+    def _run(self) -> None:
+        """Thread main loop, the queued frames are passed to the handler
+        until the queue is closed and empty
+        """
+        while (item := self._queue.get()) is not None:
+            frame, info, _ = item
+
+            try:
+                self._handler.add_frame(frame, info)
+            except Exception as e:
+                logger.error(f"Handler {self._handler} failed: {e}")
+            finally:
+                self._release(item)
+
+    def stop(self) -> None:
+        """Stop the thread, the queued frames are passed to the handler first"""
+        self._queue.close()
+
+        if self._thread.is_alive():
+            self._thread.join(self.STOP_TIMEOUT_S)
+            if self._thread.is_alive():
+                logger.error(f"{self._thread.name} did not stop")
+                return
+
+        # the thread was not started, the frames are only released
+        while (item := self._queue.get(0)) is not None:
+            self._release(item)
+
+    @property
+    def queue(self) -> FrameQueue:
+        return self._queue
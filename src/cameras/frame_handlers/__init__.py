@@ -2,3 +2,5 @@ from src.cameras.frame_handlers.basic_frame_handler import BasicFrameHandler
 from src.cameras.frame_handlers.frame_display import FrameDisplay
 from src.cameras.frame_handlers.frame_display_utils import FrameDisplayFormats
 from src.cameras.frame_handlers.video_writer import VideoWriter
+from src.cameras.frame_handlers.raw_frame_writer import RawFrameWriter
+from src.cameras.frame_handlers.frame_sync import FrameSyncGroup, SyncTap
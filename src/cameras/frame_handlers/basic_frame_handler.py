@@ -1,17 +1,44 @@
 import numpy.typing as npt
 import logging
 from PySide6.QtCore import QObject, Signal
+from src.cameras.frame_pool import FrameInfo
+from src.cameras.camera_metrics import CameraMetrics
+from src.cameras.frame_dispatch import QueueConfig
+from src.cameras.frame_processing import CameraOffload, ProcessingConfig
 
 logger = logging.getLogger("handlers")
 
 
 class BasicFrameHandler(QObject):
+    # True - the handler receives the raw camera frames, before processing
+    RAW_FRAMES = False
+    # frames are passed to the handler from its own thread, through this queue
+    QUEUE = QueueConfig()
+
     started = Signal()  # Signal emitted when the handler starts
     stopped = Signal()  # Signal emitted when the handler stops
 
     def __init__(self) -> None:
         """Constructor"""
         super().__init__()
+        self._metrics: CameraMetrics | None = None
+
+    def set_metrics(self, metrics: CameraMetrics) -> None:
+        """Set the metrics of the camera, the handler is registered to
+
+        Args:
+            metrics (CameraMetrics): camera metrics
+        """
+        self._metrics = metrics
+
+    def set_processing(self, config: ProcessingConfig, offload: CameraOffload) -> None:
+        """Set the frame processing of the camera, the handler is registered to.
+        Used by the raw handlers, which store the frames unprocessed.
+
+        Args:
+            config (ProcessingConfig): frame processing configuration
+            offload (CameraOffload): processing steps done by the camera
+        """
 
     def start(self):
         """Start the handler, this method emit the started signal"""
@@ -21,11 +48,12 @@ class BasicFrameHandler(QObject):
         """Stop the handler, this method emit the stopped signal"""
         self.stopped.emit()
 
-    def add_frame(self, frame: npt.ArrayLike):
+    def add_frame(self, frame: npt.ArrayLike, info: FrameInfo = None):
         """Add a frame to the handler
 
         Args:
             frame (npt.ArrayLike): The frame to be handled by the handler
+            info (FrameInfo, optional): The frame metadata. Defaults to None.
 
         Raises:
             NotImplementedError: This method must be implemented
@@ -43,3 +71,13 @@ class BasicFrameHandler(QObject):
             bool: True if the handler is running, False otherwise
         """
         raise NotImplementedError("is_running property must be implemented")
+
+    @property
+    def wants_frames(self) -> bool:
+        """Check if the handler receives the frames, the camera streams
+        while any handler wants the frames
+
+        Returns:
+            bool: True if the frames are passed to the handler
+        """
+        return self.is_running
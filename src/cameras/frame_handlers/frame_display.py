@@ -1,19 +1,31 @@
 import os
+import time
 import cv2
 import numpy as np
 import numpy.typing as npt
 from typing import override
 
-from PySide6.QtCore import Signal, Slot
+from PySide6.QtCore import QMutex, QMutexLocker, Qt, Signal, Slot
 from PySide6.QtGui import QIcon
 
 from src.cameras.frame_handlers.basic_frame_handler import BasicFrameHandler, logger
 from src.utils.qt.image_display_window import ImageDisplayWindow
 
 from src.cameras.frame_handlers.frame_display_utils import FrameDisplayFormats
+from src.cameras.frame_pool import FrameInfo
+from src.cameras.frame_dispatch import QueueConfig, QueuePolicy
 
 
 class FrameDisplay(BasicFrameHandler):
+    """Live preview of the camera frames. Frames are downscaled to the window
+    size in the camera thread and the preview rate is limited, only the newest
+    frame is passed to the GUI thread, the stale ones are dropped.
+    """
+
+    PREVIEW_FPS = 15
+    QUEUE = QueueConfig(1, QueuePolicy.DROP_OLDEST)  # only the newest frame
+    _frame_ready = Signal()
+
     def __init__(
         self,
         name,
@@ -22,20 +34,29 @@ class FrameDisplay(BasicFrameHandler):
         minimum_frame_size: tuple[int, int] = (200, 200),
         image_format: FrameDisplayFormats = FrameDisplayFormats.GRAY,
         icon_path: str = "",
+        preview_fps: float = PREVIEW_FPS,
     ) -> None:
+        super().__init__()
         self.window = ImageDisplayWindow(
             name, default_frame_size, minimum_frame_size, image_format.value
         )
         self.window.close_event.connect(self.stop)
+        self.window.size_changed.connect(self._on_window_size_changed)
 
         self._image_format = image_format
         self._default_image_path = default_image_path
 
+        self._frame_interval_s = 1 / preview_fps
+        self._last_frame_time = 0.0
+        self._target_size = default_frame_size  # window size (width, height)
+        self._frame_mutex = QMutex()
+        self._pending_frame = None  # newest frame, waiting for the GUI thread
+        self._pending_info: FrameInfo | None = None
+        self._frame_ready.connect(self._show_pending_frame, Qt.QueuedConnection)
+
         if icon_path:
             self.window.setWindowIcon(QIcon(icon_path))
 
-        super().__init__()
-
     def generate_init_frame(self) -> npt.ArrayLike:
         """Generate an initial frame to be displayed when the handler starts
 
@@ -47,7 +68,7 @@ class FrameDisplay(BasicFrameHandler):
             img = cv2.imread(self._default_image_path, cv2_format)
 
             # Convert the image to from BGR to RGB if the format is RGB
-            if cv2_format == cv2.IMREAD_COLOR:
+            if self._image_format == FrameDisplayFormats.RGB:
                 img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
         else:
             img = np.zeros((600, 600), np.uint8)
@@ -72,12 +93,73 @@ class FrameDisplay(BasicFrameHandler):
         logger.info(f"Frame display for {self.window.windowTitle()} stopped")
         super().stop()
 
-    @override
-    def add_frame(self, frame: np.ndarray) -> None:
-        """Add a frame to the handler and update the window image if it is open"""
-        if self.is_running:
+    def _downscale(self, frame: np.ndarray) -> np.ndarray:
+        """Downscale the frame to fit the window, keeping the aspect ratio
+
+        Args:
+            frame (np.ndarray): frame
+
+        Returns:
+            np.ndarray: downscaled frame, the frame is returned if it already fits
+        """
+        target_width, target_height = self._target_size
+        height, width = frame.shape[:2]
+        scale = min(target_width / width, target_height / height)
+
+        if scale >= 1:
+            return frame
+
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    @Slot(int, int)
+    def _on_window_size_changed(self, width: int, height: int) -> None:
+        """Window resized slot, the next frames are downscaled to the new size"""
+        self._target_size = (width, height)
+
+    @Slot()
+    def _show_pending_frame(self) -> None:
+        """Display the newest frame, called in the GUI thread"""
+        with QMutexLocker(self._frame_mutex):
+            frame = self._pending_frame
+            info = self._pending_info
+            self._pending_frame = None
+
+        if frame is not None and self.is_running:
             self.window.update_image(frame)
 
+            if self._metrics and info:
+                self._metrics.record_latency(
+                    "exposure_to_display", info.timestamp, time.monotonic_ns()
+                )
+
+    @override
+    def add_frame(self, frame: np.ndarray, info: FrameInfo = None) -> None:
+        """Add a frame to the handler, the frame is downscaled and passed to
+        the window if the window is open and the preview rate allows it
+        """
+        if not self.is_running:
+            return
+
+        now_ns = time.monotonic_ns()
+        now = now_ns / 1e9
+        if now - self._last_frame_time < self._frame_interval_s:
+            return
+        self._last_frame_time = now
+
+        preview = self._downscale(frame)
+        if self._metrics:
+            self._metrics.record_time("display_time", time.monotonic_ns() - now_ns)
+
+        with QMutexLocker(self._frame_mutex):
+            # the GUI thread did not display the previous frame yet, replace it
+            notify = self._pending_frame is None
+            self._pending_frame = preview
+            self._pending_info = info
+
+        if notify:
+            self._frame_ready.emit()
+
     @override
     @property
     def is_running(self) -> bool:
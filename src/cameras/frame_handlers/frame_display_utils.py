@@ -6,12 +6,13 @@ from PySide6.QtGui import QImage
 class FrameDisplayFormats(Enum):
     GRAY = QImage.Format.Format_Grayscale8
     RGB = QImage.Format.Format_RGB888
+    BGR = QImage.Format.Format_BGR888
 
     def to_cv2_format(self) -> int:
         match self:
             case FrameDisplayFormats.GRAY:
                 return cv2.IMREAD_GRAYSCALE
-            case FrameDisplayFormats.RGB:
+            case FrameDisplayFormats.RGB | FrameDisplayFormats.BGR:
                 return cv2.IMREAD_COLOR
             case _:
                 raise ValueError("Invalid format")
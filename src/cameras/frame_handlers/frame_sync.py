@@ -0,0 +1,347 @@
+import math
+import sys
+import time
+import cv2
+import numpy as np
+import numpy.typing as npt
+from dataclasses import replace
+from typing import override
+from PySide6.QtCore import QMutex, QMutexLocker, QObject, Slot
+from src.cameras.frame_handlers.basic_frame_handler import BasicFrameHandler, logger
+from src.cameras.frame_pool import FrameInfo
+from src.cameras.frame_dispatch import QueueConfig, QueuePolicy
+
+
+class SyncTap(BasicFrameHandler):
+    """Frame handler of a single camera in the FrameSyncGroup,
+    it only passes the frames to the group
+    """
+
+    QUEUE = QueueConfig(2, QueuePolicy.DROP_OLDEST)
+
+    def __init__(self, group: "FrameSyncGroup", index: int) -> None:
+        """Constructor, use FrameSyncGroup.taps
+
+        Args:
+            group (FrameSyncGroup): owner group
+            index (int): camera position in the mosaic
+        """
+        self._group = group
+        self._index = index
+        super().__init__()
+
+    @override
+    def add_frame(self, frame: npt.ArrayLike, info: FrameInfo = None) -> None:
+        """Pass the frame to the group"""
+        if info is None:
+            logger.error("Frame sync: frame without metadata")
+            return
+
+        self._group.add_frame(self._index, frame, info)
+
+    @override
+    @property
+    def is_running(self) -> bool:
+        return self._group.is_running
+
+
+class FrameSyncGroup(QObject):
+    """Groups the frames of the cameras with the nearest receive times, within
+    the tolerance, into a single mosaic. The mosaic is passed to one display
+    and an optional writer, instead of a window per camera.
+
+    Frames are downscaled to the tile size in the camera threads, each camera
+    keeps a short history of the tiles. A group is complete when every active
+    camera has an unused tile close enough to the newest frame. Cameras without
+    frames for STALE_TIMEOUT_NS are not waited for, their tiles are black.
+    """
+
+    HISTORY_SIZE = 4  # tiles kept per camera
+    MOSAIC_BUFFERS = 4  # mosaic buffers used in turns, unless an output holds one
+    STALE_TIMEOUT_NS = 1_000_000_000
+    NO_TIME = -1
+
+    def __init__(
+        self,
+        name: str,
+        camera_names: list[str],
+        tile_size: tuple[int, int],
+        tolerance_ms: float,
+        display: BasicFrameHandler,
+        columns: int = 2,
+    ) -> None:
+        """Constructor
+
+        Args:
+            name (str): group name, used as the camera id of the mosaic frames
+            camera_names (list[str]): cameras in the mosaic order
+            tile_size (tuple[int, int]): camera tile size (width, height)
+            tolerance_ms (float): maximum receive time difference in the group
+            display (BasicFrameHandler): mosaic display
+            columns (int, optional): mosaic columns. Defaults to 2.
+        """
+        super().__init__()
+        self._name = name
+        self._camera_names = camera_names
+        self._tile_width, self._tile_height = tile_size
+        self._tolerance_ns = int(tolerance_ms * 1e6)
+        self._columns = columns
+        self._rows = math.ceil(len(camera_names) / columns)
+
+        count = len(camera_names)
+        tile_shape = (self._tile_height, self._tile_width, 3)
+        self._tiles = np.zeros((count, self.HISTORY_SIZE, *tile_shape), np.uint8)
+        self._tile_times = np.full((count, self.HISTORY_SIZE), self.NO_TIME, np.int64)
+        self._next_tile = [0] * count
+        self._last_frame_time = [0] * count  # set when the taps are started
+
+        mosaic_shape = (
+            self._rows * self._tile_height,
+            self._columns * self._tile_width,
+            3,
+        )
+        self._mosaics = [
+            np.zeros(mosaic_shape, np.uint8) for _ in range(self.MOSAIC_BUFFERS)
+        ]
+        self._next_mosaic = 0
+        self._groups = 0
+        self._mutex = QMutex()
+
+        self._display = display
+        self._writer = None
+        self._display.close_event.connect(self.stop)
+        self._taps = [SyncTap(self, index) for index in range(count)]
+        self._taps_running = False
+
+    def set_writer(self, writer: BasicFrameHandler) -> None:
+        """Set the mosaic writer, the frame size must be equal to mosaic_size
+
+        Args:
+            writer (BasicFrameHandler): mosaic writer
+        """
+        self._writer = writer
+
+    def _fit_to_tile(self, frame: npt.NDArray) -> npt.NDArray:
+        """Downscale the frame to fit the tile, keeping the aspect ratio
+
+        Args:
+            frame (npt.NDArray): camera frame
+
+        Returns:
+            npt.NDArray: BGR frame, not bigger than the tile
+        """
+        if frame.ndim == 2 or frame.shape[2] == 1:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+
+        height, width = frame.shape[:2]
+        scale = min(self._tile_width / width, self._tile_height / height, 1)
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+
+        if size == (width, height):
+            return frame
+
+        return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+    def _store_tile(self, index: int, frame: npt.NDArray, time_ns: int) -> None:
+        """Put the frame to the camera tile history, mutex must be locked
+
+        Args:
+            index (int): camera index
+            frame (npt.NDArray): frame fitted to the tile
+            time_ns (int): frame receive time
+        """
+        slot = self._next_tile[index]
+        self._next_tile[index] = (slot + 1) % self.HISTORY_SIZE
+
+        tile = self._tiles[index, slot]
+        tile.fill(0)
+        height, width = frame.shape[:2]
+        y = (self._tile_height - height) // 2
+        x = (self._tile_width - width) // 2
+        tile[y : y + height, x : x + width] = frame
+
+        self._tile_times[index, slot] = time_ns
+        self._last_frame_time[index] = time_ns
+
+    def _match_group(self, time_ns: int) -> list[int | None] | None:
+        """Find the tiles of the group, mutex must be locked
+
+        Args:
+            time_ns (int): receive time of the newest frame
+
+        Returns:
+            list[int | None] | None: tile slot per camera, None for inactive
+            cameras, None if the group is not complete
+        """
+        slots = []
+
+        for index, last_time in enumerate(self._last_frame_time):
+            if time_ns - last_time > self.STALE_TIMEOUT_NS:
+                slots.append(None)
+                continue
+
+            times = self._tile_times[index]
+            differences = np.where(
+                times == self.NO_TIME, np.iinfo(np.int64).max, np.abs(times - time_ns)
+            )
+            slot = int(np.argmin(differences))
+
+            if differences[slot] > self._tolerance_ns:
+                return None
+
+            slots.append(slot)
+
+        return slots
+
+    def _free_mosaic(self) -> npt.NDArray:
+        """Take the next mosaic buffer not referenced by the outputs, e.g. still
+        shown by the display without a copy, mutex must be locked. When all
+        buffers are held, a held buffer is replaced with a new one.
+
+        Returns:
+            npt.NDArray: mosaic buffer
+        """
+        for _ in range(self.MOSAIC_BUFFERS):
+            slot = self._next_mosaic
+            self._next_mosaic = (slot + 1) % self.MOSAIC_BUFFERS
+            # the list and the getrefcount argument are the only references,
+            # the views of the buffer reference it as their base
+            if sys.getrefcount(self._mosaics[slot]) <= 2:
+                return self._mosaics[slot]
+
+        self._mosaics[slot] = np.zeros_like(self._mosaics[slot])
+        return self._mosaics[slot]
+
+    def _compose(self, slots: list[int | None]) -> npt.NDArray:
+        """Copy the group tiles to a free mosaic buffer and mark them as used,
+        mutex must be locked
+
+        Args:
+            slots (list[int | None]): tile slot per camera
+
+        Returns:
+            npt.NDArray: mosaic
+        """
+        mosaic = self._free_mosaic()
+
+        for index, slot in enumerate(slots):
+            row, column = divmod(index, self._columns)
+            y = row * self._tile_height
+            x = column * self._tile_width
+            region = mosaic[y : y + self._tile_height, x : x + self._tile_width]
+
+            if slot is None:
+                region.fill(0)
+            else:
+                region[:] = self._tiles[index, slot]
+                self._tile_times[index, slot] = self.NO_TIME
+
+        return mosaic
+
+    def add_frame(self, index: int, frame: npt.NDArray, info: FrameInfo) -> None:
+        """Add the camera frame, the mosaic is passed to the outputs when
+        the group is complete. Called from the camera threads.
+
+        Args:
+            index (int): camera index
+            frame (npt.NDArray): camera frame
+            info (FrameInfo): frame metadata
+        """
+        if not self.is_running:
+            return
+
+        tile = self._fit_to_tile(frame)
+
+        with QMutexLocker(self._mutex):
+            self._store_tile(index, tile, info.receive_time_ns)
+            slots = self._match_group(info.receive_time_ns)
+
+            if slots is None:
+                return
+
+            mosaic = self._compose(slots)
+            mosaic_info = replace(info, camera_id=self._name, frame_id=self._groups)
+            self._groups += 1
+
+        # the outputs are called without the mutex, so they do not stall
+        # the other cameras, the mosaic buffer is not reused while referenced
+        for output in (self._display, self._writer):
+            if output is not None and output.is_running:
+                output.add_frame(mosaic, mosaic_info)
+
+    def _update_taps(self) -> None:
+        """Start or stop the camera taps, when the group state changed"""
+        if self.is_running == self._taps_running:
+            return
+
+        self._taps_running = self.is_running
+        if self._taps_running:
+            with QMutexLocker(self._mutex):
+                self._tile_times.fill(self.NO_TIME)
+                # all cameras are waited for, until they become stale
+                now = time.monotonic_ns()
+                self._last_frame_time = [now] * len(self._taps)
+
+        for tap in self._taps:
+            if self._taps_running:
+                tap.start()
+            else:
+                tap.stop()
+
+    def start(self) -> None:
+        """Open the mosaic display"""
+        self._display.start()
+        self._update_taps()
+
+    @Slot()
+    def stop(self) -> None:
+        """Close the mosaic display, also called when the window is closed"""
+        if self._display.is_running:
+            self._display.stop()
+        self._update_taps()
+
+    def start_recording(self) -> None:
+        """Start the mosaic writer"""
+        if self._writer is None:
+            return
+
+        self._writer.start()
+        self._update_taps()
+
+    def stop_recording(self) -> None:
+        """Stop the mosaic writer"""
+        if self._writer is None or not self._writer.is_running:
+            return
+
+        self._writer.stop()
+        self._update_taps()
+
+    @property
+    def is_running(self) -> bool:
+        """True if the display or the writer is running"""
+        return self._display.is_running or (
+            self._writer is not None and self._writer.is_running
+        )
+
+    @property
+    def taps(self) -> list[SyncTap]:
+        """Camera frame handlers, in the camera_names order"""
+        return self._taps
+
+    @property
+    def display(self) -> BasicFrameHandler:
+        return self._display
+
+    @property
+    def camera_names(self) -> list[str]:
+        return self._camera_names
+
+    @property
+    def mosaic_size(self) -> tuple[int, int]:
+        """Mosaic size (width, height)"""
+        return self._columns * self._tile_width, self._rows * self._tile_height
+
+    @property
+    def groups(self) -> int:
+        """Number of the completed groups"""
+        return self._groups
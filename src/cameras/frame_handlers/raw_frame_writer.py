@@ -0,0 +1,203 @@
+import os
+import time
+import numpy.typing as npt
+from datetime import datetime
+from typing import override
+from PySide6.QtCore import QMutex
+from src.cameras.frame_handlers.basic_frame_handler import BasicFrameHandler, logger
+from src.cameras.frame_pool import FrameInfo
+from src.cameras.frame_processing import CameraOffload, ProcessingConfig
+from src.cameras.raw_frames import RawChunkWriter, RAW_EXTENSION
+from src.cameras.frame_dispatch import QueueConfig, QueuePolicy
+
+
+class RawFrameWriter(BasicFrameHandler):
+    """Lossless recording of the raw camera frames. Frames are appended to
+    the preallocated memory mapped chunk files, the chunks are encoded
+    afterwards with src.cameras.raw_frames.encode_raw_recording. The chunks
+    store the camera frame processing, so the encode applies it the same way.
+    """
+
+    RAW_FRAMES = True
+    # queued frames hold the camera frame pool buffers
+    QUEUE = QueueConfig(16, QueuePolicy.DROP_NEWEST)
+    FRAMES_PER_CHUNK = 256
+    LOCK_TIMEOUT = 1000
+
+    def __init__(
+        self,
+        name: str,
+        out_folder: str = None,
+        frames_per_chunk: int = FRAMES_PER_CHUNK,
+    ) -> None:
+        """Constructor
+
+        Args:
+            name (str): The name of the recording folder.
+            out_folder (str, optional): The output folder. Defaults to None.
+            frames_per_chunk (int, optional): Frames in a single chunk file.
+            Defaults to FRAMES_PER_CHUNK.
+        """
+        self._name = name
+        self._out_folder = out_folder
+        self._frames_per_chunk = frames_per_chunk
+        self._recording_dir = None
+        self._chunk: RawChunkWriter | None = None
+        self._chunk_index = 0
+        self._chunk_mutex = QMutex()
+        self._processing: tuple[ProcessingConfig, CameraOffload] | None = None
+
+        super().__init__()
+
+    @override
+    def set_processing(self, config: ProcessingConfig, offload: CameraOffload) -> None:
+        """Set the frame processing of the camera, stored in the next chunks
+
+        Args:
+            config (ProcessingConfig): frame processing configuration
+            offload (CameraOffload): processing steps done by the camera
+        """
+        self._processing = (config, offload)
+
+    def _generate_recording_dir(self) -> str:
+        """Generate the recording folder path
+
+        Returns:
+            str: folder path in the format "<out_folder>/<name>_<current_date_time>"
+        """
+        now = datetime.now()
+        name = f"{self._name}_{now.strftime('%Y-%m-%d_%H-%M-%S.%f')}"
+
+        if self._out_folder:
+            return os.path.join(self._out_folder, name)
+
+        return name
+
+    def _open_chunk(self, frame: npt.NDArray, info: FrameInfo) -> None:
+        """Close the current chunk and open the next one
+
+        Args:
+            frame (npt.NDArray): first frame of the chunk
+            info (FrameInfo): first frame metadata
+        """
+        self._close_chunk()
+
+        path = os.path.join(
+            self._recording_dir, f"chunk_{self._chunk_index:05d}{RAW_EXTENSION}"
+        )
+        self._chunk = RawChunkWriter(
+            path,
+            frame.shape,
+            self._frames_per_chunk,
+            str(info.pixel_format),
+            info.camera_id,
+            *(self._processing or ()),
+        )
+        self._chunk_index += 1
+
+    def _close_chunk(self) -> None:
+        """Close the current chunk"""
+        if self._chunk is not None:
+            self._chunk.close()
+            self._chunk = None
+
+    @override
+    def start(self) -> None:
+        """Start the recording, this method creates a new recording folder"""
+        if self.is_running:
+            return
+
+        self._recording_dir = self._generate_recording_dir()
+        os.makedirs(self._recording_dir, exist_ok=True)
+        self._chunk_index = 0
+
+        logger.info(f"Starting raw writer for {self._name}: {self._recording_dir}")
+        super().start()
+
+    @override
+    def stop(self) -> None:
+        """Stop the recording, this method closes the current chunk"""
+        if not self.is_running:
+            logger.warning("Raw frame writer is not running")
+            return
+
+        logger.info(f"Stopping raw writer for {self._name}")
+        if not self._chunk_mutex.tryLock(self.LOCK_TIMEOUT):
+            logger.error("Unable to lock chunk mutex")
+            return
+
+        try:
+            self._close_chunk()
+            self._recording_dir = None
+        finally:
+            self._chunk_mutex.unlock()
+
+        super().stop()
+
+    def shutdown(self) -> None:
+        """Stop the recording if it is running"""
+        if self.is_running:
+            self.stop()
+
+    @override
+    def add_frame(self, frame: npt.ArrayLike, info: FrameInfo = None) -> None:
+        """Append the raw frame to the current chunk
+
+        Args:
+            frame (npt.ArrayLike): The raw frame, valid only during the call.
+            info (FrameInfo, optional): The frame metadata. Defaults to None.
+        """
+        if not self.is_running:
+            return
+
+        if info is None:
+            logger.error(f"Raw writer {self._name}: frame without metadata")
+            return
+
+        if not self._chunk_mutex.tryLock(self.LOCK_TIMEOUT):
+            logger.error("Unable to lock chunk mutex")
+            return
+
+        try:
+            if self._recording_dir is None:
+                return  # stopped in the meantime
+
+            if self._chunk is None or not self._chunk.accepts(frame):
+                self._open_chunk(frame, info)
+
+            self._chunk.append(frame, info)
+            if self._metrics:
+                self._metrics.record_latency(
+                    "exposure_to_disk", info.timestamp, time.monotonic_ns()
+                )
+        except Exception as e:
+            logger.error(f"Exception in raw writer: {e}")
+        finally:
+            self._chunk_mutex.unlock()
+
+    @override
+    @property
+    def is_running(self) -> bool:
+        """Check if the raw frame writer is running."""
+        return self._recording_dir is not None
+
+    def change_output_dir(self, out_dir_path: str) -> bool:
+        """Change the output directory of the raw frame writer.
+
+        Args:
+            out_dir_path (str): The new output directory path.
+
+        Returns:
+            bool: True if the output directory was changed successfully, False otherwise.
+        """
+        if self.is_running:
+            return False
+
+        self._out_folder = out_dir_path
+
+        return True
+
+    @property
+    def recording_dir(self) -> str | None:
+        """Current recording folder, None if the writer is not running"""
+        return self._recording_dir
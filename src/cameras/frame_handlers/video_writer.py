@@ -1,41 +1,90 @@
 import cv2
 import os
+import shutil
 import uuid
 import numpy.typing as npt
 from datetime import datetime
 from typing import override
 from src.cameras.frame_handlers.basic_frame_handler import BasicFrameHandler, logger
-from PySide6.QtCore import QMutex
+from src.cameras.frame_processing import ColorMode
+from src.cameras.video_encoder import VideoEncoder
+from src.cameras.frame_pool import FrameInfo
+from src.cameras.frame_index import index_row
+from src.cameras.frame_dispatch import QueueConfig, QueuePolicy
 
 
 class VideoWriter(BasicFrameHandler):
-    LOCK_TIMEOUT = 1000
+    """Front-end of the video encoder process. Frames are encoded in
+    a separate process, so the encoding does not block the camera thread.
+    Frames of a different size are resized to the video frame size.
+
+    An armed writer keeps the last frames in the encoder process, even when
+    it is not recording. They are written at the start of the next video,
+    so the video starts before the start call.
+    """
+
+    # the writer thread waits for a free encoder slot, the queue takes
+    # the frames meanwhile, the camera thread never waits
+    QUEUE = QueueConfig(32, QueuePolicy.DROP_NEWEST)
+    ENCODER_WAIT_S = 0.1
+    # input color -> cv2 conversion to BGR, None means no conversion
+    BGR_CONVERSIONS = {
+        ColorMode.BGR: None,
+        ColorMode.RGB: cv2.COLOR_RGB2BGR,
+        ColorMode.GRAY: cv2.COLOR_GRAY2BGR,
+    }
 
     def __init__(
-        self, name: str, fps: int, frame_size: tuple[int, int], out_folder: str = None
+        self,
+        name: str,
+        fps: int,
+        frame_size: tuple[int, int],
+        out_folder: str = None,
+        color_mode: ColorMode = ColorMode.RGB,
+        segment_s: float = 0,
+        min_free_mb: int = 0,
     ) -> None:
         """Create a video writer to save frames to a video file.
+        The encoder process is started with the first recording.
 
         Args:
             name (str): The name of the video file.
             fps (int): The frames per second of the video.
             frame_size (tuple[int, int]): The size of the frames.
+            out_folder (str, optional): The output folder. Defaults to None.
+            color_mode (ColorMode, optional): The color of the added frames,
+            BGR frames are written without conversion. Defaults to ColorMode.RGB.
+            segment_s (float, optional): Video segment duration, a new file is
+            started after it. Defaults to 0, a single file per recording.
+            min_free_mb (int, optional): Minimum free disk space, the recording
+            is not started or stopped at the segment switch below it.
+            Defaults to 0, not checked.
         """
-        self._fourcc = cv2.VideoWriter_fourcc(*"mp4v")
-        self._writer = None
         self._name = name
         self._fps = fps
         self._frame_size = frame_size
         self._out_folder = out_folder
-        self._writer_mutex = QMutex()
+        self._color_conversion = self.BGR_CONVERSIONS[color_mode]
+        self._segment_frames = int(segment_s * fps)
+        self._min_free_bytes = min_free_mb * 1024 * 1024
+        self._recording = False
+        self._resized = False  # frames of a different size were resized
+        self._pre_trigger: tuple[int, int] | None = None  # frames, bytes
+
+        width, height = frame_size
+        frame_shape = (
+            (height, width) if color_mode == ColorMode.GRAY else (height, width, 3)
+        )
+        self._encoder = VideoEncoder(
+            name, frame_shape, on_frame_written=self._on_frame_written
+        )
 
         self._check_out_folder()
         super().__init__()
 
     def __del__(self) -> None:
-        """Destructor, release the video writer if it's still running"""
-        if self._writer:
-            self._writer.release()
+        """Destructor, stop the encoder process if it's still running"""
+        self.shutdown()
 
     def _check_out_folder(self) -> None:
         """Check if the output folder exists, if not create it."""
@@ -65,19 +114,73 @@ class VideoWriter(BasicFrameHandler):
 
         return path
 
+    def prepare(self) -> None:
+        """Start the encoder process ahead, so the start does not wait for it"""
+        self._encoder.start_process()
+
+    def arm(self, pre_trigger_s: float, max_mb: int) -> None:
+        """Keep the last seconds of the frames, also after the recordings,
+        the camera streams while the writer is armed
+
+        Args:
+            pre_trigger_s (float): kept time
+            max_mb (int): maximum size of the kept, JPEG compressed, frames
+        """
+        self._pre_trigger = (max(1, int(pre_trigger_s * self._fps)), max_mb * 2**20)
+        self.prepare()
+        if not self._recording:
+            self._encoder.arm(*self._pre_trigger, self._color_conversion)
+
+        logger.info(f"Video writer {self._name} armed, {pre_trigger_s} s kept")
+        self.started.emit()
+
+    def disarm(self) -> None:
+        """Stop keeping the frames"""
+        if self._pre_trigger is None:
+            return
+
+        self._pre_trigger = None
+        if not self._recording:
+            self._encoder.disarm()
+            self.stopped.emit()
+
+    def _has_free_space(self) -> bool:
+        """Check the free disk space in the output folder
+
+        Returns:
+            bool: True if there is more than the minimum free space
+        """
+        free = shutil.disk_usage(self._out_folder or os.getcwd()).free
+        if free < self._min_free_bytes:
+            logger.error(
+                f"Video writer {self._name}: {free // 2**20} MB free, "
+                f"{self._min_free_bytes // 2**20} MB required"
+            )
+            return False
+
+        return True
+
     @override
     def start(self) -> None:
-        """Start the video writer, this method creates a new video"""
-        file_name = self._generate_file_path()
-
-        if self._writer_mutex.tryLock(1000) is False:
-            logger.error("Unable to lock writer mutex")
+        """Start the video writer, this method creates a new video.
+        The video is not started, when there is not enough free disk space.
+        """
+        if not self._has_free_space():
             return
 
-        self._writer = cv2.VideoWriter(
-            file_name, self._fourcc, self._fps, self._frame_size, True
+        file_name = self._generate_file_path()
+
+        self._encoder.start_process()
+        self._encoder.open(
+            file_name,
+            self._fps,
+            self._frame_size,
+            self._color_conversion,
+            self._segment_frames,
+            self._min_free_bytes,
         )
-        self._writer_mutex.unlock()
+        self._recording = True
+        self._resized = False
 
         logger.info(f"Starting video writer for {self._name}, file: {file_name}")
         super().start()
@@ -90,51 +193,93 @@ class VideoWriter(BasicFrameHandler):
             return
 
         logger.info(f"Stopping video writer for {self._name}")
-        if self._writer_mutex.tryLock(self.LOCK_TIMEOUT) is False:
-            return
-
-        self._writer.release()
-        self._writer = None
-        self._writer_mutex.unlock()
+        self._recording = False
+        self._encoder.close()
+        if self._pre_trigger is not None:
+            self._encoder.arm(*self._pre_trigger, self._color_conversion)
 
         super().stop()
 
+    def shutdown(self) -> None:
+        """Stop the encoder process and disarm the writer,
+        the writer can be started again later
+        """
+        self._pre_trigger = None
+        if self.is_running:
+            self.stop()
+
+        self._encoder.shutdown()
+
     @override
-    def add_frame(self, frame: npt.ArrayLike) -> None:
+    def add_frame(self, frame: npt.ArrayLike, info: FrameInfo = None) -> None:
         """Add a frame to the video writer.
 
         Args:
             frame (npt.ArrayLike): The frame to be added to the video.
+            info (FrameInfo, optional): The frame metadata. Defaults to None.
         """
-        if not self._writer:
+        if not self.wants_frames:
             return
 
-        frame_width = frame.shape[1]
-        frame_height = frame.shape[0]
-        if (frame_width != self._frame_size[0]) or (
-            frame_height != self._frame_size[1]
-        ):
-            self.stop()
-            raise RuntimeError(
-                f"Frame size ({frame.shape[1]}, {frame.shape[0]})"
-                f"does not match video frame size {self._frame_size}"
+        frame_size = (frame.shape[1], frame.shape[0])
+        if frame_size != tuple(self._frame_size):
+            if not self._resized:
+                logger.warning(
+                    f"Video writer {self._name}: frame size {frame_size} "
+                    f"resized to {self._frame_size}"
+                )
+                self._resized = True
+            frame = cv2.resize(frame, self._frame_size, interpolation=cv2.INTER_AREA)
+
+        # the color conversion is done in the encoder process
+        try:
+            written = self._encoder.write(
+                frame, index_row(info) if info else None, self.ENCODER_WAIT_S
             )
+            if not written and self._metrics:
+                self._metrics.count("dropped_handler")
+        except Exception as e:
+            logger.error(f"Exception in writer write: {e}")
+
+    def _on_frame_written(
+        self, row: tuple[int, int, int, int], start_ns: int, written_ns: int
+    ) -> None:
+        """Encoder callback, records the encode time and the exposure to disk latency
 
-        frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-        if self._writer_mutex.tryLock(self.LOCK_TIMEOUT):
-            try:
-                if self._writer:
-                    self._writer.write(frame)
-            except Exception:
-                logger.error("Exception in writer write")
-            finally:
-                self._writer_mutex.unlock()
+        Args:
+            row (tuple[int, int, int, int]): frame index row, see frame_index.index_row
+            start_ns (int): encode start monotonic time [ns]
+            written_ns (int): written monotonic time [ns]
+        """
+        if self._metrics:
+            self._metrics.record_time("encode_time", written_ns - start_ns)
+            self._metrics.record_latency("exposure_to_disk", row[1], written_ns)
 
     @override
     @property
     def is_running(self) -> bool:
         """Check if the video writer is running."""
-        return self._writer is not None
+        return self._recording
+
+    @override
+    @property
+    def wants_frames(self) -> bool:
+        """True if the writer is recording or armed"""
+        return self._recording or self._pre_trigger is not None
+
+    @property
+    def armed(self) -> bool:
+        return self._pre_trigger is not None
+
+    @property
+    def dropped_frames(self) -> int:
+        """Frames dropped in the current recording, the encoder was too slow"""
+        return self._encoder.dropped_frames
+
+    @property
+    def back_pressure(self) -> float:
+        """Encoder load, from 0.0 (idle) to 1.0 (frames are dropped)"""
+        return self._encoder.back_pressure
 
     def change_output_dir(self, out_dir_path: str) -> bool:
         """Change the output directory of the video writer.
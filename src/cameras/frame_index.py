@@ -0,0 +1,278 @@
+import csv
+import os
+import numpy as np
+from datetime import datetime
+
+INDEX_EXTENSION = ".csv"
+INDEX_SEPARATOR = ";"  # the same as in the telemetry data.csv
+DATETIME_FORMAT = "%Y-%m-%d_%H-%M-%S.%f"  # the same as in the telemetry data.csv
+INDEX_COLUMNS = [
+    "file_frame",
+    "frame_id",
+    "camera_timestamp_ns",
+    "host_monotonic_ns",
+    "datetime",
+]
+
+
+def index_path(video_path: str) -> str:
+    """Path of the video frame index, next to the video file
+
+    Args:
+        video_path (str): video file path
+
+    Returns:
+        str: index file path
+    """
+    return os.path.splitext(video_path)[0] + INDEX_EXTENSION
+
+
+def index_row(info) -> tuple[int, int, int, int]:
+    """Index data of the frame, small enough to be sent to the encoder process
+
+    Args:
+        info (FrameInfo): frame metadata
+
+    Returns:
+        tuple[int, int, int, int]: frame id, camera timestamp [ns],
+        host monotonic time [ns], host wall time [ns]
+    """
+    return info.frame_id, info.timestamp, info.receive_time_ns, info.wall_time_ns
+
+
+def parse_datetime(text: str) -> float:
+    """Parse the telemetry datetime
+
+    Args:
+        text (str): datetime in the data.csv format
+
+    Returns:
+        float: POSIX time [s]
+    """
+    return datetime.strptime(text, DATETIME_FORMAT).timestamp()
+
+
+class FrameIndexWriter:
+    """Writes one index row per frame written to the video file"""
+
+    def __init__(self, path: str) -> None:
+        """Create the index file
+
+        Args:
+            path (str): index file path
+        """
+        self._path = path
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file, delimiter=INDEX_SEPARATOR)
+        self._writer.writerow(INDEX_COLUMNS)
+
+    def write(
+        self,
+        file_frame: int,
+        frame_id: int,
+        camera_timestamp_ns: int,
+        host_monotonic_ns: int,
+        wall_time_ns: int,
+    ) -> None:
+        """Add the frame to the index
+
+        Args:
+            file_frame (int): frame number in the video file
+            frame_id (int): camera frame id
+            camera_timestamp_ns (int): camera timestamp [ns]
+            host_monotonic_ns (int): host monotonic receive time [ns]
+            wall_time_ns (int): host wall receive time [ns]
+        """
+        wall_time = datetime.fromtimestamp(wall_time_ns / 1e9)
+        self._writer.writerow(
+            [
+                file_frame,
+                frame_id,
+                camera_timestamp_ns,
+                host_monotonic_ns,
+                wall_time.strftime(DATETIME_FORMAT),
+            ]
+        )
+
+    def close(self) -> None:
+        """Close the index file"""
+        if not self._file.closed:
+            self._file.close()
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+
+class FrameIndex:
+    """Video frame index, maps the telemetry time to the video frames.
+    The lookups are binary searches over the sorted frame times.
+    """
+
+    def __init__(
+        self,
+        file_frames: np.ndarray,
+        frame_ids: np.ndarray,
+        camera_timestamps_ns: np.ndarray,
+        host_monotonic_ns: np.ndarray,
+        wall_times: np.ndarray,
+    ) -> None:
+        """Constructor, use FrameIndex.from_file to load the index
+
+        Args:
+            file_frames (np.ndarray): frame numbers in the video file
+            frame_ids (np.ndarray): camera frame ids
+            camera_timestamps_ns (np.ndarray): camera timestamps [ns]
+            host_monotonic_ns (np.ndarray): host monotonic receive times [ns]
+            wall_times (np.ndarray): host wall receive times, POSIX time [s]
+        """
+        self.file_frames = file_frames
+        self.frame_ids = frame_ids
+        self.camera_timestamps_ns = camera_timestamps_ns
+        self.host_monotonic_ns = host_monotonic_ns
+        self.wall_times = wall_times
+
+    @staticmethod
+    def from_file(path: str) -> "FrameIndex":
+        """Load the frame index
+
+        Args:
+            path (str): index file path
+
+        Raises:
+            ValueError: Not a frame index file
+
+        Returns:
+            FrameIndex: frame index
+        """
+        with open(path, newline="") as file:
+            reader = csv.reader(file, delimiter=INDEX_SEPARATOR)
+            if next(reader, None) != INDEX_COLUMNS:
+                raise ValueError(f"{path} is not a frame index file")
+            rows = list(reader)
+
+        columns = list(zip(*rows)) or [()] * len(INDEX_COLUMNS)
+
+        return FrameIndex(
+            np.array(columns[0], np.int64),
+            np.array(columns[1], np.int64),
+            np.array(columns[2], np.int64),
+            np.array(columns[3], np.int64),
+            np.array([parse_datetime(text) for text in columns[4]], np.float64),
+        )
+
+    @staticmethod
+    def _nearest(times: np.ndarray, time: float) -> int:
+        """Position of the nearest time in the sorted times
+
+        Args:
+            times (np.ndarray): sorted times, not empty
+            time (float): searched time
+
+        Returns:
+            int: position of the nearest time
+        """
+        position = int(np.searchsorted(times, time))
+
+        if position == 0:
+            return 0
+        if position == len(times):
+            return position - 1
+        if time - times[position - 1] <= times[position] - time:
+            return position - 1
+
+        return position
+
+    def frame_at(self, time: float | datetime | str) -> int:
+        """Video frame recorded the nearest to the telemetry time
+
+        Args:
+            time (float | datetime | str): POSIX time [s], datetime
+            or a datetime in the data.csv format
+
+        Raises:
+            ValueError: The index is empty
+
+        Returns:
+            int: frame number in the video file
+        """
+        if not len(self):
+            raise ValueError("Frame index is empty")
+
+        if isinstance(time, str):
+            time = parse_datetime(time)
+        elif isinstance(time, datetime):
+            time = time.timestamp()
+
+        return int(self.file_frames[self._nearest(self.wall_times, time)])
+
+    def frame_at_monotonic(self, time_ns: int) -> int:
+        """Video frame received the nearest to the host monotonic time
+
+        Args:
+            time_ns (int): time.monotonic_ns() time
+
+        Raises:
+            ValueError: The index is empty
+
+        Returns:
+            int: frame number in the video file
+        """
+        if not len(self):
+            raise ValueError("Frame index is empty")
+
+        return int(self.file_frames[self._nearest(self.host_monotonic_ns, time_ns)])
+
+    def frames_between(self, start: float, end: float) -> np.ndarray:
+        """Video frames recorded in the time range
+
+        Args:
+            start (float): range start, POSIX time [s]
+            end (float): range end, POSIX time [s], inclusive
+
+        Returns:
+            np.ndarray: frame numbers in the video file
+        """
+        first = np.searchsorted(self.wall_times, start, "left")
+        last = np.searchsorted(self.wall_times, end, "right")
+
+        return self.file_frames[first:last]
+
+    def time_of(self, file_frame: int) -> float:
+        """Wall time of the video frame
+
+        Args:
+            file_frame (int): frame number in the video file
+
+        Raises:
+            IndexError: The frame is not in the index
+
+        Returns:
+            float: POSIX time [s]
+        """
+        position = int(np.searchsorted(self.file_frames, file_frame))
+
+        if position == len(self) or self.file_frames[position] != file_frame:
+            raise IndexError(f"Frame {file_frame} is not in the index")
+
+        return float(self.wall_times[position])
+
+    @property
+    def capture_fps(self) -> float:
+        """Real frame rate, from the camera timestamps"""
+        if len(self) < 2:
+            return 0.0
+
+        duration_ns = self.camera_timestamps_ns[-1] - self.camera_timestamps_ns[0]
+        return (len(self) - 1) * 1e9 / duration_ns if duration_ns else 0.0
+
+    @property
+    def missing_frames(self) -> int:
+        """Frames captured by the camera, but not written to the video"""
+        if len(self) < 2:
+            return 0
+
+        return int(self.frame_ids[-1] - self.frame_ids[0] + 1 - len(self))
+
+    def __len__(self) -> int:
+        return len(self.file_frames)
@@ -0,0 +1,182 @@
+import logging
+from dataclasses import dataclass
+import numpy as np
+import numpy.typing as npt
+from vmbpy import PixelFormat
+from PySide6.QtCore import QMutex, QMutexLocker
+
+logger = logging.getLogger("cameras")
+
+
+@dataclass
+class FrameInfo:
+    """Frame metadata, copied from the VmbPy frame in the frame callback"""
+
+    camera_id: str
+    frame_id: int
+    timestamp: int  # camera timestamp [ns]
+    receive_time_ns: int  # host time.monotonic_ns() of the frame callback
+    pixel_format: PixelFormat
+    wall_time_ns: int = 0  # host time.time_ns() of the frame callback
+
+
+class PooledFrame:
+    """Frame buffer borrowed from the FramePool. The buffer is reference
+    counted, it goes back to the pool when the last owner releases it.
+    """
+
+    def __init__(
+        self, pool: "FramePool", index: int, generation: int, data: npt.NDArray
+    ) -> None:
+        """Constructor, use FramePool.acquire to get a frame
+
+        Args:
+            pool (FramePool): owner pool
+            index (int): buffer index in the pool
+            generation (int): pool generation, used to drop outdated buffers
+            data (npt.NDArray): frame buffer
+        """
+        self._pool = pool
+        self._index = index
+        self._generation = generation
+        self._data = data
+        self._ref_count = 1
+        self.info: FrameInfo | None = None
+
+    def retain(self) -> None:
+        """Add an owner of the frame, each retain needs a release"""
+        with QMutexLocker(self._pool.mutex):
+            if self._ref_count == 0:
+                raise RuntimeError("Frame was already returned to the pool")
+            self._ref_count += 1
+
+    def release(self) -> None:
+        """Remove an owner of the frame, the last release returns
+        the buffer to the pool
+        """
+        with QMutexLocker(self._pool.mutex):
+            if self._ref_count == 0:
+                raise RuntimeError("Frame was already returned to the pool")
+            self._ref_count -= 1
+            if self._ref_count > 0:
+                return
+
+        self._pool._give_back(self._index, self._generation)
+
+    @property
+    def data(self) -> npt.NDArray:
+        """Frame buffer, valid until the frame is released"""
+        return self._data
+
+    @property
+    def ref_count(self) -> int:
+        return self._ref_count
+
+
+class FramePool:
+    """Fixed number of preallocated frame buffers.
+    The buffers are allocated again only when the frame shape changes.
+    """
+
+    DEFAULT_SIZE = 4
+
+    def __init__(self, size: int = DEFAULT_SIZE, dtype: npt.DTypeLike = np.uint8):
+        """Constructor
+
+        Args:
+            size (int, optional): number of buffers. Defaults to DEFAULT_SIZE.
+            dtype (npt.DTypeLike, optional): buffer type. Defaults to np.uint8.
+
+        Raises:
+            ValueError: size is lower than 1
+        """
+        if size < 1:
+            raise ValueError("Pool size must be greater than 0")
+
+        self._size = size
+        self._dtype = np.dtype(dtype)
+        self._shape: tuple[int, ...] | None = None
+        self._buffers: list[npt.NDArray] = []
+        self._free: list[int] = []
+        self._generation = 0
+        self._mutex = QMutex()
+
+    def _allocate(self, shape: tuple[int, ...]) -> None:
+        """Allocate the buffers for the new frame shape, frames borrowed before
+        are not returned to the pool anymore
+
+        Args:
+            shape (tuple[int, ...]): frame shape
+        """
+        logger.info(f"Allocating frame pool {self._size} x {shape}")
+        self._shape = shape
+        self._buffers = [np.empty(shape, self._dtype) for _ in range(self._size)]
+        self._free = list(range(self._size))
+        self._generation += 1
+
+    def reserve(self, size: int) -> None:
+        """Make sure the pool has at least size buffers, the new buffers are
+        added without reallocating the current ones
+
+        Args:
+            size (int): minimum number of buffers
+        """
+        with QMutexLocker(self._mutex):
+            if size <= self._size:
+                return
+
+            if self._shape is not None:
+                new_buffers = [
+                    np.empty(self._shape, self._dtype) for _ in range(size - self._size)
+                ]
+                self._free.extend(range(self._size, size))
+                self._buffers.extend(new_buffers)
+
+            logger.info(f"Frame pool extended from {self._size} to {size} buffers")
+            self._size = size
+
+    def acquire(self, shape: tuple[int, ...]) -> PooledFrame | None:
+        """Borrow a buffer from the pool
+
+        Args:
+            shape (tuple[int, ...]): frame shape
+
+        Returns:
+            PooledFrame | None: frame with the reference count set to 1,
+            None if all buffers are in use
+        """
+        shape = tuple(shape)
+
+        with QMutexLocker(self._mutex):
+            if shape != self._shape:
+                self._allocate(shape)
+
+            if not self._free:
+                return None
+
+            index = self._free.pop()
+            return PooledFrame(self, index, self._generation, self._buffers[index])
+
+    def _give_back(self, index: int, generation: int) -> None:
+        """Return the buffer to the pool
+
+        Args:
+            index (int): buffer index
+            generation (int): pool generation of the buffer
+        """
+        with QMutexLocker(self._mutex):
+            if generation == self._generation:
+                self._free.append(index)
+
+    @property
+    def mutex(self) -> QMutex:
+        return self._mutex
+
+    @property
+    def available(self) -> int:
+        """Number of the free buffers"""
+        return len(self._free)
+
+    @property
+    def size(self) -> int:
+        return self._size
@@ -0,0 +1,347 @@
+import os
+import threading
+import cv2
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from functools import partial
+from typing import Callable
+from vmbpy import PixelFormat
+from src.cameras.frame_pool import PooledFrame
+
+
+class ColorMode(Enum):
+    RGB = "rgb"
+    BGR = "bgr"
+    GRAY = "gray"
+
+
+# flip code -> (horizontal flip, quarter turns counterclockwise),
+# every flip and rotation combination is a rotation of the (flipped) image
+_FLIP_TO_ORIENTATION = {None: (False, 0), 1: (True, 0), 0: (True, 2), -1: (False, 2)}
+_ROTATE_TO_TURNS = {
+    None: 0,
+    cv2.ROTATE_90_COUNTERCLOCKWISE: 1,
+    cv2.ROTATE_180: 2,
+    cv2.ROTATE_90_CLOCKWISE: 3,
+}
+
+
+def _anti_transpose(frame: np.ndarray) -> np.ndarray:
+    """Transpose over the anti-diagonal, the only orientation without a single
+    OpenCV transform. It is needed only when the camera can not reverse the
+    image, e.g. a flip with the 90 degrees rotation. The rotated output is
+    flipped in place, so no second frame is allocated.
+
+    Args:
+        frame (np.ndarray): frame
+
+    Returns:
+        np.ndarray: transformed frame
+    """
+    rotated = cv2.rotate(frame, cv2.ROTATE_90_CLOCKWISE)
+    return cv2.flip(rotated, 0, dst=rotated)
+
+
+# OpenCV orientation transforms, None is the identity, all are single pass
+# but the anti-transpose
+_ORIENTATION_OPS = [
+    None,
+    partial(cv2.rotate, rotateCode=cv2.ROTATE_90_COUNTERCLOCKWISE),
+    partial(cv2.rotate, rotateCode=cv2.ROTATE_180),
+    partial(cv2.rotate, rotateCode=cv2.ROTATE_90_CLOCKWISE),
+    partial(cv2.flip, flipCode=0),
+    partial(cv2.flip, flipCode=1),
+    cv2.transpose,
+    _anti_transpose,
+]
+
+
+@dataclass
+class ProcessingConfig:
+    """Per camera frame processing configuration.
+    The output is the sensor frame cropped, flipped, rotated and resized,
+    the processor reorders and fuses the steps to do the least work.
+    """
+
+    color: ColorMode = ColorMode.BGR  # BGR is written by OpenCV without conversion
+    rotate: int | None = cv2.ROTATE_90_COUNTERCLOCKWISE  # None - no rotation
+    downscale: float = 1.0  # output size factor
+    flip: int | None = None  # cv2.flip code, None - no flip
+    # x, y, width, height on the full sensor, scaled down with the binning
+    crop: tuple[int, int, int, int] | None = None
+    resize: tuple[int, int] | None = None  # output width, height
+    camera_features: bool = True  # move flip and crop to the camera if possible
+
+    def __post_init__(self) -> None:
+        """Validate the configuration
+
+        Raises:
+            ValueError: Invalid configuration
+        """
+        if self.flip not in _FLIP_TO_ORIENTATION:
+            raise ValueError(f"Invalid flip code {self.flip}")
+        if self.rotate not in _ROTATE_TO_TURNS:
+            raise ValueError(f"Invalid rotate code {self.rotate}")
+        if self.downscale <= 0:
+            raise ValueError("Downscale must be greater than 0")
+        if self.resize and self.downscale != 1.0:
+            raise ValueError("Resize and downscale can not be used together")
+        # odd crop would shift the Bayer pattern
+        if self.crop and any(value % 2 for value in self.crop):
+            raise ValueError("Crop values must be even")
+
+    def orientation(self) -> tuple[bool, int]:
+        """Flip and rotation as a single transform
+
+        Returns:
+            tuple[bool, int]: horizontal flip, then quarter turns counterclockwise
+        """
+        flip, turns = _FLIP_TO_ORIENTATION[self.flip]
+        return flip, (turns + _ROTATE_TO_TURNS[self.rotate]) % 4
+
+    def camera_reverse(self) -> tuple[bool, bool]:
+        """Part of the orientation that can be done with ReverseX/ReverseY
+
+        Returns:
+            tuple[bool, bool]: ReverseX, ReverseY
+        """
+        flip, turns = self.orientation()
+
+        if turns % 2:  # 90 degrees rotation is done in software
+            return flip, False
+
+        # flip - ReverseX, 180 rotation - both, flip and 180 rotation - ReverseY
+        if turns == 2:
+            return not flip, True
+
+        return flip, False
+
+
+@dataclass
+class CameraOffload:
+    """Processing steps done by the camera itself"""
+
+    reverse_x: bool = False
+    reverse_y: bool = False
+    roi: bool = False
+
+
+class FrameProcessor:
+    """Converts the raw pooled frames (debayer, rotation, downscale)
+    on a thread pool shared by all cameras. OpenCV releases the GIL,
+    so the frames of different cameras are processed in parallel.
+    """
+
+    MAX_WORKERS = min(4, os.cpu_count() or 1)
+    # (raw pixel format, output color) -> cv2 conversion, None means no conversion
+    CONVERSIONS = {
+        (PixelFormat.BayerRG8, ColorMode.RGB): cv2.COLOR_BayerRGGB2RGB,
+        (PixelFormat.BayerRG8, ColorMode.BGR): cv2.COLOR_BayerRGGB2BGR,
+        (PixelFormat.BayerRG8, ColorMode.GRAY): cv2.COLOR_BayerRGGB2GRAY,
+        (PixelFormat.BayerGR8, ColorMode.RGB): cv2.COLOR_BayerGRBG2RGB,
+        (PixelFormat.BayerGR8, ColorMode.BGR): cv2.COLOR_BayerGRBG2BGR,
+        (PixelFormat.BayerGR8, ColorMode.GRAY): cv2.COLOR_BayerGRBG2GRAY,
+        (PixelFormat.BayerGB8, ColorMode.RGB): cv2.COLOR_BayerGBRG2RGB,
+        (PixelFormat.BayerGB8, ColorMode.BGR): cv2.COLOR_BayerGBRG2BGR,
+        (PixelFormat.BayerGB8, ColorMode.GRAY): cv2.COLOR_BayerGBRG2GRAY,
+        (PixelFormat.BayerBG8, ColorMode.RGB): cv2.COLOR_BayerBGGR2RGB,
+        (PixelFormat.BayerBG8, ColorMode.BGR): cv2.COLOR_BayerBGGR2BGR,
+        (PixelFormat.BayerBG8, ColorMode.GRAY): cv2.COLOR_BayerBGGR2GRAY,
+        (PixelFormat.Mono8, ColorMode.RGB): cv2.COLOR_GRAY2RGB,
+        (PixelFormat.Mono8, ColorMode.BGR): cv2.COLOR_GRAY2BGR,
+        (PixelFormat.Mono8, ColorMode.GRAY): None,
+        (PixelFormat.Rgb8, ColorMode.RGB): None,
+        (PixelFormat.Rgb8, ColorMode.BGR): cv2.COLOR_RGB2BGR,
+        (PixelFormat.Rgb8, ColorMode.GRAY): cv2.COLOR_RGB2GRAY,
+        (PixelFormat.Bgr8, ColorMode.RGB): cv2.COLOR_BGR2RGB,
+        (PixelFormat.Bgr8, ColorMode.BGR): None,
+        (PixelFormat.Bgr8, ColorMode.GRAY): cv2.COLOR_BGR2GRAY,
+    }
+
+    _executor: ThreadPoolExecutor | None = None
+    _executor_lock = threading.Lock()  # camera threads create it at the same time
+
+    def __init__(
+        self, config: ProcessingConfig = None, offload: CameraOffload = None
+    ) -> None:
+        """Constructor, the processing steps are fused into the smallest
+        number of OpenCV calls
+
+        Args:
+            config (ProcessingConfig, optional): processing configuration.
+            Defaults to ProcessingConfig().
+            offload (CameraOffload, optional): steps already done by the camera.
+            Defaults to CameraOffload().
+        """
+        self._config = config or ProcessingConfig()
+        self._offload = offload or CameraOffload()
+        self._orientation_op = self._find_orientation_op()
+
+    def _find_orientation_op(self) -> Callable | None:
+        """Find the single OpenCV transform which gives the configured orientation
+        of the image already reversed by the camera
+
+        Returns:
+            Callable | None: transform, None if nothing has to be done
+        """
+        probe = np.arange(6, dtype=np.uint8).reshape(2, 3)
+
+        expected = probe
+        if self._config.flip is not None:
+            expected = cv2.flip(expected, self._config.flip)
+        if self._config.rotate is not None:
+            expected = cv2.rotate(expected, self._config.rotate)
+
+        received = probe
+        if self._offload.reverse_x:
+            received = cv2.flip(received, 1)
+        if self._offload.reverse_y:
+            received = cv2.flip(received, 0)
+
+        for op in _ORIENTATION_OPS:
+            result = received if op is None else op(received)
+            if result.shape == expected.shape and np.array_equal(result, expected):
+                return op
+
+        raise ValueError(f"Unsupported camera offload {self._offload}")
+
+    def _crop(self, raw: np.ndarray) -> np.ndarray:
+        """Crop the raw frame, without copying
+
+        Args:
+            raw (np.ndarray): raw frame
+
+        Returns:
+            np.ndarray: view of the raw frame
+        """
+        if not self._config.crop or self._offload.roi:
+            return raw
+
+        x, y, width, height = self._config.crop
+        # the crop is in the sensor coordinates, the frame may be reversed
+        if self._offload.reverse_x:
+            x = raw.shape[1] - x - width
+        if self._offload.reverse_y:
+            y = raw.shape[0] - y - height
+
+        return raw[y : y + height, x : x + width]
+
+    def _resize(self, frame: np.ndarray) -> np.ndarray:
+        """Resize the frame, before the orientation transform
+
+        Args:
+            frame (np.ndarray): frame
+
+        Returns:
+            np.ndarray: resized frame
+        """
+        if self._config.resize:
+            width, height = self._config.resize
+            _, turns = self._config.orientation()
+            if turns % 2:  # the frame will be rotated by 90 degrees
+                width, height = height, width
+
+            return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
+
+        if self._config.downscale != 1.0:
+            return cv2.resize(
+                frame,
+                None,
+                fx=self._config.downscale,
+                fy=self._config.downscale,
+                interpolation=cv2.INTER_AREA,
+            )
+
+        return frame
+
+    @classmethod
+    def executor(cls) -> ThreadPoolExecutor:
+        """Thread pool shared by all processors, created on the first use"""
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    cls.MAX_WORKERS, thread_name_prefix="frame_processing"
+                )
+
+            return cls._executor
+
+    def _convert(self, raw: np.ndarray, pixel_format: PixelFormat) -> np.ndarray:
+        """Convert the raw frame to the output color mode
+
+        Args:
+            raw (np.ndarray): raw frame, (height, width, channels)
+            pixel_format (PixelFormat): raw frame pixel format
+
+        Raises:
+            ValueError: unsupported pixel format
+
+        Returns:
+            np.ndarray: converted frame, does not share memory with the raw frame
+        """
+        key = (pixel_format, self._config.color)
+        if key not in self.CONVERSIONS:
+            raise ValueError(f"Unsupported pixel format {pixel_format}")
+
+        code = self.CONVERSIONS[key]
+        if code is not None:
+            return cv2.cvtColor(raw, code)
+
+        if raw.ndim == 3 and raw.shape[2] == 1:
+            return raw[:, :, 0].copy()
+
+        return raw.copy()
+
+    def process_raw(self, raw: np.ndarray, pixel_format: PixelFormat) -> np.ndarray:
+        """Process the raw frame
+
+        Args:
+            raw (np.ndarray): raw frame, (height, width, channels)
+            pixel_format (PixelFormat): raw frame pixel format
+
+        Returns:
+            np.ndarray: processed frame, does not share memory with the raw frame
+        """
+        # crop is a view, only the cropped pixels are converted
+        frame = self._convert(self._crop(raw), pixel_format)
+        # resize first, so the orientation transform works on the smaller frame
+        frame = self._resize(frame)
+
+        if self._orientation_op is not None:
+            frame = self._orientation_op(frame)
+
+        return frame
+
+    def process(self, pooled_frame: PooledFrame) -> np.ndarray:
+        """Process the pooled raw frame, the pooled frame is released
+
+        Args:
+            pooled_frame (PooledFrame): raw frame
+
+        Returns:
+            np.ndarray: processed frame
+        """
+        try:
+            return self.process_raw(pooled_frame.data, pooled_frame.info.pixel_format)
+        finally:
+            pooled_frame.release()
+
+    def submit(self, pooled_frame: PooledFrame) -> Future:
+        """Process the raw frame on the thread pool
+
+        Args:
+            pooled_frame (PooledFrame): raw frame, released by the worker
+
+        Returns:
+            Future: future with the processed frame
+        """
+        return self.executor().submit(self.process, pooled_frame)
+
+    @property
+    def config(self) -> ProcessingConfig:
+        return self._config
+
+    @property
+    def offload(self) -> CameraOffload:
+        return self._offload
@@ -1,11 +1,15 @@
 from PySide6.QtWidgets import QWidget
 from PySide6.QtCore import Slot
 from src.cameras.frame_handlers import BasicFrameHandler
+from src.cameras.frame_processing import ProcessingConfig
+from src.cameras.camera_metrics import CameraMetrics
+from src.cameras.camera_handler import CameraState
 
 
 class QCamera(QWidget):
     HANDLER_DISPLAY = 0
     HANDLER_WRITER = 1
+    HANDLER_SYNC = 2
     HANDLER_UNKNOWN = 99
 
     def __init__(
@@ -14,17 +18,21 @@ class QCamera(QWidget):
         id: str,
         handlers: list[BasicFrameHandler],
         camera_config_file: str = None,
+        processing_config: ProcessingConfig = None,
     ) -> None:
         super().__init__()
 
         self._name = name
         self._id = id
         self._config_file = camera_config_file
+        self._processing_config = processing_config or ProcessingConfig()
         self._handlers = handlers
 
+        self._metrics: CameraMetrics | None = None
         self._detected = False
         self._running = False
         self._initialzed = False
+        self._camera_state = CameraState.STOPPED
 
         self._create_qui_elements()
 
@@ -53,6 +61,14 @@ class QCamera(QWidget):
         """
         self._detected = detected
 
+    def set_metrics(self, metrics: CameraMetrics | None) -> None:
+        """Set the metrics of the camera handler
+
+        Args:
+            metrics (CameraMetrics | None): camera metrics, None if the camera is missing
+        """
+        self._metrics = metrics
+
     @Slot()
     def on_camera_thread_started(self) -> None:
         self._running = True
@@ -66,6 +82,11 @@ class QCamera(QWidget):
     def on_camera_initialized(self) -> None:
         self._initialzed = True
 
+    @Slot(CameraState)
+    def on_camera_state_changed(self, state: CameraState) -> None:
+        self._camera_state = state
+        self._initialzed = state == CameraState.READY
+
     @property
     def name(self) -> str:
         return self._name
@@ -82,6 +103,18 @@ class QCamera(QWidget):
     def config_file(self) -> str:
         return self._config_file
 
+    @property
+    def processing_config(self) -> ProcessingConfig:
+        return self._processing_config
+
     @property
     def initialized(self) -> bool:
         return self._initialzed
+
+    @property
+    def camera_state(self) -> CameraState:
+        return self._camera_state
+
+    @property
+    def metrics(self) -> CameraMetrics | None:
+        return self._metrics
@@ -1,7 +1,9 @@
-from PySide6.QtWidgets import QGroupBox, QVBoxLayout
-from PySide6.QtCore import QTimer
+import json
+from PySide6.QtWidgets import QGroupBox, QMessageBox, QVBoxLayout
+from PySide6.QtCore import QTimer, Signal, Slot
 from src.cameras.cameras_manager import CamerasManager
 from src.cameras.camera_handler import CameraHandler, logger
+from src.cameras.camera_features import CaptureProfile
 from src.cameras.q_camera import (
     QCamera,
 )
@@ -9,15 +11,40 @@ from src.cameras.q_camera import (
 
 class QCamerasManager(QGroupBox):
     STATUS_UPDATE_INTERVAL_MS = 100
-
-    def __init__(self, cameras: list[QCamera], name: str = "Cameras") -> None:
+    METRICS_INTERVAL_MS = 5000
+    capture_profile_applied = Signal(str)  # camera id
+
+    def __init__(
+        self,
+        cameras: list[QCamera],
+        name: str = "Cameras",
+        metrics_file: str = None,
+        capture_profile: CaptureProfile = None,
+    ) -> None:
+        """Constructor
+
+        Args:
+            cameras (list[QCamera]): camera widgets
+            name (str, optional): group box title. Defaults to "Cameras".
+            metrics_file (str, optional): JSON lines file, the camera metrics
+            are appended every METRICS_INTERVAL_MS. Defaults to None, not saved.
+            capture_profile (CaptureProfile, optional): sensor readout settings
+            of all cameras. Defaults to None, the camera config file settings.
+        """
         super().__init__(name)
 
         self._cameras_backend_dict = {camera.id: camera for camera in cameras}
+        # configured camera handlers, started once the start is requested
+        self._camera_handlers: dict[str, CameraHandler] = {}
+        self._start_requested = False
+        self._capture_profile = capture_profile or CaptureProfile()
 
         self._cameras_menager = CamerasManager()
         self._cameras_menager.camera_registered.connect(self._on_camera_registered)
         self._cameras_menager.camera_missing.connect(self._on_camera_missing)
+        self._cameras_menager.camera_removed.connect(self._on_camera_removed)
+        self._cameras_menager.camera_error.connect(self._on_camera_error)
+        self._error_dialog: QMessageBox | None = None
 
         self._init_ui()
 
@@ -25,8 +52,15 @@ class QCamerasManager(QGroupBox):
         self._status_update_timer.timeout.connect(self._update_cameras_status)
         self._status_update_timer.start(self.STATUS_UPDATE_INTERVAL_MS)
 
+        self._metrics_file = metrics_file
+        self._metrics_timer = QTimer()
+        self._metrics_timer.timeout.connect(self._write_metrics)
+        if metrics_file:
+            self._metrics_timer.start(self.METRICS_INTERVAL_MS)
+
     def terminate_threads(self):
         self._status_update_timer.stop()
+        self._metrics_timer.stop()
         self._cameras_menager.quit()
 
         for camera in self._cameras_backend_dict.values():
@@ -53,17 +87,73 @@ class QCamerasManager(QGroupBox):
             camera.register_frame_handler(handler)
 
         camera.set_config_file(self._cameras_backend_dict[id].config_file)
+        camera.set_processing_config(self._cameras_backend_dict[id].processing_config)
+        camera.set_capture_profile(self._capture_profile)
         camera.started.connect(self._cameras_backend_dict[id].on_camera_thread_started)
         camera.finished.connect(
             self._cameras_backend_dict[id].on_camera_thread_finished
         )
-        camera.initialized.connect(self._cameras_backend_dict[id].on_camera_initialized)
+        camera.state_changed.connect(
+            self._cameras_backend_dict[id].on_camera_state_changed
+        )
+        camera.profile_applied.connect(self.capture_profile_applied)
 
+        self._cameras_backend_dict[id].set_metrics(camera.metrics)
         self._cameras_backend_dict[id].set_detected_flag(True)
 
+        self._camera_handlers[id] = camera
+        # e.g. an armed writer, started before the camera was registered
+        handlers = self._cameras_backend_dict[id].handlers.values()
+        if any(handler.wants_frames for handler in handlers):
+            camera.start_streaming()
+
+        if self._start_requested:
+            # cameras open and load the settings in their own threads
+            camera.start()
+
     def _on_camera_missing(self, camera_id: str) -> None:
         logger.warning(f"Camera {camera_id} missing")
+        self._camera_handlers.pop(camera_id, None)
         self._cameras_backend_dict[camera_id].set_detected_flag(False)
+        self._cameras_backend_dict[camera_id].set_metrics(None)
+
+    @Slot(CameraHandler)
+    def _on_camera_removed(self, camera: CameraHandler) -> None:
+        """Missing camera thread finished, stop its frame handlers
+        in the GUI thread
+        """
+        camera.quit()
+
+    @Slot(str)
+    def _on_camera_error(self, message: str) -> None:
+        """Show the camera error, the dialog is not modal, so the other
+        cameras windows are not blocked. The newest error replaces the text.
+        """
+        if self._error_dialog is None:
+            self._error_dialog = QMessageBox(self)
+            self._error_dialog.setWindowTitle("Camera error")
+            self._error_dialog.setIcon(QMessageBox.Icon.Critical)
+            self._error_dialog.setModal(False)
+
+        self._error_dialog.setText(message)
+        self._error_dialog.show()
+
+    def _write_metrics(self) -> None:
+        """Append the metrics of the detected cameras to the metrics file"""
+        lines = [
+            json.dumps(camera.metrics.snapshot())
+            for camera in self._cameras_backend_dict.values()
+            if camera.metrics is not None
+        ]
+
+        if not lines:
+            return
+
+        try:
+            with open(self._metrics_file, "a") as file:
+                file.write("\n".join(lines) + "\n")
+        except OSError as e:
+            logger.error(f"Unable to write camera metrics: {e}")
 
     def _update_cameras_status(self) -> None:
         for camera in self._cameras_backend_dict.values():
@@ -73,9 +163,44 @@ class QCamerasManager(QGroupBox):
         self._cameras_menager.start()
 
     def start_cameras(self):
-        self._cameras_menager._start_cameras()
+        """Start the registered cameras, the cameras detected later
+        are started as soon as they are registered
+        """
+        self._start_requested = True
+
+        for camera in self._camera_handlers.values():
+            camera.start()
+
+    def set_capture_profile(self, profile: CaptureProfile) -> None:
+        """Change the sensor readout settings of all cameras, the running
+        cameras reload their settings
+
+        Args:
+            profile (CaptureProfile): readout settings
+        """
+        if profile == self._capture_profile:
+            return
+
+        self._capture_profile = profile
+        for camera in self._camera_handlers.values():
+            camera.set_capture_profile(profile)
+
+    def is_capture_profile_applied(self, camera_id: str) -> bool:
+        """Check if the camera streams with the capture profile, otherwise
+        capture_profile_applied is emitted once the camera reloads the settings
+
+        Args:
+            camera_id (str): camera id
+
+        Returns:
+            bool: True if applied or the camera is not registered
+        """
+        camera = self._camera_handlers.get(camera_id)
+
+        return camera is None or camera.capture_profile_applied
 
     def stop_cameras(self):
+        self._start_requested = False
         self._cameras_menager.stop_cameras()
 
     def stop_cameras_streaming(self):
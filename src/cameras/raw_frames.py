@@ -0,0 +1,539 @@
+import dataclasses
+import glob
+import logging
+import os
+import struct
+import cv2
+import numpy as np
+import numpy.typing as npt
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from vmbpy import PixelFormat
+from src.cameras.frame_pool import FrameInfo
+from src.cameras.frame_index import FrameIndexWriter, index_path
+from src.cameras.frame_processing import (
+    CameraOffload,
+    ColorMode,
+    FrameProcessor,
+    ProcessingConfig,
+)
+from src.cameras.video_encoder import segment_path
+
+logger = logging.getLogger("raw_frames")
+
+RAW_EXTENSION = ".raw"
+FILE_MAGIC = b"MACKIRAW"
+FILE_VERSION = 2  # version 1 has no processing
+# magic, version, channels, width, height, capacity, frame count,
+# pixel format, camera id
+FILE_HEADER = struct.Struct("<8sHHIIII16s32s")
+# flags, color, rotate, flip, downscale, crop, resize; after the file header
+PROCESSING_HEADER = struct.Struct("<BBbbf4I2I")
+FILE_HEADER_SIZE = 128
+FRAME_COUNT_OFFSET = 24  # frame count position in the file header
+FRAME_COUNT = struct.Struct("<I")
+NO_CODE = -128  # rotate or flip code None
+FALLBACK_FPS = 30  # when the fps can not be estimated from the timestamps
+FRAMES_AHEAD = 2 * FrameProcessor.MAX_WORKERS  # frames processed ahead of the writer
+
+
+class _Flags:
+    """Processing header flags"""
+
+    PROCESSING = 1  # the processing is stored
+    CAMERA_FEATURES = 2
+    REVERSE_X = 4
+    REVERSE_Y = 8
+    ROI = 16
+
+
+def _pack_processing(
+    processing: ProcessingConfig | None, offload: CameraOffload | None
+) -> bytes:
+    """Pack the processing of the frames to the file format
+
+    Args:
+        processing (ProcessingConfig | None): processing, None if unknown
+        offload (CameraOffload | None): steps done by the camera
+
+    Returns:
+        bytes: packed processing header
+    """
+    if processing is None:
+        return PROCESSING_HEADER.pack(0, 0, 0, 0, 1.0, 0, 0, 0, 0, 0, 0)
+
+    offload = offload or CameraOffload()
+    flags = _Flags.PROCESSING
+    for enabled, flag in (
+        (processing.camera_features, _Flags.CAMERA_FEATURES),
+        (offload.reverse_x, _Flags.REVERSE_X),
+        (offload.reverse_y, _Flags.REVERSE_Y),
+        (offload.roi, _Flags.ROI),
+    ):
+        if enabled:
+            flags |= flag
+
+    return PROCESSING_HEADER.pack(
+        flags,
+        list(ColorMode).index(processing.color),
+        NO_CODE if processing.rotate is None else processing.rotate,
+        NO_CODE if processing.flip is None else processing.flip,
+        processing.downscale,
+        *(processing.crop or (0, 0, 0, 0)),
+        *(processing.resize or (0, 0)),
+    )
+
+
+def _unpack_processing(
+    buffer: bytes,
+) -> tuple[ProcessingConfig | None, CameraOffload | None]:
+    """Unpack the processing of the frames from the file
+
+    Args:
+        buffer (bytes): file data
+
+    Returns:
+        tuple[ProcessingConfig | None, CameraOffload | None]: processing and
+        the steps done by the camera, None if not stored
+    """
+    flags, color, rotate, flip, downscale, *sizes = PROCESSING_HEADER.unpack_from(
+        buffer, FILE_HEADER.size
+    )
+    if not flags & _Flags.PROCESSING:
+        return None, None
+
+    crop, resize = tuple(sizes[:4]), tuple(sizes[4:])
+    processing = ProcessingConfig(
+        list(ColorMode)[color],
+        None if rotate == NO_CODE else rotate,
+        downscale,
+        None if flip == NO_CODE else flip,
+        crop if any(crop) else None,
+        resize if any(resize) else None,
+        bool(flags & _Flags.CAMERA_FEATURES),
+    )
+    offload = CameraOffload(
+        bool(flags & _Flags.REVERSE_X),
+        bool(flags & _Flags.REVERSE_Y),
+        bool(flags & _Flags.ROI),
+    )
+
+    return processing, offload
+
+
+@dataclass
+class RawChunkHeader:
+    """Raw chunk file header"""
+
+    width: int
+    height: int
+    channels: int
+    capacity: int  # maximum number of frames in the chunk
+    frame_count: int
+    pixel_format: str  # VmbPy pixel format name
+    camera_id: str
+    processing: ProcessingConfig | None = None  # None - not stored
+    offload: CameraOffload | None = None  # processing steps done by the camera
+
+    def record_dtype(self) -> np.dtype:
+        """Frame record type: per frame header followed by the frame data,
+        the header is padded to 64 bytes
+
+        Returns:
+            np.dtype: numpy structured type
+        """
+        return np.dtype(
+            [
+                ("timestamp", "<u8"),  # camera timestamp [ns]
+                ("receive_time_ns", "<u8"),  # host monotonic time [ns]
+                ("frame_id", "<u8"),
+                ("camera_id", "S16"),
+                ("wall_time_ns", "<u8"),  # host wall time [ns]
+                ("reserved", "V16"),
+                ("frame", "u1", (self.height, self.width, self.channels)),
+            ]
+        )
+
+    def pack(self) -> bytes:
+        """Pack the header to the file format
+
+        Returns:
+            bytes: packed header
+        """
+        header = FILE_HEADER.pack(
+            FILE_MAGIC,
+            FILE_VERSION,
+            self.channels,
+            self.width,
+            self.height,
+            self.capacity,
+            self.frame_count,
+            self.pixel_format.encode(),
+            self.camera_id.encode(),
+        )
+
+        return header + _pack_processing(self.processing, self.offload)
+
+    @staticmethod
+    def unpack(buffer: bytes) -> "RawChunkHeader":
+        """Unpack the header from the file
+
+        Args:
+            buffer (bytes): file data
+
+        Raises:
+            ValueError: Not a raw chunk file or unsupported version
+
+        Returns:
+            RawChunkHeader: header
+        """
+        (
+            magic,
+            version,
+            channels,
+            width,
+            height,
+            capacity,
+            frame_count,
+            pixel_format,
+            camera_id,
+        ) = FILE_HEADER.unpack_from(buffer, 0)
+
+        if magic != FILE_MAGIC or version not in (1, FILE_VERSION):
+            raise ValueError("Not a raw chunk file or unsupported version")
+
+        processing, offload = None, None
+        if version >= 2:
+            processing, offload = _unpack_processing(buffer)
+
+        return RawChunkHeader(
+            width,
+            height,
+            channels,
+            capacity,
+            frame_count,
+            pixel_format.rstrip(b"\0").decode(),
+            camera_id.rstrip(b"\0").decode(),
+            processing,
+            offload,
+        )
+
+
+def _allocate_file(path: str, size: int) -> None:
+    """Create the file with its disk space allocated, so the writes
+    do not fail on a full disk and the file is not fragmented
+
+    Args:
+        path (str): file path
+        size (int): file size
+
+    Raises:
+        OSError: Unable to allocate the space, e.g. not enough free space
+    """
+    with open(path, "wb") as file:
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(file.fileno(), 0, size)
+        else:
+            # not sparse on the Windows file systems, the space is allocated
+            file.truncate(size)
+
+
+class RawChunkWriter:
+    """Preallocated memory mapped file with a fixed number of raw frames.
+    Appending a frame is a single copy to the mapped memory, the operating
+    system writes the pages to the disk sequentially.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        frame_shape: tuple[int, ...],
+        capacity: int,
+        pixel_format: str,
+        camera_id: str,
+        processing: ProcessingConfig = None,
+        offload: CameraOffload = None,
+    ) -> None:
+        """Create the chunk file
+
+        Args:
+            path (str): chunk file path
+            frame_shape (tuple[int, ...]): raw frame shape (height, width[, channels])
+            capacity (int): maximum number of frames
+            pixel_format (str): VmbPy pixel format name
+            camera_id (str): camera id
+            processing (ProcessingConfig, optional): processing of the frames,
+            used by the offline encode. Defaults to None, not stored.
+            offload (CameraOffload, optional): processing steps done by
+            the camera. Defaults to None, nothing done by the camera.
+        """
+        height, width = frame_shape[:2]
+        channels = frame_shape[2] if len(frame_shape) > 2 else 1
+        self._path = path
+        self._frame_shape = tuple(frame_shape)
+        self._header = RawChunkHeader(
+            width,
+            height,
+            channels,
+            capacity,
+            0,
+            pixel_format,
+            camera_id,
+            processing,
+            offload,
+        )
+
+        record_dtype = self._header.record_dtype()
+        size = FILE_HEADER_SIZE + capacity * record_dtype.itemsize
+        _allocate_file(path, size)
+        self._mmap = np.memmap(path, np.uint8, "r+", shape=(size,))
+        header = self._header.pack()
+        self._mmap[: len(header)] = np.frombuffer(header, np.uint8)
+        self._records = self._mmap[FILE_HEADER_SIZE:].view(record_dtype)
+
+    def append(self, frame: npt.NDArray, info: FrameInfo) -> None:
+        """Append the frame to the chunk
+
+        Args:
+            frame (npt.NDArray): raw frame
+            info (FrameInfo): frame metadata
+
+        Raises:
+            RuntimeError: Chunk is full
+        """
+        if self.is_full:
+            raise RuntimeError(f"Raw chunk {self._path} is full")
+
+        record = self._records[self._header.frame_count]
+        record["timestamp"] = info.timestamp
+        record["receive_time_ns"] = info.receive_time_ns
+        record["frame_id"] = info.frame_id
+        record["camera_id"] = info.camera_id.encode()
+        record["wall_time_ns"] = info.wall_time_ns
+        record["frame"] = frame.reshape(record["frame"].shape)
+
+        self._header.frame_count += 1
+        # the count is updated every frame, so the chunk is readable after a crash
+        FRAME_COUNT.pack_into(self._mmap, FRAME_COUNT_OFFSET, self._header.frame_count)
+
+    def close(self) -> None:
+        """Flush and close the chunk file"""
+        if self._mmap is None:
+            return
+
+        self._mmap.flush()
+        self._records = None
+        self._mmap = None
+
+    def accepts(self, frame: npt.NDArray) -> bool:
+        """Check if the frame can be appended to the chunk
+
+        Args:
+            frame (npt.NDArray): raw frame
+
+        Returns:
+            bool: True if the chunk is not full and the frame shape matches
+        """
+        return not self.is_full and frame.shape == self._frame_shape
+
+    @property
+    def is_full(self) -> bool:
+        return self._header.frame_count >= self._header.capacity
+
+    @property
+    def frame_count(self) -> int:
+        return self._header.frame_count
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+
+def read_raw_chunk(path: str) -> tuple[RawChunkHeader, np.ndarray]:
+    """Open the raw chunk file, the frames are not loaded to the memory
+
+    Args:
+        path (str): chunk file path
+
+    Returns:
+        tuple[RawChunkHeader, np.ndarray]: header and the memory mapped
+        frame records, see RawChunkHeader.record_dtype
+    """
+    mmap = np.memmap(path, np.uint8, "r")
+    header = RawChunkHeader.unpack(mmap)
+    records = mmap[FILE_HEADER_SIZE:].view(header.record_dtype())
+
+    return header, records[: header.frame_count]
+
+
+def estimate_fps(timestamps_ns: npt.NDArray) -> float:
+    """Average frame rate of the recording, the dropped frames are gaps,
+    so the video plays in the real time
+
+    Args:
+        timestamps_ns (npt.NDArray): camera timestamps [ns] of all frames
+
+    Returns:
+        float: frames per second, FALLBACK_FPS with less than 2 frames
+    """
+    if len(timestamps_ns) < 2:
+        return FALLBACK_FPS
+
+    duration_ns = int(timestamps_ns[-1]) - int(timestamps_ns[0])
+    if duration_ns <= 0:
+        return FALLBACK_FPS
+
+    return (len(timestamps_ns) - 1) * 1e9 / duration_ns
+
+
+def _processor(
+    header: RawChunkHeader, config: ProcessingConfig | None
+) -> FrameProcessor:
+    """Processor of the chunk frames, the video is written in BGR or gray
+
+    Args:
+        header (RawChunkHeader): chunk header
+        config (ProcessingConfig | None): processing of the chunks
+        without the stored one
+
+    Returns:
+        FrameProcessor: frame processor
+    """
+    config = header.processing or config or ProcessingConfig()
+    if config.color == ColorMode.RGB:
+        config = dataclasses.replace(config, color=ColorMode.BGR)
+
+    return FrameProcessor(config, header.offload)
+
+
+class _SegmentWriter:
+    """Video file with its frame index, a new segment is started when
+    the frames do not fit the current one
+    """
+
+    def __init__(self, path: str, fps: float, fourcc: str) -> None:
+        """Constructor, the segment files are opened with the first frame
+
+        Args:
+            path (str): video path, the segments are saved as segment_path(path, n)
+            fps (float): video frames per second
+            fourcc (str): video codec
+        """
+        self._path = path
+        self._fps = fps
+        self._fourcc = cv2.VideoWriter_fourcc(*fourcc)
+        self._writer = None
+        self._index = None
+        self._frame_shape = None
+        self._frames = 0
+        self.paths: list[str] = []
+
+    def write(self, frame: npt.NDArray, record: np.void) -> None:
+        """Write the processed frame and its index row
+
+        Args:
+            frame (npt.NDArray): BGR or gray frame
+            record (np.void): raw frame record
+        """
+        if frame.shape != self._frame_shape:
+            self._open(frame)
+
+        self._writer.write(frame)
+        self._index.write(
+            self._frames,
+            int(record["frame_id"]),
+            int(record["timestamp"]),
+            int(record["receive_time_ns"]),
+            int(record["wall_time_ns"]),
+        )
+        self._frames += 1
+
+    def _open(self, frame: npt.NDArray) -> None:
+        """Start the next segment with the frame size"""
+        self.close()
+
+        path = segment_path(self._path, len(self.paths))
+        size = (frame.shape[1], frame.shape[0])
+        self._writer = cv2.VideoWriter(
+            path, self._fourcc, self._fps, size, frame.ndim == 3
+        )
+        if not self._writer.isOpened():
+            raise OSError(f"Unable to open {path}")
+
+        self._index = FrameIndexWriter(index_path(path))
+        self._frame_shape = frame.shape
+        self._frames = 0
+        self.paths.append(path)
+
+    def close(self) -> None:
+        """Finalise the current segment"""
+        if self._writer is not None:
+            self._writer.release()
+            self._index.close()
+            self._writer = None
+
+
+def encode_raw_recording(
+    folder: str,
+    fps: float = None,
+    config: ProcessingConfig = None,
+    fourcc: str = "mp4v",
+) -> list[str]:
+    """Debayer and encode the raw chunks of the folder, in order, to a single
+    video "<folder>/<folder name>_000.mp4". The frame index is saved next to
+    the video, see frame_index. A new video segment is started only when
+    the frame size changes, e.g. the capture profile was changed.
+
+    The frames are processed with the processing and the camera offload stored
+    in the chunks, on the FrameProcessor thread pool.
+
+    Args:
+        folder (str): raw recording folder
+        fps (float, optional): video frames per second. Defaults to None,
+        estimated from the camera timestamps.
+        config (ProcessingConfig, optional): processing of the chunks without
+        the stored one. Defaults to ProcessingConfig().
+        fourcc (str, optional): video codec. Defaults to "mp4v".
+
+    Returns:
+        list[str]: video files paths, in the frames order
+    """
+    chunks = [
+        read_raw_chunk(path)
+        for path in sorted(glob.glob(os.path.join(folder, "*" + RAW_EXTENSION)))
+    ]
+    logger.info(f"Encoding {len(chunks)} raw chunks from {folder}")
+
+    if fps is None:
+        timestamps = [records["timestamp"] for _, records in chunks]
+        fps = estimate_fps(np.concatenate(timestamps) if timestamps else [])
+
+    name = os.path.basename(os.path.normpath(folder))
+    writer = _SegmentWriter(os.path.join(folder, name + ".mp4"), fps, fourcc)
+    executor = FrameProcessor.executor()
+    pending: deque[tuple[Future, np.void]] = deque()
+
+    try:
+        for header, records in chunks:
+            processor = _processor(header, config)
+            pixel_format = PixelFormat[header.pixel_format]
+
+            for record in records:
+                if len(pending) >= FRAMES_AHEAD:
+                    future, written = pending.popleft()
+                    writer.write(future.result(), written)
+                future = executor.submit(
+                    processor.process_raw, record["frame"], pixel_format
+                )
+                pending.append((future, record))
+
+        while pending:
+            future, record = pending.popleft()
+            writer.write(future.result(), record)
+    finally:
+        for future, _ in pending:
+            future.cancel()
+        writer.close()
+
+    return writer.paths
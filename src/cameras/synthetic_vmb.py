@@ -0,0 +1,378 @@
+import logging
+import random
+import threading
+import time
+import numpy as np
+import numpy.typing as npt
+from collections import deque
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable
+from vmbpy import CameraEvent, FrameStatus, PixelFormat, VmbFeatureError
+
+logger = logging.getLogger("cameras")
+
+
+@dataclass
+class SyntheticConfig:
+    """Synthetic cameras configuration"""
+
+    camera_ids: list[str] = field(default_factory=lambda: ["SYNTHETIC_1"])
+    width: int = 1936
+    height: int = 1216
+    fps: float = 30.0
+    jitter_ms: float = 0.0  # standard deviation of the frame period
+    incomplete_rate: float = 0.0  # part of the frames sent as incomplete
+    load_settings_s: float = 0.0  # load_settings latency
+    hotplug_s: float = 0.0  # a random camera is unplugged and plugged again
+    buffer_count: int = 5  # frames queued for the camera, like in VmbPy
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "SyntheticConfig":
+        """Create the configuration from the text specification
+
+        Args:
+            spec (str): space separated key=value pairs, e.g.
+            "camera_ids=CAM1,CAM2 fps=30 incomplete_rate=0.01"
+
+        Raises:
+            ValueError: Unknown key or invalid value
+
+        Returns:
+            SyntheticConfig: configuration
+        """
+        names = {item.name for item in fields(cls)}
+        values = {}
+
+        for pair in spec.split():
+            key, _, value = pair.partition("=")
+            if key not in names:
+                raise ValueError(f"Unknown synthetic camera setting {key}")
+
+            if key == "camera_ids":
+                values[key] = value.split(",")
+            else:
+                values[key] = type(getattr(cls(), key))(value)
+
+        return cls(**values)
+
+
+class SyntheticFeature:
+    """Camera feature, like the VmbPy feature"""
+
+    def __init__(self, value: Any, writeable: bool = True) -> None:
+        self._value = value
+        self._writeable = writeable
+
+    def get(self) -> Any:
+        return self._value
+
+    def set(self, value: Any) -> None:
+        self._value = type(self._value)(value)
+
+    def is_writeable(self) -> bool:
+        return self._writeable
+
+
+class SyntheticFrame:
+    """Camera frame buffer, like the VmbPy frame"""
+
+    def __init__(self, shape: tuple[int, int], pixel_format: PixelFormat) -> None:
+        self._data = np.empty((*shape, 1), np.uint8)
+        self._pixel_format = pixel_format
+        self._frame_id = 0
+        self._timestamp = 0
+        self._status = FrameStatus.Complete
+
+    def fill(
+        self, pattern: npt.NDArray, frame_id: int, timestamp: int, complete: bool
+    ) -> None:
+        """Write the next frame to the buffer, the pattern is shifted
+        by the frame id, so the encoded frames differ
+
+        Args:
+            pattern (npt.NDArray): base image
+            frame_id (int): frame id
+            timestamp (int): camera timestamp [ns]
+            complete (bool): frame status
+        """
+        np.add(pattern, frame_id % 256, out=self._data, casting="unsafe")
+        self._frame_id = frame_id
+        self._timestamp = timestamp
+        self._status = FrameStatus.Complete if complete else FrameStatus.Incomplete
+
+    def get_id(self) -> int:
+        return self._frame_id
+
+    def get_timestamp(self) -> int:
+        return self._timestamp
+
+    def get_status(self) -> FrameStatus:
+        return self._status
+
+    def get_pixel_format(self) -> PixelFormat:
+        return self._pixel_format
+
+    def get_width(self) -> int:
+        return self._data.shape[1]
+
+    def get_height(self) -> int:
+        return self._data.shape[0]
+
+    def as_numpy_ndarray(self) -> npt.NDArray:
+        return self._data
+
+
+class SyntheticCamera:
+    """Camera generating Bayer frames from its own thread, with the frame
+    rate jitter and incomplete frames. Frames are delivered only when the
+    handler gave a buffer back with queue_frame, like in VmbPy.
+    """
+
+    def __init__(self, camera_id: str, config: SyntheticConfig) -> None:
+        """Constructor
+
+        Args:
+            camera_id (str): camera id
+            config (SyntheticConfig): cameras configuration
+        """
+        self._camera_id = camera_id
+        self._config = config
+        self._features = {
+            "Width": SyntheticFeature(config.width),
+            "Height": SyntheticFeature(config.height),
+            "WidthMax": SyntheticFeature(config.width, writeable=False),
+            "HeightMax": SyntheticFeature(config.height, writeable=False),
+            "OffsetX": SyntheticFeature(0),
+            "OffsetY": SyntheticFeature(0),
+            "ReverseX": SyntheticFeature(False),
+            "ReverseY": SyntheticFeature(False),
+            "PixelFormat": SyntheticFeature(PixelFormat.BayerRG8.name),
+            "BinningHorizontal": SyntheticFeature(1),
+            "BinningVertical": SyntheticFeature(1),
+            "AcquisitionFrameRateEnable": SyntheticFeature(False),
+            "AcquisitionFrameRate": SyntheticFeature(config.fps),
+        }
+        self._lock = threading.Lock()
+        self._free_frames: deque[SyntheticFrame] = deque()
+        self._thread: threading.Thread | None = None
+        self._stop_event = threading.Event()
+        self._random = random.Random(camera_id)
+        self._frames_lost = 0
+
+    def get_id(self) -> str:
+        return self._camera_id
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop_streaming()
+
+    def get_feature_by_name(self, name: str) -> SyntheticFeature:
+        if name not in self._features:
+            raise VmbFeatureError(f"Feature {name} not found")
+        return self._features[name]
+
+    def load_settings(self, file_path: str, persist_type) -> None:
+        """Simulate the settings file loading time"""
+        time.sleep(self._config.load_settings_s)
+
+    def _frame_shape(self) -> tuple[int, int]:
+        """Frame size from the ROI and binning features (height, width)"""
+        binning = self._features["BinningHorizontal"].get()
+        return (
+            self._features["Height"].get() // binning,
+            self._features["Width"].get() // binning,
+        )
+
+    def _frame_rate(self) -> float:
+        """Frame rate, limited by the frame rate features"""
+        if self._features["AcquisitionFrameRateEnable"].get():
+            return min(self._config.fps, self._features["AcquisitionFrameRate"].get())
+
+        return self._config.fps
+
+    def start_streaming(
+        self, handler: Callable, buffer_count: int = None, **kwargs
+    ) -> None:
+        """Start the frame generation thread
+
+        Args:
+            handler (Callable): frame callback (camera, stream, frame)
+            buffer_count (int, optional): frame buffers. Defaults to the config.
+        """
+        if self.is_streaming():
+            return
+
+        shape = self._frame_shape()
+        pixel_format = PixelFormat[self._features["PixelFormat"].get()]
+        self._free_frames = deque(
+            SyntheticFrame(shape, pixel_format)
+            for _ in range(buffer_count or self._config.buffer_count)
+        )
+        # diagonal gradient, so the debayered frames are not flat
+        rows, columns = np.indices(shape, np.uint16)
+        pattern = ((rows + columns) % 256).astype(np.uint8)[..., np.newaxis]
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(handler, pattern),
+            name=f"synthetic_{self._camera_id}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _next_frame(self) -> SyntheticFrame | None:
+        """Take a free frame buffer, None if the handler holds all of them"""
+        with self._lock:
+            if not self._free_frames:
+                self._frames_lost += 1
+                return None
+
+            return self._free_frames.popleft()
+
+    def _run(self, handler: Callable, pattern: npt.NDArray) -> None:
+        """Frame generation loop, with the period jitter
+
+        Args:
+            handler (Callable): frame callback
+            pattern (npt.NDArray): base image
+        """
+        period_s = 1 / self._frame_rate()
+        jitter_s = self._config.jitter_ms / 1000
+        start_ns = time.monotonic_ns()
+        next_time = time.monotonic()
+        frame_id = 0
+
+        while not self._stop_event.is_set():
+            next_time += max(0.0, self._random.gauss(period_s, jitter_s))
+            self._stop_event.wait(max(0.0, next_time - time.monotonic()))
+
+            frame = self._next_frame()
+            if frame is None:
+                continue
+
+            complete = self._random.random() >= self._config.incomplete_rate
+            frame.fill(pattern, frame_id, time.monotonic_ns() - start_ns, complete)
+            frame_id += 1
+
+            try:
+                handler(self, None, frame)
+            except Exception as e:
+                logger.error(f"Synthetic camera {self._camera_id} handler: {e}")
+
+    def queue_frame(self, frame: SyntheticFrame) -> None:
+        """Give the frame buffer back to the camera"""
+        with self._lock:
+            self._free_frames.append(frame)
+
+    def stop_streaming(self) -> None:
+        if self._thread is None:
+            return
+
+        self._stop_event.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def is_streaming(self) -> bool:
+        return self._thread is not None
+
+    @property
+    def frames_lost(self) -> int:
+        """Frames not delivered, because no buffer was given back"""
+        return self._frames_lost
+
+
+class SyntheticVmbSystem:
+    """VmbSystem replacement with the synthetic cameras, for the benchmarks
+    and the tests without the camera hardware
+    """
+
+    def __init__(self, config: SyntheticConfig = None) -> None:
+        """Constructor
+
+        Args:
+            config (SyntheticConfig, optional): cameras configuration.
+            Defaults to SyntheticConfig().
+        """
+        self._config = config or SyntheticConfig()
+        self._cameras = {
+            camera_id: SyntheticCamera(camera_id, self._config)
+            for camera_id in self._config.camera_ids
+        }
+        self._unplugged: dict[str, SyntheticCamera] = {}
+        self._change_handlers: list[Callable] = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._hotplug_thread: threading.Thread | None = None
+
+    def __enter__(self):
+        if self._config.hotplug_s > 0:
+            self._stop_event.clear()
+            self._hotplug_thread = threading.Thread(
+                target=self._hotplug_loop, name="synthetic_hotplug", daemon=True
+            )
+            self._hotplug_thread.start()
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop_event.set()
+        if self._hotplug_thread is not None:
+            self._hotplug_thread.join()
+            self._hotplug_thread = None
+
+    def get_all_cameras(self) -> list[SyntheticCamera]:
+        with self._lock:
+            return list(self._cameras.values())
+
+    def register_camera_change_handler(self, handler: Callable) -> None:
+        self._change_handlers.append(handler)
+
+    def unregister_camera_change_handler(self, handler: Callable) -> None:
+        if handler in self._change_handlers:
+            self._change_handlers.remove(handler)
+
+    def _emit(self, camera: SyntheticCamera, event: CameraEvent) -> None:
+        for handler in list(self._change_handlers):
+            handler(camera, event)
+
+    def unplug(self, camera_id: str) -> None:
+        """Disconnect the camera, the Missing event is emitted
+
+        Args:
+            camera_id (str): camera id
+        """
+        with self._lock:
+            camera = self._cameras.pop(camera_id, None)
+            if camera is None:
+                return
+            self._unplugged[camera_id] = camera
+
+        camera.stop_streaming()
+        self._emit(camera, CameraEvent.Missing)
+
+    def plug(self, camera_id: str) -> None:
+        """Connect the camera again, the Detected event is emitted
+
+        Args:
+            camera_id (str): camera id
+        """
+        with self._lock:
+            camera = self._unplugged.pop(camera_id, None)
+            if camera is None:
+                return
+            self._cameras[camera_id] = camera
+
+        self._emit(camera, CameraEvent.Detected)
+
+    def _hotplug_loop(self) -> None:
+        """Unplug a random camera and plug it again every hotplug_s"""
+        while not self._stop_event.wait(self._config.hotplug_s):
+            camera_id = random.choice(self._config.camera_ids)
+            self.unplug(camera_id)
+            if self._stop_event.wait(self._config.hotplug_s / 2):
+                break
+            self.plug(camera_id)
@@ -0,0 +1,736 @@
+import logging
+import os
+import shutil
+import threading
+import multiprocessing
+import time
+import cv2
+import numpy as np
+import numpy.typing as npt
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable
+from src.cameras.frame_index import FrameIndexWriter, index_path
+
+logger = logging.getLogger("encoder")
+
+
+class EncoderMessage(Enum):
+    # main process -> encoder process
+    OPEN = "open"
+    FRAME = "frame"
+    CLOSE = "close"
+    ARM = "arm"
+    DISARM = "disarm"
+    QUIT = "quit"
+    # encoder process -> main process
+    FREE = "free"
+    OPENED = "opened"
+    CLOSED = "closed"
+    ERROR = "error"
+
+
+class FrameRing:
+    """Last frames before the recording, JPEG compressed, limited
+    by the number of frames and the byte budget
+    """
+
+    def __init__(self, max_frames: int, max_bytes: int, quality: int = 90) -> None:
+        """Constructor
+
+        Args:
+            max_frames (int): maximum number of frames
+            max_bytes (int): maximum size of the compressed frames
+            quality (int, optional): JPEG quality. Defaults to 90.
+        """
+        self._max_frames = max_frames
+        self._max_bytes = max_bytes
+        self._params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+        self._frames: deque[tuple[npt.NDArray, tuple | None]] = deque()
+        self._bytes = 0
+
+    def push(self, frame: npt.NDArray, row: tuple | None, evict: bool = True) -> None:
+        """Compress and add the frame, the oldest frames are removed
+        when the ring is over the limits, the newest frame is always kept
+
+        Args:
+            frame (npt.NDArray): BGR or gray frame
+            row (tuple | None): frame index data
+            evict (bool, optional): remove the oldest frames. Defaults to True.
+
+        Raises:
+            ValueError: Unable to compress the frame
+        """
+        ok, data = cv2.imencode(".jpg", frame, self._params)
+        if not ok:
+            raise ValueError("Unable to compress the frame")
+
+        self._frames.append((data, row))
+        self._bytes += data.nbytes
+
+        while evict and len(self._frames) > 1 and self.over_budget:
+            self._bytes -= self._frames.popleft()[0].nbytes
+
+    def pop(self) -> tuple[npt.NDArray, tuple | None]:
+        """Take the oldest frame
+
+        Returns:
+            tuple[npt.NDArray, tuple | None]: decompressed frame and its index data
+        """
+        data, row = self._frames.popleft()
+        self._bytes -= data.nbytes
+
+        return cv2.imdecode(data, cv2.IMREAD_UNCHANGED), row
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    @property
+    def over_budget(self) -> bool:
+        return len(self._frames) > self._max_frames or self._bytes > self._max_bytes
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+
+@dataclass
+class _Segment:
+    """Opened video file with its frame index"""
+
+    path: str
+    writer: cv2.VideoWriter
+    index: FrameIndexWriter
+
+    def release(self) -> None:
+        """Finalise the video file and close the frame index"""
+        self.writer.release()
+        self.index.close()
+
+    def discard(self) -> None:
+        """Release and remove the unused file"""
+        self.release()
+        for path in (self.path, index_path(self.path)):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def segment_path(path: str, number: int) -> str:
+    """Path of the recording segment
+
+    Args:
+        path (str): recording path
+        number (int): segment number, from 0
+
+    Returns:
+        str: "<path without extension>_<number>.<extension>"
+    """
+    root, extension = os.path.splitext(path)
+    return f"{root}_{number:03d}{extension}"
+
+
+class _EncoderWorker:
+    """Encoder process state, frames are read from the shared memory slots.
+    Long recordings are split into segments, so a crash loses only the last
+    one. The next segment is opened ahead and the finished one is finalised
+    in the background, so the encoding is not stalled on the file operations.
+
+    When armed, the frames are kept in the FrameRing, without a file. They are
+    written at the start of the next recording. The new frames go through
+    the ring, until it is empty, so the frame order is kept.
+    """
+
+    def __init__(self, connection: Connection, slots: npt.NDArray) -> None:
+        """Constructor
+
+        Args:
+            connection (Connection): pipe to the main process
+            slots (npt.NDArray): shared memory frame slots
+        """
+        self._connection = connection
+        self._slots = slots
+        self._background = ThreadPoolExecutor(1, "segments")
+        self._segment: _Segment | None = None
+        self._next_segment: Future | None = None
+        self._settings = None  # path, fourcc, fps, frame size
+        self._segment_frames = 0  # frames per segment, 0 - no segments
+        self._min_free_bytes = 0
+        self._segment_number = 0
+        self._conversion = None
+        self._frames_written = 0
+        self._frames_in_segment = 0
+        self._ring: FrameRing | None = None
+
+    def on_frame(self, slot: int, row: tuple[int, int, int, int] | None) -> None:
+        """Encode the frame, add it to the frame index and give the slot back
+
+        Args:
+            slot (int): frame slot index
+            row (tuple[int, int, int, int] | None): frame index data,
+            see frame_index.index_row, None if not available
+        """
+        written_ns = None
+        start_ns = time.monotonic_ns()
+
+        try:
+            frame = self._slots[slot]
+            if self._conversion is not None:
+                frame = cv2.cvtColor(frame, self._conversion)
+
+            if self._ring is not None and self._segment is None:
+                self._ring.push(frame, row)
+            elif self.backlog:
+                self._ring.push(frame, row, evict=False)
+                while self.backlog and self._ring.over_budget:
+                    self.flush_one()
+            elif self._write(frame, row):
+                written_ns = time.monotonic_ns()
+        except Exception as e:
+            self._connection.send((EncoderMessage.ERROR, str(e)))
+        finally:
+            # the monotonic clock is shared by the processes
+            self._connection.send((EncoderMessage.FREE, slot, start_ns, written_ns))
+
+    def _write(self, frame: npt.NDArray, row: tuple | None) -> bool:
+        """Write the frame to the current segment
+
+        Args:
+            frame (npt.NDArray): BGR or gray frame
+            row (tuple | None): frame index data
+
+        Returns:
+            bool: True if the frame was written
+        """
+        if self._segment_full():
+            self._next()
+
+        if self._segment is None:
+            return False
+
+        self._segment.writer.write(frame)
+        if row is not None:
+            self._segment.index.write(self._frames_in_segment, *row)
+        self._frames_written += 1
+        self._frames_in_segment += 1
+
+        return True
+
+    def flush_one(self) -> None:
+        """Write the oldest frame of the ring to the recording"""
+        try:
+            self._write(*self._ring.pop())
+        except Exception as e:
+            self._connection.send((EncoderMessage.ERROR, str(e)))
+
+    @property
+    def backlog(self) -> bool:
+        """True if the recording is open and the ring has frames to write"""
+        return bool(self._segment is not None and self._ring)
+
+    def on_arm(
+        self, max_frames: int, max_bytes: int, quality: int, conversion: int | None
+    ) -> None:
+        """Keep the frames in the ring until the recording is opened,
+        the frames are converted before they are kept
+        """
+        self._conversion = conversion
+        if self._ring is None:
+            self._ring = FrameRing(max_frames, max_bytes, quality)
+
+    def on_disarm(self) -> None:
+        """Drop the ring"""
+        self._ring = None
+
+    def _segment_full(self) -> bool:
+        """Check if the current segment has all its frames"""
+        return (
+            self._segment is not None
+            and self._segment_frames > 0
+            and self._frames_in_segment >= self._segment_frames
+        )
+
+    def _open_segment(self, number: int) -> _Segment:
+        """Open the video file of the segment
+
+        Args:
+            number (int): segment number
+
+        Raises:
+            OSError: Unable to open the file
+
+        Returns:
+            _Segment: opened segment
+        """
+        path, fourcc, fps, frame_size = self._settings
+        if self._segment_frames:
+            path = segment_path(path, number)
+
+        writer = cv2.VideoWriter(
+            path, cv2.VideoWriter_fourcc(*fourcc), fps, frame_size, True
+        )
+        if not writer.isOpened():
+            raise OSError(f"Unable to open {path}")
+
+        return _Segment(path, writer, FrameIndexWriter(index_path(path)))
+
+    def _has_free_space(self) -> bool:
+        """Check the free disk space in the output directory
+
+        Returns:
+            bool: True if there is more than the minimum free space
+        """
+        directory = os.path.dirname(os.path.abspath(self._settings[0]))
+        return shutil.disk_usage(directory).free >= self._min_free_bytes
+
+    def _next(self) -> None:
+        """Switch to the next segment, opened ahead. The finished segment
+        is finalised in the background.
+        """
+        self._background.submit(self._segment.release)
+        self._segment = None
+
+        if not self._has_free_space():
+            self._discard_next_segment()
+            self._connection.send((EncoderMessage.ERROR, "Low disk space, stopped"))
+            return
+
+        self._segment = self._next_segment.result()
+        self._segment_number += 1
+        self._frames_in_segment = 0
+        self._next_segment = self._background.submit(
+            self._open_segment, self._segment_number + 1
+        )
+        self._connection.send((EncoderMessage.OPENED, self._segment.path))
+
+    def _discard_next_segment(self) -> None:
+        """Remove the segment opened ahead"""
+        if self._next_segment is None:
+            return
+
+        try:
+            self._next_segment.result().discard()
+        except OSError:
+            pass  # the error was reported when the segment was needed
+        self._next_segment = None
+
+    def on_open(
+        self,
+        path: str,
+        fourcc: str,
+        fps: int,
+        frame_size: tuple[int, int],
+        conversion: int | None,
+        segment_frames: int = 0,
+        min_free_bytes: int = 0,
+    ) -> None:
+        """Open a new recording, the previous one is closed"""
+        self.release()
+
+        self._settings = (path, fourcc, fps, frame_size)
+        self._segment_frames = segment_frames
+        self._min_free_bytes = min_free_bytes
+        self._conversion = conversion
+        self._frames_written = 0
+        self._frames_in_segment = 0
+        self._segment_number = 0
+
+        try:
+            self._segment = self._open_segment(0)
+        except OSError as e:
+            self._connection.send((EncoderMessage.ERROR, str(e)))
+            return
+
+        if segment_frames:
+            self._next_segment = self._background.submit(self._open_segment, 1)
+        self._connection.send((EncoderMessage.OPENED, self._segment.path))
+
+    def on_close(self) -> None:
+        """Close the recording, the frames left in the ring are written
+        and the segments are finalised
+        """
+        while self.backlog:
+            self.flush_one()
+
+        self._ring = None
+        self.release()
+        self._connection.send((EncoderMessage.CLOSED, self._frames_written))
+
+    def release(self) -> None:
+        """Finalise the current segment and wait for the background finalisation"""
+        if self._segment is not None:
+            self._segment.release()
+            self._segment = None
+
+        self._discard_next_segment()
+        # the background tasks are done, when the empty task is done
+        self._background.submit(lambda: None).result()
+
+    def shutdown(self) -> None:
+        """Stop the background thread"""
+        self._background.shutdown()
+
+
+def _encoder_worker(
+    connection: Connection,
+    shm_name: str,
+    slot_count: int,
+    slot_shape: tuple[int, ...],
+    dtype: str,
+) -> None:
+    """Encoder process main function. Only the slot indices are received
+    through the pipe, the slot is given back as soon as the frame is encoded.
+
+    Args:
+        connection (Connection): pipe to the main process
+        shm_name (str): shared memory name
+        slot_count (int): number of the frame slots
+        slot_shape (tuple[int, ...]): frame shape
+        dtype (str): frame type
+    """
+    shm = SharedMemory(name=shm_name)
+    slots = np.ndarray((slot_count, *slot_shape), np.dtype(dtype), buffer=shm.buf)
+    worker = _EncoderWorker(connection, slots)
+    handlers = {
+        EncoderMessage.FRAME: worker.on_frame,
+        EncoderMessage.OPEN: worker.on_open,
+        EncoderMessage.CLOSE: worker.on_close,
+        EncoderMessage.ARM: worker.on_arm,
+        EncoderMessage.DISARM: worker.on_disarm,
+    }
+
+    try:
+        while True:
+            # the ring is written when there are no new messages
+            if worker.backlog and not connection.poll():
+                worker.flush_one()
+                continue
+
+            try:
+                message, *args = connection.recv()
+            except EOFError:
+                break  # main process is gone
+
+            if message == EncoderMessage.QUIT:
+                break
+
+            handlers[message](*args)
+    finally:
+        worker.release()
+        worker.shutdown()
+        del worker, slots
+        shm.close()
+
+
+class VideoEncoder:
+    """Video encoder running in a separate process. Frames are copied to
+    the shared memory slots, so the encoding does not hold the GIL of the
+    main process. When all slots are in use after the write timeout,
+    the frame is dropped and counted.
+
+    .. note::
+        The methods are thread-safe.
+    """
+
+    SLOT_COUNT = 8
+    FOURCC = "mp4v"
+    RING_JPEG_QUALITY = 90
+    JOIN_TIMEOUT_S = 5
+
+    def __init__(
+        self,
+        name: str,
+        frame_shape: tuple[int, ...],
+        slot_count: int = SLOT_COUNT,
+        dtype: npt.DTypeLike = np.uint8,
+        on_frame_written: Callable[[tuple, int, int], None] = None,
+    ) -> None:
+        """Constructor, the process is created by start_process
+
+        Args:
+            name (str): encoder name, used in the logs
+            frame_shape (tuple[int, ...]): shape of the encoded frames
+            slot_count (int, optional): number of the shared memory frame slots.
+            Defaults to SLOT_COUNT.
+            dtype (npt.DTypeLike, optional): frame type. Defaults to np.uint8.
+            on_frame_written (Callable[[tuple, int, int], None], optional):
+            called with the frame index row, encode start and written monotonic
+            times [ns], when the encoder gives the slot back. Defaults to None.
+        """
+        self._name = name
+        self._frame_shape = tuple(frame_shape)
+        self._slot_count = slot_count
+        self._dtype = np.dtype(dtype)
+
+        self._lock = threading.Lock()
+        self._process = None
+        self._connection = None
+        self._shm = None
+        self._slots = None
+        self._free_slots: list[int] = []
+        self._slot_rows: list[tuple | None] = [None] * slot_count
+        self._on_frame_written = on_frame_written
+
+        self._frames_sent = 0
+        self._dropped_frames = 0
+        self._frames_written = 0
+
+    def start_process(self) -> None:
+        """Create the shared memory and start the encoder process"""
+        if self.is_alive:
+            return
+
+        frame_bytes = int(np.prod(self._frame_shape)) * self._dtype.itemsize
+        self._shm = SharedMemory(create=True, size=frame_bytes * self._slot_count)
+        self._slots = np.ndarray(
+            (self._slot_count, *self._frame_shape), self._dtype, buffer=self._shm.buf
+        )
+        self._free_slots = list(range(self._slot_count))
+
+        # spawn, so the process does not inherit the Qt and camera threads
+        context = multiprocessing.get_context("spawn")
+        self._connection, child_connection = context.Pipe()
+        self._process = context.Process(
+            target=_encoder_worker,
+            args=(
+                child_connection,
+                self._shm.name,
+                self._slot_count,
+                self._frame_shape,
+                self._dtype.str,
+            ),
+            name=f"encoder_{self._name}",
+            daemon=True,
+        )
+        self._process.start()
+        child_connection.close()
+        logger.info(f"Encoder process started for {self._name}")
+
+    def _handle_message(self, message: EncoderMessage, args: list) -> None:
+        """Handle the message from the encoder process
+
+        Args:
+            message (EncoderMessage): message type
+            args (list): message arguments
+        """
+        match message:
+            case EncoderMessage.FREE:
+                slot, start_ns, written_ns = args
+                self._free_slots.append(slot)
+                row = self._slot_rows[slot]
+                if self._on_frame_written and row and written_ns is not None:
+                    self._on_frame_written(row, start_ns, written_ns)
+            case EncoderMessage.OPENED:
+                logger.info(f"Encoder {self._name} opened {args[0]}")
+            case EncoderMessage.CLOSED:
+                self._frames_written = args[0]
+                logger.info(f"Encoder {self._name} closed, {args[0]} frames written")
+            case EncoderMessage.ERROR:
+                logger.error(f"Encoder {self._name}: {args[0]}")
+
+    def _poll(self) -> None:
+        """Read all messages from the encoder process, lock must be held"""
+        try:
+            while self._connection.poll():
+                message, *args = self._connection.recv()
+                self._handle_message(message, args)
+        except (EOFError, OSError):
+            logger.error(f"Encoder {self._name} process is not responding")
+
+    def _wait_for_free_slot(self, timeout_s: float) -> bool:
+        """Wait until the encoder process gives a slot back, lock must be held
+
+        Args:
+            timeout_s (float): maximum waiting time
+
+        Returns:
+            bool: True if there is a free slot
+        """
+        self._poll()
+        deadline = time.monotonic() + timeout_s
+
+        while not self._free_slots and self.is_alive:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0 or not self._connection.poll(remaining):
+                    break
+            except (EOFError, OSError):
+                break
+            self._poll()
+
+        return bool(self._free_slots)
+
+    def _send(self, *message) -> None:
+        """Send the message to the encoder process
+
+        Raises:
+            RuntimeError: Encoder process is not running
+        """
+        if not self.is_alive:
+            raise RuntimeError(f"Encoder {self._name} process is not running")
+
+        with self._lock:
+            self._poll()
+            self._connection.send(message)
+
+    def open(
+        self,
+        path: str,
+        fps: int,
+        frame_size: tuple[int, int],
+        conversion: int = None,
+        segment_frames: int = 0,
+        min_free_bytes: int = 0,
+    ) -> None:
+        """Open a new video file, the file is opened in the encoder process,
+        so the call does not wait for it
+
+        Args:
+            path (str): video file path
+            fps (int): video frames per second
+            frame_size (tuple[int, int]): video frame size (width, height)
+            conversion (int, optional): cv2 conversion of the frames to BGR,
+            done in the encoder process. Defaults to None.
+            segment_frames (int, optional): frames per segment, the segments are
+            saved as segment_path(path, number). Defaults to 0, single file.
+            min_free_bytes (int, optional): the recording is stopped, when there
+            is less free disk space at the segment switch. Defaults to 0.
+        """
+        self._frames_sent = 0
+        self._dropped_frames = 0
+        self._send(
+            EncoderMessage.OPEN,
+            path,
+            self.FOURCC,
+            fps,
+            frame_size,
+            conversion,
+            segment_frames,
+            min_free_bytes,
+        )
+
+    def write(
+        self,
+        frame: npt.NDArray,
+        row: tuple[int, int, int, int] = None,
+        timeout_s: float = 0,
+    ) -> bool:
+        """Copy the frame to a free slot and pass it to the encoder
+
+        Args:
+            frame (npt.NDArray): frame, with the encoder frame shape
+            row (tuple[int, int, int, int], optional): frame index data,
+            see frame_index.index_row. Defaults to None, frame not indexed.
+            timeout_s (float, optional): time to wait for a free slot.
+            Defaults to 0, the frame is dropped when all slots are in use.
+
+        Raises:
+            ValueError: Invalid frame shape
+
+        Returns:
+            bool: True if the frame was passed, False if it was dropped
+        """
+        if frame.shape != self._frame_shape:
+            raise ValueError(
+                f"Frame shape {frame.shape} does not match encoder {self._frame_shape}"
+            )
+
+        with self._lock:
+            if not self._wait_for_free_slot(timeout_s):
+                self._dropped_frames += 1
+                return False
+
+            slot = self._free_slots.pop()
+            self._slot_rows[slot] = row
+            np.copyto(self._slots[slot], frame)
+            self._connection.send((EncoderMessage.FRAME, slot, row))
+            self._frames_sent += 1
+
+        return True
+
+    def arm(self, max_frames: int, max_bytes: int, conversion: int = None) -> None:
+        """Keep the last frames in the encoder process, they are written
+        at the start of the next video. The frames are passed with write.
+
+        Args:
+            max_frames (int): maximum number of the kept frames
+            max_bytes (int): maximum size of the compressed frames
+            conversion (int, optional): cv2 conversion of the frames to BGR,
+            the same as for the next video. Defaults to None.
+        """
+        self._send(
+            EncoderMessage.ARM,
+            max_frames,
+            max_bytes,
+            self.RING_JPEG_QUALITY,
+            conversion,
+        )
+
+    def disarm(self) -> None:
+        """Drop the kept frames"""
+        self._send(EncoderMessage.DISARM)
+
+    def close(self) -> None:
+        """Close the video file, the queued frames are encoded first.
+        The encoder is disarmed.
+        """
+        self._send(EncoderMessage.CLOSE)
+        if self._dropped_frames:
+            logger.warning(
+                f"Encoder {self._name} dropped {self._dropped_frames} frames"
+            )
+
+    def shutdown(self) -> None:
+        """Stop the encoder process and release the shared memory"""
+        if self._process is None:
+            return
+
+        if self.is_alive:
+            with self._lock:
+                self._connection.send((EncoderMessage.QUIT,))
+            self._process.join(self.JOIN_TIMEOUT_S)
+
+        if self._process.is_alive():
+            logger.error(f"Encoder {self._name} process did not stop, terminating")
+            self._process.terminate()
+
+        with self._lock:
+            self._poll()  # the last messages, e.g. the closed recording
+        self._connection.close()
+        self._slots = None
+        self._shm.close()
+        self._shm.unlink()
+        self._process = None
+        logger.info(f"Encoder process stopped for {self._name}")
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    @property
+    def frames_sent(self) -> int:
+        """Frames passed to the encoder since the file was opened"""
+        return self._frames_sent
+
+    @property
+    def dropped_frames(self) -> int:
+        """Frames dropped since the file was opened, all slots were in use"""
+        return self._dropped_frames
+
+    @property
+    def frames_written(self) -> int:
+        """Frames written to the last closed file"""
+        return self._frames_written
+
+    @property
+    def back_pressure(self) -> float:
+        """Part of the slots waiting for the encoder, 1.0 means frames are dropped"""
+        if not self.is_alive:
+            return 0.0
+
+        with self._lock:
+            self._poll()
+            return 1 - len(self._free_slots) / self._slot_count
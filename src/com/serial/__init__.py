@@ -1,3 +1,8 @@
 from src.com.serial.serial_port import SerialPort, logger
 from src.com.serial.qserial import QSerial
 from src.com.serial.qserial_state import QSerialState, QSerialStateControlThread
+from src.com.serial.serial_callback_bus import (
+    SerialCallbackBus,
+    SerialDirection,
+    SerialEvent,
+)
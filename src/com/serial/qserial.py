@@ -26,7 +26,7 @@ class QSerial(SerialPort):
         self._serial_mutex = QMutex()
 
     @override
-    def write(self, data: str) -> None:
+    def write(self, data: str, reset_buffers: bool = True) -> None:
         """This method writes to the serial port.
 
         .. note::
@@ -34,6 +34,8 @@ class QSerial(SerialPort):
 
         Args:
             data (str): The data to write
+            reset_buffers (bool, optional): drop the unread responses and the
+            unsent data first. Defaults to True.
 
         Raises:
             TimeoutError: Can't write to a serial: unable to lock the mutex
@@ -42,7 +44,30 @@ class QSerial(SerialPort):
             raise TimeoutError("Can't write to a serial: unable to lock the mutex")
 
         try:
-            super().write(data)
+            super().write(data, reset_buffers)
+        finally:
+            self._serial_mutex.unlock()
+
+    @override
+    def set_read_timeout(
+        self, read_timeout_s: float = SerialPort.READ_TIMEOUT_S
+    ) -> None:
+        """This method sets the timeout of the following reads.
+
+        .. note::
+            The method is thread-safe.
+
+        Args:
+            read_timeout_s (float, optional): read timeout. Defaults to READ_TIMEOUT_S.
+
+        Raises:
+            TimeoutError: unable to lock the mutex
+        """
+        if not self._serial_mutex.tryLock(self.SERIAL_LOCK_TIMEOUT_MS):
+            raise TimeoutError("Can't set the read timeout: unable to lock the mutex")
+
+        try:
+            super().set_read_timeout(read_timeout_s)
         finally:
             self._serial_mutex.unlock()
 
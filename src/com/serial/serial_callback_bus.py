@@ -0,0 +1,94 @@
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable
+from PySide6.QtCore import QObject, Qt, Signal
+
+
+class SerialDirection(Enum):
+    RX = "RX"
+    TX = "TX"
+
+
+@dataclass
+class SerialEvent:
+    """Single received or transmitted serial message"""
+
+    direction: SerialDirection
+    message: str
+    timestamp: float = field(default_factory=time.time)
+
+
+class SerialCallbackBus(QObject):
+    """Passes the serial RX/TX callbacks from the I/O thread to the GUI thread.
+
+    The callbacks only append the event to a deque (append and popleft are
+    atomic, so no lock is needed) and wake the bus with a queued signal,
+    at most once per drain. The subscribers receive all events collected
+    since the last drain as a single batch in the bus thread.
+    """
+
+    batch_ready = Signal(list)
+    _wake = Signal()
+
+    def __init__(self, parent: QObject = None) -> None:
+        """Constructor
+
+        Args:
+            parent (QObject, optional): parent object. Defaults to None.
+        """
+        super().__init__(parent)
+        self._events: deque[SerialEvent] = deque()
+        self._scheduled = False
+        self._wake.connect(self._drain, Qt.QueuedConnection)
+
+    def _post(self, direction: SerialDirection, message: str) -> None:
+        """Add the event to the queue and wake the bus if needed
+
+        Args:
+            direction (SerialDirection): message direction
+            message (str): serial message
+        """
+        self._events.append(SerialEvent(direction, message))
+
+        if not self._scheduled:
+            self._scheduled = True
+            self._wake.emit()
+
+    def post_rx(self, message: str) -> None:
+        """RX callback, can be called from any thread
+
+        Args:
+            message (str): received message
+        """
+        self._post(SerialDirection.RX, message)
+
+    def post_tx(self, message: str) -> None:
+        """TX callback, can be called from any thread
+
+        Args:
+            message (str): transmitted message
+        """
+        self._post(SerialDirection.TX, message)
+
+    def _drain(self) -> None:
+        """Emit all queued events as a single batch"""
+        # clear the flag first, events posted during the drain wake the bus again
+        self._scheduled = False
+
+        batch = []
+        while self._events:
+            batch.append(self._events.popleft())
+
+        if batch:
+            self.batch_ready.emit(batch)
+
+    def subscribe(self, callback: Callable[[list[SerialEvent]], None]) -> None:
+        """Subscribe to the events batches
+
+        Args:
+            callback (Callable[[list[SerialEvent]], None]): called in the bus
+            thread with the list of events
+        """
+        self.batch_ready.connect(callback)
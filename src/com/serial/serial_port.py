@@ -81,11 +81,13 @@ class SerialPort(ComProtoBasic):
         self._serial.close()
 
     @override
-    def write(self, data: str) -> None:
+    def write(self, data: str, reset_buffers: bool = True) -> None:
         """This method writes data to the serial port
 
         Args:
             data (str): The data to write
+            reset_buffers (bool, optional): drop the unread responses and the
+            unsent data first. Defaults to True, False for pipelined commands.
 
         Raises:
             PortNotOpenError: Serial port is not open
@@ -97,8 +99,9 @@ class SerialPort(ComProtoBasic):
         if not data.endswith(self.EOL):
             tx_data += self.EOL
 
-        self._serial.reset_input_buffer()
-        self._serial.reset_output_buffer()
+        if reset_buffers:
+            self._serial.reset_input_buffer()
+            self._serial.reset_output_buffer()
         self._serial.write(tx_data.encode())
 
         if self._on_tx_callback:
@@ -129,6 +132,15 @@ class SerialPort(ComProtoBasic):
 
         return response
 
+    def set_read_timeout(self, read_timeout_s: float = READ_TIMEOUT_S) -> None:
+        """This method sets the timeout of the following reads, read
+        changes it as well
+
+        Args:
+            read_timeout_s (float, optional): read timeout. Defaults to READ_TIMEOUT_S.
+        """
+        self._serial.timeout = read_timeout_s
+
     def read_raw_until_response(self) -> bytes:
         iterations = 0
         while iterations < self.ITERATIONS:
@@ -1 +1,2 @@
 from src.data_parser.data_parser import DataParser
+from src.data_parser.derived_channels import DerivedChannels
@@ -2,6 +2,7 @@ import json
 import logging
 from enum import Enum
 from typing import Self
+from src.data_parser.derived_channels import DerivedChannels
 
 logger = logging.getLogger("parser")
 
@@ -37,6 +38,7 @@ class DataParserString:
 
         self._prefix = ""
         self._postfix = ""
+        self._derived_channels = None
 
         self._check_format()
 
@@ -56,6 +58,15 @@ class DataParserString:
         """
         self._postfix = postfix
 
+    def set_derived_channels(self, derived_channels: DerivedChannels | None) -> None:
+        """Sets the derived channels, which are calculated from the parsed data
+        and added to the parse output
+
+        Args:
+            derived_channels (DerivedChannels | None): derived channels, None to disable
+        """
+        self._derived_channels = derived_channels
+
     def _extract_data_string(self, data: str) -> str:
         """Extracts the data string from the data bytes
 
@@ -108,6 +119,9 @@ class DataParserString:
                 case ParserFormats.FLOAT.value:
                     raise RuntimeError("Invalid data format")
 
+        if self._derived_channels:
+            data_dict.update(self._derived_channels.update(data_dict))
+
         return data_dict
 
     @staticmethod
@@ -130,8 +144,11 @@ class DataParserString:
         """Returns the data keys of the DataParser object
 
         Returns:
-            List[str]: List of data keys (data names)
+            List[str]: List of data keys (data names), including derived channels
         """
+        if self._derived_channels:
+            return self._data_keys + self._derived_channels.names
+
         return self._data_keys
 
     # @property
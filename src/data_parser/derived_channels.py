@@ -0,0 +1,432 @@
+import ast
+import json
+import logging
+from functools import partial
+from typing import Any, Callable, Self
+import numpy as np
+import numpy.typing as npt
+
+logger = logging.getLogger("parser")
+
+
+def _moving_average(
+    values: npt.NDArray, window: int, max_window: int | None = None
+) -> npt.NDArray:
+    """Trailing moving average, the first samples are averaged over
+    the samples available so far.
+
+    Args:
+        values (npt.NDArray): input samples
+        window (int): window length in samples
+        max_window (int | None, optional): the longer windows are shortened
+        to it. Defaults to None, no limit.
+
+    Returns:
+        npt.NDArray: averaged samples, same length as the input
+    """
+    window = int(window) if max_window is None else min(int(window), max_window)
+    if window < 1:
+        raise ValueError("Moving average window must be greater than 0")
+
+    values = np.asarray(values, dtype=np.float64)
+    cumsum = np.cumsum(values)
+    averaged = cumsum.copy()
+    averaged[window:] = cumsum[window:] - cumsum[:-window]
+    counts = np.minimum(np.arange(1, len(values) + 1), window)
+
+    return averaged / counts
+
+
+def _derivative(values: npt.NDArray, time: npt.NDArray) -> npt.NDArray:
+    """Backward difference derivative, so the newest sample depends
+    only on the past. The first sample derivative is 0.
+
+    Args:
+        values (npt.NDArray): input samples
+        time (npt.NDArray): sample times
+
+    Returns:
+        npt.NDArray: derivative, same length as the input
+    """
+    values = np.asarray(values, dtype=np.float64)
+    time = np.asarray(time, dtype=np.float64)
+
+    derivative = np.zeros_like(values)
+    dt = np.diff(time)
+    dv = np.diff(values)
+    np.divide(dv, dt, out=derivative[1:], where=dt != 0)
+
+    return derivative
+
+
+def _delta(values: npt.NDArray) -> npt.NDArray:
+    """Difference between consecutive samples, the first delta is 0.
+
+    Args:
+        values (npt.NDArray): input samples
+
+    Returns:
+        npt.NDArray: deltas, same length as the input
+    """
+    values = np.asarray(values, dtype=np.float64)
+    return np.concatenate(([0.0], np.diff(values)))
+
+
+class _RunningAverage:
+    """Trailing moving average of a sample stream, the running sum of
+    a ring buffer is updated, so a sample costs O(1)
+    """
+
+    def __init__(self, max_window: int) -> None:
+        """Constructor
+
+        Args:
+            max_window (int): the longer windows are shortened to it
+        """
+        self._max_window = max_window
+        self._ring = np.zeros(0)
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget the past samples"""
+        self._sum = 0.0
+        self._count = 0
+        self._next = 0
+
+    def __call__(self, value: float, window: int) -> float:
+        """Add the sample
+
+        Args:
+            value (float): new sample
+            window (int): window length in samples
+
+        Returns:
+            float: average of the last window samples
+        """
+        window = min(int(window), self._max_window)
+        if window < 1:
+            raise ValueError("Moving average window must be greater than 0")
+
+        if len(self._ring) != window:
+            self._ring = np.zeros(window)
+            self.clear()
+
+        if self._count == window:
+            self._sum -= self._ring[self._next]
+        else:
+            self._count += 1
+
+        self._ring[self._next] = value
+        self._sum += value
+        self._next = (self._next + 1) % window
+        if self._next == 0:
+            # the rounding errors of the running sum do not accumulate
+            self._sum = float(self._ring[: self._count].sum())
+
+        return self._sum / self._count
+
+
+class _RunningDerivative:
+    """Backward difference derivative of a sample stream"""
+
+    def __init__(self, max_window: int) -> None:
+        """Constructor, the window is not used, only the last sample is kept"""
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget the past sample"""
+        self._last: tuple[float, float] | None = None
+
+    def __call__(self, value: float, time: float) -> float:
+        """Add the sample
+
+        Args:
+            value (float): new sample
+            time (float): sample time
+
+        Returns:
+            float: derivative, 0 for the first sample or the same time
+        """
+        last, self._last = self._last, (value, time)
+        if last is None or time == last[1]:
+            return 0.0
+
+        return (value - last[0]) / (time - last[1])
+
+
+class _RunningDelta:
+    """Difference between consecutive samples of a sample stream"""
+
+    def __init__(self, max_window: int) -> None:
+        """Constructor, the window is not used, only the last sample is kept"""
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget the past sample"""
+        self._last: float | None = None
+
+    def __call__(self, value: float) -> float:
+        """Add the sample
+
+        Args:
+            value (float): new sample
+
+        Returns:
+            float: difference to the previous sample, 0 for the first one
+        """
+        last, self._last = self._last, value
+        return 0.0 if last is None else value - last
+
+
+class DerivedChannels:
+    """Channels calculated from the received data, e.g. the acceleration
+    magnitude or the pressure difference. Each channel is an arithmetic
+    expression of the received (or previously defined derived) channels.
+
+    Expressions are validated and compiled once. They are evaluated on
+    NumPy arrays, so a whole batch of samples is calculated at once.
+    A single sample is evaluated with the running versions of the windowed
+    functions, one state per call. Both limit the moving average window
+    to the history size, so they give the same values.
+    """
+
+    FUNCTIONS: dict[str, Callable] = {
+        "abs": np.abs,
+        "sqrt": np.sqrt,
+        "exp": np.exp,
+        "log": np.log,
+        "sin": np.sin,
+        "cos": np.cos,
+        "min": np.minimum,
+        "max": np.maximum,
+        "moving_average": _moving_average,
+        "derivative": _derivative,
+        "delta": _delta,
+    }
+    # Functions that need past samples to calculate the newest value,
+    # with their running versions used for the single samples
+    WINDOWED_FUNCTIONS = {
+        "moving_average": _RunningAverage,
+        "derivative": _RunningDerivative,
+        "delta": _RunningDelta,
+    }
+    ALLOWED_NODES = (
+        ast.Expression,
+        ast.BinOp,
+        ast.UnaryOp,
+        ast.Call,
+        ast.Name,
+        ast.Load,
+        ast.Constant,
+        ast.Add,
+        ast.Sub,
+        ast.Mult,
+        ast.Div,
+        ast.Pow,
+        ast.Mod,
+        ast.USub,
+        ast.UAdd,
+    )
+    DEFAULT_HISTORY_SIZE = 100
+
+    def __init__(
+        self,
+        channels: dict[str, str],
+        input_names: list[str],
+        history_size: int = DEFAULT_HISTORY_SIZE,
+    ) -> None:
+        """Compiles the derived channels expressions
+
+        Args:
+            channels (dict[str, str]): derived channel name -> expression,
+            channels are calculated in the given order
+            input_names (list[str]): names of the received channels
+            history_size (int, optional): the longest moving average window
+            of the single samples. Defaults to DEFAULT_HISTORY_SIZE.
+
+        Raises:
+            ValueError: If the expression is invalid or uses an unknown channel
+        """
+        if history_size < 1:
+            raise ValueError("History size must be greater than 0")
+
+        self._input_names = list(input_names)
+        self._history_size = history_size
+        self._reported_missing: set[str] = set()  # logged once per channel
+        self._compiled: dict[str, Any] = {}
+        # windowed function call name in the compiled code -> function name
+        self._windowed_calls: dict[str, str] = {}
+
+        known_names = set(self._input_names)
+        for name, expression in channels.items():
+            if name in known_names:
+                raise ValueError(f"Channel {name} is already defined")
+
+            self._compiled[name] = self._compile(name, expression, known_names)
+            known_names.add(name)
+
+        self._running = {
+            call: self.WINDOWED_FUNCTIONS[function](history_size)
+            for call, function in self._windowed_calls.items()
+        }
+
+    def _compile(self, name: str, expression: str, known_names: set[str]) -> Any:
+        """Validates and compiles a single expression
+
+        Args:
+            name (str): channel name
+            expression (str): channel expression
+            known_names (set[str]): names which can be used in the expression
+
+        Raises:
+            ValueError: If the expression is invalid
+
+        Returns:
+            Any: compiled code object
+        """
+        try:
+            tree = ast.parse(expression, mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression for {name}: {expression}") from e
+
+        for node in ast.walk(tree):
+            self._check_node(name, node, known_names)
+
+        # each windowed call gets its own name, so it keeps its own state
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Call) and node.func.id in self.WINDOWED_FUNCTIONS:
+                call = f"__{node.func.id}_{len(self._windowed_calls)}"
+                self._windowed_calls[call] = node.func.id
+                node.func.id = call
+
+        return compile(tree, f"<derived {name}>", "eval")
+
+    def _check_node(self, name: str, node: ast.AST, known_names: set[str]) -> None:
+        """Checks if the expression node is allowed
+
+        Args:
+            name (str): channel name
+            node (ast.AST): expression node
+            known_names (set[str]): names which can be used in the expression
+
+        Raises:
+            ValueError: If the node is not allowed
+        """
+        if not isinstance(node, self.ALLOWED_NODES):
+            raise ValueError(
+                f"Unsupported element {type(node).__name__} in {name} expression"
+            )
+
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.keywords:
+                raise ValueError(f"Invalid function call in {name} expression")
+            if node.func.id not in self.FUNCTIONS:
+                raise ValueError(f"Unknown function {node.func.id} in {name}")
+        elif isinstance(node, ast.Name):
+            if node.id not in known_names and node.id not in self.FUNCTIONS:
+                raise ValueError(f"Unknown channel {node.id} in {name} expression")
+
+    def evaluate(self, batch: dict[str, npt.ArrayLike]) -> dict[str, npt.NDArray]:
+        """Evaluates all derived channels for a batch of samples
+
+        Args:
+            batch (dict[str, npt.ArrayLike]): received channels, each one is
+            an array of samples with the same length
+
+        Returns:
+            dict[str, npt.NDArray]: derived channels, each one is an array
+            with the same length as the input arrays
+        """
+        namespace = {name: np.asarray(batch[name]) for name in self._input_names}
+        namespace.update(self.FUNCTIONS)
+        batch_functions = {
+            **self.FUNCTIONS,
+            "moving_average": partial(_moving_average, max_window=self._history_size),
+        }
+        namespace.update(
+            {call: batch_functions[name] for call, name in self._windowed_calls.items()}
+        )
+
+        derived = {}
+        for name, code in self._compiled.items():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                value = eval(code, {"__builtins__": {}}, namespace)
+
+            length = len(namespace[self._input_names[0]]) if self._input_names else 1
+            derived[name] = np.broadcast_to(np.asarray(value, np.float64), (length,))
+            namespace[name] = derived[name]
+
+        return derived
+
+    def update(self, data_dict: dict[str, Any]) -> dict[str, float]:
+        """Calculates the derived channels for a single received sample.
+        The windowed functions (moving average, derivative) keep their
+        running state, so a sample costs the same for any window.
+
+        Args:
+            data_dict (dict[str, Any]): received sample
+
+        Returns:
+            dict[str, float]: derived channels values, empty dictionary if
+            the sample does not contain all required channels
+        """
+        missing = {name for name in self._input_names if name not in data_dict}
+        if missing:
+            if not missing <= self._reported_missing:
+                logger.error(
+                    "Missing channels for the derived channels: "
+                    + ", ".join(sorted(missing))
+                )
+                self._reported_missing |= missing
+            return {}
+
+        namespace = {name: np.float64(data_dict[name]) for name in self._input_names}
+        namespace.update(self.FUNCTIONS)
+        namespace.update(self._running)
+
+        derived = {}
+        for name, code in self._compiled.items():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                derived[name] = float(eval(code, {"__builtins__": {}}, namespace))
+            namespace[name] = np.float64(derived[name])
+
+        return derived
+
+    def clear_history(self) -> None:
+        """Clears the state of the windowed functions, e.g. when a new
+        procedure starts
+        """
+        for running in self._running.values():
+            running.clear()
+
+    @staticmethod
+    def from_JSON(json_file: str, input_names: list[str]) -> Self:
+        """Creates a DerivedChannels object from a json file
+
+        Args:
+            json_file (str): Path to the json file with the derived channels
+            input_names (list[str]): names of the received channels
+
+        Returns:
+            Self: DerivedChannels object created from the json file
+        """
+        with open(json_file, "r") as file:
+            json_data = json.load(file)
+
+        channels = {
+            channel["name"]: channel["expression"] for channel in json_data["channels"]
+        }
+        history_size = json_data.get(
+            "history_size", DerivedChannels.DEFAULT_HISTORY_SIZE
+        )
+
+        return DerivedChannels(channels, input_names, history_size)
+
+    @property
+    def names(self) -> list[str]:
+        """Returns the derived channels names
+
+        Returns:
+            list[str]: List of derived channels names
+        """
+        return list(self._compiled.keys())
@@ -1,7 +1,7 @@
 import logging
 from typing import Self, Any
 from dataclasses import dataclass
-import numpy as np
+from src.procedures.profile_compiler import CompiledProfile, compile_profile
 
 logger = logging.getLogger("procedure_parameters")
 
@@ -23,7 +23,9 @@ class ProcedureParameters:
     TIME_IDX = 0
     VELOCITY_IDX = 1
 
-    SLOPE_ELEMENTS = 7
+    # default velocity error bound, part of the profile velocity span. The
+    # ramps get at most 6 steps, like the former 7 points per ramp
+    RELATIVE_VELOCITY_ERROR = 1 / 12
 
     # The name of the procedure.
     name: str
@@ -244,48 +246,40 @@ class ProcedureParameters:
             self.KEY_VELOCITY_PROFILE: self.get_velocity_list(),
         }
 
-    def _movement_step_from_tuple(self, step: tuple[float, float]) -> str:
-        """Get the movement step from a tuple.
+    def compile_profile(self, max_velocity_error: float = None) -> CompiledProfile:
+        """Compile the velocity profile to the motor velocity steps.
 
         Args:
-            step (tuple[float, float]): Tuple with the step
+            max_velocity_error (float, optional): velocity error bound.
+            Defaults to RELATIVE_VELOCITY_ERROR of the velocity span.
 
         Returns:
-            str: String with the step
+            CompiledProfile: velocity steps and the motor command
         """
-        return f"{int(step[self.TIME_IDX])};{int(step[self.VELOCITY_IDX])} "
+        velocities = self.get_velocity_list()
+        if max_velocity_error is None:
+            span = max(velocities) - min(velocities) if velocities else 0
+            # a constant profile has no ramps, any bound gives the same steps
+            max_velocity_error = max(span * self.RELATIVE_VELOCITY_ERROR, 1)
 
-    def procedure_profile_args(self) -> list[str]:
+        return compile_profile(self.get_time_list(), velocities, max_velocity_error)
+
+    def procedure_profile_args(self, max_velocity_error: float = None) -> list[str]:
         """Get the procedure profile arguments.
+
+        Args:
+            max_velocity_error (float, optional): velocity error bound.
+            Defaults to RELATIVE_VELOCITY_ERROR of the velocity span.
+
         Returns:
             list[str]: List of arguments
         """
-        movement_profile = self._movement_step_from_tuple(self.velocity_profile[0])
-        for idx, step in enumerate(self.velocity_profile[1:-1]):
-            t_0, v_0 = self.velocity_profile[idx]
-            t_1, v_1 = step
-
-            if v_0 != v_1:
-                if t_0 == t_1:
-                    movement_profile += self._movement_step_from_tuple(step)
-                else:
-                    for i, t in enumerate(np.linspace(t_0, t_1, self.SLOPE_ELEMENTS)):
-                        # equation v = v_0 + a * t, where a = (v_1 - v_0) / (t_1 - t_0),
-                        # t = (t - t_0)
-                        v = v_0 + (v_1 - v_0) * (t - t_0) / (t_1 - t_0)
-
-                        # quick fix for concurency issue
-                        if i == 0:
-                            t = t + 1
-                        elif i == self.SLOPE_ELEMENTS - 1:
-                            t = t - 1
-
-                        movement_profile += self._movement_step_from_tuple((t, v))
-
-        movement_profile += self._movement_step_from_tuple(self.velocity_profile[-1])
-        movement_profile = movement_profile[:-1]
+        profile = self.compile_profile(max_velocity_error)
+        logger.info(
+            f"Procedure {self.name}: {profile.steps} steps, {profile.size_bytes} B"
+        )
 
         press_time = int(self.press_time_ms) if self.press_time_ms is not None else 0
         depr_time = int(self.depr_time_ms) if self.press_time_ms is not None else 0
 
-        return [movement_profile, str(press_time), str(depr_time)]
+        return [profile.command, str(press_time), str(depr_time)]
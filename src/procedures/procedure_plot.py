@@ -7,7 +7,9 @@ Due to the lack of time, here is another implementation of the live plot but for
 the procedures.
 """
 
+import numpy as np
 import pyqtgraph as pg
+from PySide6.QtCore import QTimer
 from pglive.sources.data_connector import DataConnector
 from pglive.sources.live_plot import LiveLinePlot
 from pglive.sources.live_plot_widget import LivePlotWidget
@@ -27,8 +29,10 @@ class ProcedurePlot(pg.LayoutWidget):
         PLOT_VELOCITY: "cyan",
         PLOT_PRESSURIZATION: "lime",
         PLOT_DEPRESSURIZATION: "magenta",
-        PLOT_LIVE_VELOCITY: "white",
     }
+    LIVE_VELOCITY_COLOR = "white"
+    LIVE_REFRESH_MS = 33  # live samples are drawn at most once per frame
+    LIVE_CAPACITY = 10_000  # older samples are dropped
 
     def __init__(
         self,
@@ -61,12 +65,29 @@ class ProcedurePlot(pg.LayoutWidget):
 
             self._data_connectors[name] = data_connector
 
+        # live samples are written to the preallocated buffer and drawn as an
+        # overlay, which does not change the locked axes ranges
+        self._live_time = np.empty(self.LIVE_CAPACITY)
+        self._live_velocity = np.empty(self.LIVE_CAPACITY)
+        self._live_size = 0
+        self._end_time = None
+        self._live_curve = pg.PlotDataItem(
+            pen=self.LIVE_VELOCITY_COLOR, name=self.PLOT_LIVE_VELOCITY
+        )
+        plot.addItem(self._live_curve, ignoreBounds=True)
+
+        self._live_timer = QTimer(self)
+        self._live_timer.setSingleShot(True)
+        self._live_timer.setInterval(self.LIVE_REFRESH_MS)
+        self._live_timer.timeout.connect(self._draw_live_velocity)
+
         self.addWidget(self._plot_widget)
 
     def clear_plot(self) -> None:
         """Clear the plot."""
         for data_connector in self._data_connectors.values():
             data_connector.clear()
+        self.clear_live_velocity()
 
     def set_procedure_parameters(self, params: ProcedureParameters) -> None:
         """Set the procedure parameters to display on the plot.
@@ -108,34 +129,52 @@ class ProcedurePlot(pg.LayoutWidget):
         else:
             self._x_range = [0, params.press_time_ms + params.depr_time_ms]
 
+        self._end_time = time_list[-1] if time_list else None
         self._y_range = velocity_range
+        # the ranges are set once per procedure, the live samples do not change them
+        plot.disableAutoRange()
         plot.setXRange(self._x_range[0], self._x_range[1])
         plot.setYRange(self._y_range[0], self._y_range[1], padding=0)
 
     def append_live_velocity(self, velocity: float, time: float) -> None:
-        """Append the live velocity to the plot.
+        """Append the live velocity to the plot, the sample is drawn
+        with the next batch.
 
         Args:
             velocity (float): Velocity value.
             time (float): Time value.
         """
-        if time <= 0:
+        if time <= 0 or self._end_time is None or time > self._end_time:
             return
 
-        if time > self._data_connectors[self.PLOT_VELOCITY].x[-1]:
-            return
+        if self._live_size and self._live_time[self._live_size - 1] > time:
+            self._live_size = 0  # the procedure started again
 
-        velocity_connector = self._data_connectors[self.PLOT_LIVE_VELOCITY]
+        if self._live_size == self.LIVE_CAPACITY:
+            # keep the newer half, the buffer is not reallocated
+            half = self.LIVE_CAPACITY // 2
+            newer = slice(self._live_size - half, self._live_size)
+            self._live_time[:half] = self._live_time[newer]
+            self._live_velocity[:half] = self._live_velocity[newer]
+            self._live_size = half
 
-        if velocity_connector.x and (velocity_connector.x[-1] > time):
-            velocity_connector.clear()
+        self._live_time[self._live_size] = time
+        self._live_velocity[self._live_size] = velocity
+        self._live_size += 1
 
-        velocity_connector.cb_append_data_point(velocity, time)
+        if not self._live_timer.isActive():
+            self._live_timer.start()
 
-        plot = self._plot_widget.getPlotItem()
-        plot.setXRange(self._x_range[0], self._x_range[1])
-        plot.setYRange(self._y_range[0], self._y_range[1], padding=0)
+    def _draw_live_velocity(self) -> None:
+        """Draw the buffered live samples"""
+        self._live_curve.setData(
+            self._live_time[: self._live_size],
+            self._live_velocity[: self._live_size],
+            skipFiniteCheck=True,
+        )
 
     def clear_live_velocity(self) -> None:
         """Clear the live velocity."""
-        self._data_connectors[self.PLOT_LIVE_VELOCITY].clear()
+        self._live_size = 0
+        self._live_timer.stop()
+        self._live_curve.setData([], [])
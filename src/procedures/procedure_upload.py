@@ -0,0 +1,205 @@
+import logging
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass
+from serial import SerialTimeoutException
+
+from src.com.serial import SerialPort
+
+logger = logging.getLogger("procedure_upload")
+
+
+@dataclass
+class UploadStats:
+    """Procedure upload summary"""
+
+    chunks: int = 0
+    size_bytes: int = 0
+    retries: int = 0
+    duration_s: float = 0.0
+
+
+def split_profile(profile: str, chunk_bytes: int) -> list[str]:
+    """Split the profile command into chunks of whole steps
+
+    Args:
+        profile (str): "time;velocity" steps separated with spaces
+        chunk_bytes (int): chunk payload limit, a longer step is sent alone
+
+    Returns:
+        list[str]: chunks payloads
+    """
+    chunks = []
+    steps = []
+    size = -1  # no separator before the first step
+
+    for step in profile.split():
+        # steps are separated with a space
+        if steps and size + 1 + len(step) > chunk_bytes:
+            chunks.append(" ".join(steps))
+            steps, size = [], -1
+        steps.append(step)
+        size += 1 + len(step)
+
+    if steps:
+        chunks.append(" ".join(steps))
+
+    return chunks
+
+
+class ProcedureUploader:
+    """Uploads the procedure profile in chunks, so the lines fit the serial
+    write timeout and the firmware line buffer:
+
+        procedure_begin <chunks> <bytes> <crc32>  -> OK
+        procedure_chunk <seq> <crc32> <steps>     -> OK: <seq> | ERR: <seq>
+        procedure_commit <press> <depr>           -> OK, the procedure starts
+
+    Up to WINDOW chunks are sent before their acknowledgements, a chunk
+    rejected or not acknowledged within ACK_TIMEOUT_S is sent again.
+    The CRC32 values are hexadecimal, the profile CRC is over the chunks
+    joined with spaces.
+    """
+
+    BEGIN_COMMAND = "procedure_begin"
+    CHUNK_COMMAND = "procedure_chunk"
+    COMMIT_COMMAND = "procedure_commit"
+
+    CHUNK_BYTES = 96  # ~8 ms at 115200 baud, within SerialPort.WRITE_TIMEOUT_S
+    WINDOW = 4
+    ACK_TIMEOUT_S = 0.5
+    MAX_ATTEMPTS = 3  # per chunk
+
+    def __init__(self, protocol: SerialPort) -> None:
+        """Constructor
+
+        Args:
+            protocol (SerialPort): connected serial port
+        """
+        self._protocol = protocol
+
+    @staticmethod
+    def _crc(data: str) -> str:
+        return f"{zlib.crc32(data.encode()):08x}"
+
+    def _send_chunk(self, seq: int, chunk: str) -> bool:
+        """Send the chunk without waiting for the acknowledgement
+
+        Args:
+            seq (int): chunk number
+            chunk (str): chunk payload
+
+        Returns:
+            bool: False if the line or the port was busy
+        """
+        try:
+            self._protocol.write(
+                f"{self.CHUNK_COMMAND} {seq} {self._crc(chunk)} {chunk}",
+                reset_buffers=False,
+            )
+        except (SerialTimeoutException, TimeoutError):
+            # the serial write timeout or the serial mutex is busy
+            logger.warning(f"Procedure chunk {seq} write timeout")
+            return False
+
+        return True
+
+    def _parse_response(self, response: str) -> tuple[int, bool] | None:
+        """Parse the chunk acknowledgement
+
+        Args:
+            response (str): received line
+
+        Returns:
+            tuple[int, bool] | None: chunk number and True if accepted,
+            None for the other lines
+        """
+        for prefix, accepted in (
+            (self._protocol.ACK, True),
+            (self._protocol.NACK, False),
+        ):
+            if response.startswith(prefix):
+                seq = response[len(prefix) :].split(maxsplit=1)
+                if seq and seq[0].isdigit():
+                    return int(seq[0]), accepted
+
+        return None
+
+    def _send_chunks(self, chunks: list[str], stats: UploadStats) -> None:
+        """Send the chunks, pipelined up to WINDOW unacknowledged chunks
+
+        Args:
+            chunks (list[str]): chunks payloads
+            stats (UploadStats): retries counter
+
+        Raises:
+            TimeoutError: A chunk was not accepted after MAX_ATTEMPTS
+        """
+        pending = deque(range(len(chunks)))
+        in_flight: dict[int, float] = {}  # chunk number: send time
+        attempts = [0] * len(chunks)
+
+        def retry(seq: int) -> None:
+            if attempts[seq] >= self.MAX_ATTEMPTS:
+                raise TimeoutError(f"Procedure chunk {seq} not accepted")
+            stats.retries += 1
+            pending.appendleft(seq)
+
+        while pending or in_flight:
+            while pending and len(in_flight) < self.WINDOW:
+                seq = pending.popleft()
+                attempts[seq] += 1
+                if self._send_chunk(seq, chunks[seq]):
+                    in_flight[seq] = time.monotonic()
+                else:
+                    retry(seq)
+
+            response = self._parse_response(self._protocol.read(self.ACK_TIMEOUT_S))
+            if response is not None and response[0] in in_flight:
+                seq, accepted = response
+                del in_flight[seq]
+                if not accepted:
+                    retry(seq)
+
+            deadline = time.monotonic() - self.ACK_TIMEOUT_S
+            for seq in [seq for seq, sent in in_flight.items() if sent <= deadline]:
+                del in_flight[seq]
+                retry(seq)
+
+    def upload(
+        self, profile: str, press_time_ms: str, depr_time_ms: str
+    ) -> UploadStats:
+        """Upload the profile and start the procedure
+
+        Args:
+            profile (str): "time;velocity" steps separated with spaces
+            press_time_ms (str): pressurization time
+            depr_time_ms (str): depressurization time
+
+        Raises:
+            TimeoutError: A chunk was not accepted
+            ValueError: The begin or commit command was rejected
+
+        Returns:
+            UploadStats: upload summary
+        """
+        start = time.monotonic()
+        chunks = split_profile(profile, self.CHUNK_BYTES)
+        payload = " ".join(chunks)
+        stats = UploadStats(len(chunks), len(payload))
+
+        self._protocol.write_command(
+            self.BEGIN_COMMAND, len(chunks), len(payload), self._crc(payload)
+        )
+        try:
+            self._send_chunks(chunks, stats)
+        finally:
+            # the acknowledgements are read with ACK_TIMEOUT_S
+            self._protocol.set_read_timeout(self._protocol.READ_TIMEOUT_S)
+        self._protocol.write_command(self.COMMIT_COMMAND, press_time_ms, depr_time_ms)
+
+        stats.duration_s = time.monotonic() - start
+        logger.info(f"Procedure uploaded: {stats}")
+
+        return stats
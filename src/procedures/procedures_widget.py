@@ -9,7 +9,7 @@ from PySide6.QtWidgets import (
     QPushButton,
     QGridLayout,
 )
-from PySide6.QtCore import Signal
+from PySide6.QtCore import QTimer, Signal
 from src.com.abstract import ComProtoBasic
 from src.procedures.procedure_plot import ProcedurePlot
 
@@ -17,6 +17,7 @@ from src.procedures.procedure_plot import ProcedurePlot
 from src.procedures.procedure_command import ProcedureCmd
 from src.procedures.procedure_configurator import ProcedureConfigurator
 from src.procedures.procedure_parameters import ProcedureParameters
+from src.procedures.tracking_analytics import TrackingAnalytics
 
 
 class ProceduresWidget(QGroupBox):
@@ -32,6 +33,7 @@ class ProceduresWidget(QGroupBox):
         self._current_procedure = None
         self._procedures = {}
         self._procedure_config_file = procedure_config_file
+        self._tracking = TrackingAnalytics(parent=self)
 
         self._load_procedures()
         self._init_ui()
@@ -80,8 +82,16 @@ class ProceduresWidget(QGroupBox):
 
         # self.setFixedSize(500, 500)
         self._plot = ProcedurePlot()
+        self._tracking_label = QLabel()
+        self._tracking_alarmed = False
+        # the label is refreshed with the plot, not on every sample
+        self._tracking_timer = QTimer(self)
+        self._tracking_timer.setSingleShot(True)
+        self._tracking_timer.setInterval(ProcedurePlot.LIVE_REFRESH_MS)
+        self._tracking_timer.timeout.connect(self._update_tracking_label)
         self.layout.addWidget(widget)
         self.layout.addWidget(self._plot)
+        self.layout.addWidget(self._tracking_label)
         self.layout.addWidget(horizontal_bar)
         self.layout.addWidget(self._procedure_cmd)
 
@@ -96,14 +106,35 @@ class ProceduresWidget(QGroupBox):
     def _set_current_procedure(self) -> None:
         procedure_name = self._procedure_type.currentText()
         self._current_procedure = self._procedures[procedure_name]
-        self._plot.set_procedure_parameters(self._current_procedure)
+        self._show_procedure()
 
     def _on_procedure_updated(self, procedure: ProcedureParameters):
         self._current_procedure = procedure
         self._procedures[procedure.name] = procedure
-        self._plot.set_procedure_parameters(self._current_procedure)
+        self._show_procedure()
         self._save_procedures()
 
+    def _show_procedure(self) -> None:
+        """Plot the current procedure and track the live velocity against it"""
+        self._plot.set_procedure_parameters(self._current_procedure)
+        self._tracking.set_profile(
+            self._current_procedure.get_time_list(),
+            self._current_procedure.get_velocity_list(),
+        )
+        self._update_tracking_label()
+
+    def _update_tracking_label(self) -> None:
+        stats = self._tracking.stats
+        alarms = ", ".join(alarm.value for alarm in self._tracking.active_alarms)
+        self._tracking_label.setText(
+            f"Tracking error RMS: {stats.rms_error:.0f}, max: {stats.max_error:.0f}, "
+            f"lag: {stats.lag_ms:.0f} ms" + (f" - ALARM: {alarms}" if alarms else "")
+        )
+        # the style sheet change polishes the label again, so only on a change
+        if bool(alarms) != self._tracking_alarmed:
+            self._tracking_alarmed = bool(alarms)
+            self._tracking_label.setStyleSheet("color: red" if alarms else "")
+
     def _on_configurator_closed(self):
         self._procedure_type.setEnabled(True)
 
@@ -112,6 +143,9 @@ class ProceduresWidget(QGroupBox):
 
     def append_live_data(self, velocity: float, time: dict) -> None:
         self._plot.append_live_velocity(velocity, time)
+        self._tracking.add_sample(time, velocity)
+        if not self._tracking_timer.isActive():
+            self._tracking_timer.start()
 
     def is_procedure_running(self) -> bool:
         return self._procedure_cmd.is_running()
@@ -0,0 +1,109 @@
+import numpy as np
+import numpy.typing as npt
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class CompiledProfile:
+    """Motor velocity steps, the motor holds the velocity until the next step"""
+
+    times_ms: npt.NDArray[np.int64]
+    velocities: npt.NDArray[np.int64]
+    command: str  # "time;velocity" pairs separated with spaces
+
+    @property
+    def steps(self) -> int:
+        return len(self.times_ms)
+
+    @property
+    def size_bytes(self) -> int:
+        """Command length sent to the motor controller"""
+        return len(self.command.encode("ascii"))
+
+
+def _steps_per_segment(
+    dt: npt.NDArray, dv: npt.NDArray, max_error: float, min_step_ms: float
+) -> npt.NDArray[np.int64]:
+    """Number of constant velocity steps of each profile segment. A ramp step
+    holds the velocity in the middle of its range, so n steps make the error
+    |dv| / 2n. The steps are not shorter than min_step_ms, which takes
+    precedence over the error bound on steep ramps.
+
+    Args:
+        dt (npt.NDArray): segments duration [ms], positive
+        dv (npt.NDArray): segments velocity change
+        max_error (float): velocity error bound
+        min_step_ms (float): shortest step [ms]
+
+    Returns:
+        npt.NDArray[np.int64]: steps of each segment, at least 1
+    """
+    steps = np.ceil(np.abs(dv) / (2 * max_error))
+    max_steps = np.maximum(np.floor(dt / min_step_ms), 1)
+
+    return np.clip(steps, 1, max_steps).astype(np.int64)
+
+
+def compile_profile(
+    time_ms: npt.ArrayLike,
+    velocity: npt.ArrayLike,
+    max_error: float,
+    min_step_ms: float = 1.0,
+) -> CompiledProfile:
+    """Compile the piecewise linear velocity profile to the fewest velocity
+    steps, which differ from the profile at most by max_error (plus the
+    rounding to integer ms and velocity). Jumps, where two points have the
+    same time, are kept, the last point ends the procedure.
+
+    Args:
+        time_ms (npt.ArrayLike): profile points time [ms], sorted
+        velocity (npt.ArrayLike): profile points velocity
+        max_error (float): velocity error bound, positive
+        min_step_ms (float, optional): shortest step [ms]. Defaults to 1.0.
+
+    Raises:
+        ValueError: Invalid error bound or the profile lengths differ
+
+    Returns:
+        CompiledProfile: velocity steps and the motor command
+    """
+    if max_error <= 0:
+        raise ValueError("The velocity error bound must be positive.")
+
+    time_ms = np.asarray(time_ms, np.float64)
+    velocity = np.asarray(velocity, np.float64)
+    if time_ms.shape != velocity.shape:
+        raise ValueError("The time and velocity profiles lengths differ.")
+
+    if time_ms.size == 0:
+        empty = np.empty(0, np.int64)
+        return CompiledProfile(empty, empty, "")
+
+    # jumps have no duration, the next segment starts with the new velocity
+    dt = np.diff(time_ms)
+    segments = np.flatnonzero(dt > 0)
+    t_0, dt = time_ms[segments], dt[segments]
+    v_0, dv = velocity[segments], np.diff(velocity)[segments]
+
+    steps = _steps_per_segment(dt, dv, max_error, min_step_ms)
+    segment = np.repeat(np.arange(len(segments)), steps)
+    step = np.arange(len(segment)) - np.repeat(np.cumsum(steps) - steps, steps)
+    fraction = step / steps[segment]
+
+    times = np.append(t_0[segment] + dt[segment] * fraction, time_ms[-1])
+    velocities = np.append(
+        v_0[segment] + dv[segment] * (fraction + 0.5 / steps[segment]), velocity[-1]
+    )
+    times = np.rint(times).astype(np.int64)
+    velocities = np.rint(velocities).astype(np.int64)
+
+    # the rounded steps may start in the same ms, the last one is used
+    last_in_ms = np.append(times[1:] != times[:-1], True)
+    times, velocities = times[last_in_ms], velocities[last_in_ms]
+    # a step with the previous velocity changes nothing, the end is kept
+    changed = np.concatenate(([True], velocities[1:] != velocities[:-1]))
+    changed[-1] = True
+    times, velocities = times[changed], velocities[changed]
+
+    command = " ".join(f"{t};{v}" for t, v in zip(times.tolist(), velocities.tolist()))
+    return CompiledProfile(times, velocities, command)
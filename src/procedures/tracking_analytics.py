@@ -0,0 +1,177 @@
+import logging
+import math
+import numpy as np
+from dataclasses import dataclass
+from enum import Enum
+from PySide6.QtCore import QObject, Signal
+
+logger = logging.getLogger("procedure_tracking")
+
+
+class TrackingAlarm(Enum):
+    MAX_ERROR = "max error"
+    RMS_ERROR = "RMS error"
+    LAG = "lag"
+
+
+@dataclass
+class TrackingThresholds:
+    """Alarm thresholds, 0 disables the alarm"""
+
+    max_error: float = 10_000
+    rms_error: float = 2_000
+    lag_ms: float = 200
+
+
+@dataclass
+class TrackingStats:
+    """Velocity tracking summary of the procedure"""
+
+    samples: int
+    rms_error: float
+    max_error: float
+    lag_ms: float
+
+
+class TrackingAnalytics(QObject):
+    """Compares the live velocity with the procedure profile. The profile
+    is linear between the breakpoints, the segment slopes and offsets are
+    precomputed, so a sample costs a binary search and a few float operations.
+
+    The lag is estimated on the ramps only: a motor delayed by the lag follows
+    v(t - lag) ~= v(t) - slope * lag, so lag = error / slope. The estimates are
+    smoothed with the exponential moving average.
+    """
+
+    alarm = Signal(TrackingAlarm, float)  # alarm, value above the threshold
+    MIN_SLOPE = 1.0  # velocity per ms, flatter segments give no lag estimate
+    LAG_SMOOTHING = 0.1
+
+    def __init__(
+        self, thresholds: TrackingThresholds = None, parent: QObject = None
+    ) -> None:
+        """Constructor
+
+        Args:
+            thresholds (TrackingThresholds, optional): alarm thresholds.
+            Defaults to TrackingThresholds().
+            parent (QObject, optional): parent object. Defaults to None.
+        """
+        super().__init__(parent)
+        self._thresholds = thresholds or TrackingThresholds()
+        self._times = np.empty(0)
+        self._slopes = np.empty(0)
+        self._offsets = np.empty(0)
+        self.reset()
+
+    def set_profile(self, time_ms: list[float], velocity: list[float]) -> None:
+        """Set the commanded profile, the statistics are reset
+
+        Args:
+            time_ms (list[float]): breakpoints time [ms], sorted
+            velocity (list[float]): breakpoints velocity
+        """
+        times = np.asarray(time_ms, np.float64)
+        velocities = np.asarray(velocity, np.float64)
+
+        # segment i is [times[i], times[i + 1]), v = offset + slope * t;
+        # the jumps have no duration, the later segment is found first
+        dt = np.diff(times)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slopes = np.where(dt > 0, np.diff(velocities) / dt, 0.0)
+        self._times = times
+        self._slopes = np.append(slopes, 0.0)  # after the end, the last velocity
+        self._offsets = velocities - self._slopes * times
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset the statistics, e.g. when the procedure starts again"""
+        self._samples = 0
+        self._squared_error_sum = 0.0
+        self._max_error = 0.0
+        self._lag_ms = 0.0
+        self._last_time = -math.inf
+        self._active_alarms: set[TrackingAlarm] = set()
+
+    def commanded_velocity(self, time_ms: float) -> float:
+        """Commanded velocity at the time
+
+        Args:
+            time_ms (float): procedure time [ms], within the profile
+
+        Returns:
+            float: velocity interpolated between the breakpoints
+        """
+        index = self._times.searchsorted(time_ms, "right") - 1
+        return float(self._offsets[index] + self._slopes[index] * time_ms)
+
+    def add_sample(self, time_ms: float, velocity: float) -> None:
+        """Add the live sample, samples outside of the profile are ignored.
+        The statistics are reset when the time goes back, a new procedure run.
+
+        Args:
+            time_ms (float): procedure time [ms]
+            velocity (float): measured velocity
+        """
+        if not len(self._times) or not self._times[0] <= time_ms <= self._times[-1]:
+            return
+
+        if time_ms < self._last_time:
+            self.reset()
+        self._last_time = time_ms
+
+        index = self._times.searchsorted(time_ms, "right") - 1
+        slope = self._slopes[index]
+        error = self._offsets[index] + slope * time_ms - velocity
+
+        self._samples += 1
+        self._squared_error_sum += error * error
+        self._max_error = max(self._max_error, abs(error))
+
+        if abs(slope) >= self.MIN_SLOPE:
+            self._lag_ms += self.LAG_SMOOTHING * (error / slope - self._lag_ms)
+
+        self._check_alarm(
+            TrackingAlarm.MAX_ERROR, abs(error), self._thresholds.max_error
+        )
+        self._check_alarm(
+            TrackingAlarm.RMS_ERROR, self.rms_error, self._thresholds.rms_error
+        )
+        self._check_alarm(TrackingAlarm.LAG, abs(self._lag_ms), self._thresholds.lag_ms)
+
+    def _check_alarm(
+        self, alarm: TrackingAlarm, value: float, threshold: float
+    ) -> None:
+        """Emit the alarm when the value exceeds the threshold, the alarm
+        is emitted again only after the value went back below the threshold
+
+        Args:
+            alarm (TrackingAlarm): alarm type
+            value (float): current value
+            threshold (float): alarm threshold, 0 - disabled
+        """
+        if threshold <= 0 or value <= threshold:
+            self._active_alarms.discard(alarm)
+            return
+
+        if alarm not in self._active_alarms:
+            self._active_alarms.add(alarm)
+            logger.warning(f"Tracking {alarm.value} {value:.1f} above {threshold}")
+            self.alarm.emit(alarm, value)
+
+    @property
+    def active_alarms(self) -> frozenset[TrackingAlarm]:
+        """Alarms with the value still above the threshold"""
+        return frozenset(self._active_alarms)
+
+    @property
+    def rms_error(self) -> float:
+        if self._samples == 0:
+            return 0.0
+        return math.sqrt(self._squared_error_sum / self._samples)
+
+    @property
+    def stats(self) -> TrackingStats:
+        return TrackingStats(
+            self._samples, self.rms_error, float(self._max_error), float(self._lag_ms)
+        )
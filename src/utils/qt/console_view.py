@@ -0,0 +1,221 @@
+from collections import deque
+from dataclasses import dataclass
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QColor, QTextCharFormat, QTextCursor
+from PySide6.QtWidgets import QPlainTextEdit
+
+
+@dataclass
+class ConsoleLine:
+    """Single console line"""
+
+    text: str
+    color: Qt.GlobalColor | QColor = Qt.white
+
+
+class ConsoleModel:
+    """Console lines stored in a ring buffer. When the buffer is full, the oldest
+    line is dropped, so the memory usage does not grow with the session length.
+    """
+
+    def __init__(self, max_lines: int) -> None:
+        """Constructor
+
+        Args:
+            max_lines (int): maximum number of stored lines
+
+        Raises:
+            ValueError: max_lines is lower than 1
+        """
+        if max_lines < 1:
+            raise ValueError("Max lines must be greater than 0")
+
+        self._lines: deque[ConsoleLine] = deque(maxlen=max_lines)
+
+    def append(self, line: ConsoleLine) -> None:
+        """Append a line, the oldest line is dropped if the buffer is full
+
+        Args:
+            line (ConsoleLine): line to append
+        """
+        self._lines.append(line)
+
+    def clear(self) -> None:
+        """Remove all lines"""
+        self._lines.clear()
+
+    def lines(self, filter_text: str = "") -> list[ConsoleLine]:
+        """Get the stored lines
+
+        Args:
+            filter_text (str, optional): return only lines containing this text.
+            Defaults to "".
+
+        Returns:
+            list[ConsoleLine]: lines, from the oldest to the newest
+        """
+        if not filter_text:
+            return list(self._lines)
+
+        return [line for line in self._lines if filter_text in line.text]
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    @property
+    def max_lines(self) -> int:
+        return self._lines.maxlen
+
+
+class QConsoleView(QPlainTextEdit):
+    """Read only console with a fixed maximum line count.
+    Appended lines are buffered and written to the document in batches
+    once per frame, with cached text formats. The view can be paused
+    and filtered, the lines received in the meantime are kept in the model.
+    """
+
+    FLUSH_INTERVAL_MS = 33  # ~30 fps
+    DEFAULT_MAX_LINES = 1000
+
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES) -> None:
+        """Constructor
+
+        Args:
+            max_lines (int, optional): maximum number of lines.
+            Defaults to DEFAULT_MAX_LINES.
+        """
+        super().__init__()
+        self.setReadOnly(True)
+        self.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.setMaximumBlockCount(max_lines)
+
+        self._model = ConsoleModel(max_lines)
+        self._pending: deque[ConsoleLine] = deque(maxlen=max_lines)
+        self._formats: dict[int, QTextCharFormat] = {}
+        self._filter_text = ""
+        self._paused = False
+        # the whole view has to be rendered again, e.g. after filter change
+        self._rebuild = False
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start(self.FLUSH_INTERVAL_MS)
+
+    def _get_format(self, color: Qt.GlobalColor | QColor) -> QTextCharFormat:
+        """Get the cached text format for the color
+
+        Args:
+            color (Qt.GlobalColor | QColor): text color
+
+        Returns:
+            QTextCharFormat: text format
+        """
+        color = QColor(color)
+        key = color.rgba()
+
+        if key not in self._formats:
+            char_format = QTextCharFormat()
+            char_format.setForeground(color)
+            self._formats[key] = char_format
+
+        return self._formats[key]
+
+    def append_line(self, text: str, color: Qt.GlobalColor | QColor = Qt.white):
+        """Append a line to the console, the line is displayed on the next flush
+
+        Args:
+            text (str): line text, without the end of line
+            color (Qt.GlobalColor | QColor, optional): text color.
+            Defaults to Qt.white.
+        """
+        line = ConsoleLine(text, color)
+        self._model.append(line)
+
+        if len(self._pending) == self._pending.maxlen:
+            # more lines than the view can show, render the model instead
+            self._rebuild = True
+
+        self._pending.append(line)
+
+    def _write_lines(self, lines: list[ConsoleLine]) -> None:
+        """Write the lines at the end of the document
+
+        Args:
+            lines (list[ConsoleLine]): lines to write
+        """
+        if not lines:
+            return
+
+        scroll_bar = self.verticalScrollBar()
+        at_bottom = scroll_bar.value() == scroll_bar.maximum()
+
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+
+        for line in lines:
+            if not self.document().isEmpty():
+                cursor.insertBlock()
+            cursor.insertText(line.text, self._get_format(line.color))
+
+        cursor.endEditBlock()
+
+        if at_bottom:
+            scroll_bar.setValue(scroll_bar.maximum())
+
+    def flush(self) -> None:
+        """Write the pending lines to the view"""
+        if self._paused:
+            return
+
+        if self._rebuild:
+            self._rebuild = False
+            self._pending.clear()
+            self.clear()
+            self._write_lines(self._model.lines(self._filter_text))
+            return
+
+        if not self._pending:
+            return
+
+        lines = [line for line in self._pending if self._filter_text in line.text]
+        self._pending.clear()
+        self._write_lines(lines)
+
+    def set_paused(self, paused: bool) -> None:
+        """Pause or resume the view updates, lines are still collected when paused
+
+        Args:
+            paused (bool): True to pause, False to resume
+        """
+        self._paused = paused
+
+        if not paused:
+            self.flush()
+
+    def set_filter(self, filter_text: str) -> None:
+        """Show only the lines containing the filter text
+
+        Args:
+            filter_text (str): filter text, empty string disables the filter
+        """
+        if filter_text == self._filter_text:
+            return
+
+        self._filter_text = filter_text
+        self._rebuild = True
+        self.flush()
+
+    def clear_console(self) -> None:
+        """Remove all lines from the console"""
+        self._model.clear()
+        self._pending.clear()
+        self.clear()
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    @property
+    def model(self) -> ConsoleModel:
+        return self._model
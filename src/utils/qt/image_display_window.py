@@ -1,11 +1,19 @@
+import numpy as np
 import numpy.typing as npt
 from PySide6.QtCore import QSize, Qt, Signal
 from PySide6.QtGui import QCloseEvent, QImage, QPainter
 from PySide6.QtWidgets import QWidget
+from shiboken6 import VoidPtr
 
 
 class ImageDisplayWindow(QWidget):
+    """Window displaying the frames, the QImage uses the frame buffer
+    without a copy. The scaled image is cached until the frame or the window
+    size changes.
+    """
+
     close_event = Signal()
+    size_changed = Signal(int, int)  # image area size (width, height)
 
     def __init__(
         self,
@@ -25,23 +33,42 @@ class ImageDisplayWindow(QWidget):
         self._minimum_size = QSize(*minimum_size)
         self._default_size = QSize(*default_size)
         self._format = format
+        self._frame = None  # QImage does not own the buffer, it keeps it alive
         self._image = None
+        self._scaled_image = None  # cached paint image, None - rescale
 
         self.setWindowTitle(name)
         self.setMinimumSize(self._minimum_size)
 
+    def _scale_image(self) -> QImage:
+        """Fit the image to the window size, keeping the aspect ratio
+
+        Returns:
+            QImage: the image, not copied if it already fits
+        """
+        windows_size = self.size()
+        fitted_size = self._image.size().scaled(
+            windows_size, Qt.AspectRatioMode.KeepAspectRatio
+        )
+        # frames are downscaled by the frame handler, rescale only if needed
+        if self._image.size() == fitted_size:
+            return self._image
+
+        return self._image.scaled(windows_size, Qt.AspectRatioMode.KeepAspectRatio)
+
     def paintEvent(self, event):
         """Paint event handler, this method is called when
-        the window needs to be repainted. In this event, the
-        image is resized to fit the window size and then painted.
+        the window needs to be repainted. The image is scaled
+        only after the frame or the window size changed.
         """
         if not self._image:
             return
 
+        if self._scaled_image is None:
+            self._scaled_image = self._scale_image()
+
         windows_size = self.size()
-        scaled_image = self._image.scaled(
-            windows_size, Qt.AspectRatioMode.KeepAspectRatio
-        )
+        scaled_image = self._scaled_image
 
         # calculate the position to center the image
         x = (windows_size.width() - scaled_image.width()) // 2
@@ -55,20 +82,62 @@ class ImageDisplayWindow(QWidget):
         Inside this methode, we call the update method which will call the paintEvent,
         and the image will be resized to fit the new window size.
         """
+        self._scaled_image = None
+        self.size_changed.emit(*self.image_size)
         self.update()
 
-    def update_image(self, frame: npt.ArrayLike) -> None:
-        """Update the image displayed in the window.
+    @staticmethod
+    def _has_qimage_layout(frame: npt.NDArray) -> bool:
+        """Check if QImage can use the frame buffer, the pixels in a row
+        must be packed, the rows may be padded
 
         Args:
-            frame (npt.ArrayLike): image
+            frame (npt.NDArray): image
+
+        Returns:
+            bool: True if the buffer can be used without a copy
+        """
+        pixel_bytes = frame.itemsize * (frame.shape[2] if frame.ndim == 3 else 1)
+        row_bytes = pixel_bytes * frame.shape[1]
+
+        return (
+            frame.strides[1] == pixel_bytes
+            and (frame.ndim == 2 or frame.strides[2] == frame.itemsize)
+            and frame.strides[0] >= row_bytes
+        )
+
+    def update_image(self, frame: npt.NDArray) -> None:
+        """Update the image displayed in the window. The frame is used
+        without a copy if its layout allows it, e.g. a cropped frame.
+        The frame must not be modified while it is displayed.
+
+        Args:
+            frame (npt.NDArray): image
         """
-        width = frame.shape[1]
-        height = frame.shape[0]
-        self._image = QImage(frame, width, height, self._format)
+        if not self._has_qimage_layout(frame):
+            frame = np.ascontiguousarray(frame)  # e.g. a rotated view
+
+        height, width = frame.shape[:2]
+        row_bytes = frame.strides[0]
+        # padded rows are not C-contiguous, so the buffer is passed as a pointer
+        buffer = VoidPtr(frame.ctypes.data, row_bytes * height, False)
+        # the rows may be padded or not 4 bytes aligned, pass the row size
+        self._image = QImage(buffer, width, height, row_bytes, self._format)
+        self._frame = frame
+        self._scaled_image = None
 
         self.update()
 
+    @property
+    def frame(self) -> npt.NDArray | None:
+        """Displayed frame"""
+        return self._frame
+
+    @property
+    def image_size(self) -> tuple[int, int]:
+        """Image area size (width, height)"""
+        return self.width(), self.height()
+
     def show(self) -> None:
         """Show the window"""
         super().show()
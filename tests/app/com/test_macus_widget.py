@@ -20,17 +20,16 @@ def macus_widget(mocker):
     widget.quit()
 
 
+def last_line_color(widget: MacusWidget):
+    block = widget._console.document().lastBlock()
+    return block.begin().fragment().charFormat().foreground().color()
+
+
 def test_macus_widget_init(macus_widget: MacusWidget):
     assert isinstance(macus_widget._com_serial, QSerial)
     assert macus_widget._com_serial_state.isRunning() is True
-    assert (
-        macus_widget._com_serial._on_rx_callback
-        == macus_widget._add_rx_message_to_text_box
-    )
-    assert (
-        macus_widget._com_serial._on_tx_callback
-        == macus_widget._add_tx_message_to_text_box
-    )
+    assert macus_widget._com_serial._on_rx_callback == macus_widget._serial_bus.post_rx
+    assert macus_widget._com_serial._on_tx_callback == macus_widget._serial_bus.post_tx
 
 
 # check _on_port_combo_clicked
@@ -108,31 +107,66 @@ def test_add_message_to_text_box(
     message, prefix, expected_color, macus_widget: MacusWidget
 ):
     macus_widget._add_message_to_text_box(message, prefix)
+    macus_widget._console.flush()
 
-    message = message.strip()
-    if not message.endswith("\n"):
-        message += "\n"
-
-    message = prefix + message
+    message = prefix + message.strip()
     # we skip the timestamp
-    assert macus_widget._text_edit.toPlainText()[9:] == message
-    assert macus_widget._text_edit.textColor() == expected_color
+    assert macus_widget._console.toPlainText()[9:] == message
+    assert last_line_color(macus_widget) == expected_color
 
 
 def test_add_tx_message_to_text_box(macus_widget: MacusWidget):
     macus_widget._add_tx_message_to_text_box("test")
+    macus_widget._console.flush()
 
-    expected_message = macus_widget.TX_PREFIX + "test\n"
-    assert macus_widget._text_edit.toPlainText()[9:] == expected_message
-    assert macus_widget._text_edit.textColor() == Qt.white
+    expected_message = macus_widget.TX_PREFIX + "test"
+    assert macus_widget._console.toPlainText()[9:] == expected_message
+    assert last_line_color(macus_widget) == Qt.white
 
 
 def test_add_rx_message_to_text_box(macus_widget: MacusWidget):
     macus_widget._add_rx_message_to_text_box("test")
+    macus_widget._console.flush()
+
+    expected_message = macus_widget.RX_PREFIX + "test"
+    assert macus_widget._console.toPlainText()[9:] == expected_message
+    assert last_line_color(macus_widget) == Qt.white
+
+
+def test_add_tx_message_excluded(macus_widget: MacusWidget):
+    macus_widget._add_tx_message_to_text_box("data;1;2;3")
+    macus_widget._console.flush()
+
+    assert macus_widget._console.toPlainText() == ""
+
+
+def test_pause_button_toggled(macus_widget: MacusWidget):
+    macus_widget._pause_button.setChecked(True)
+    macus_widget._add_rx_message_to_text_box("test")
+    macus_widget._console.flush()
+
+    assert macus_widget._console.paused is True
+    assert macus_widget._pause_button.text() == macus_widget.BUTTON_RESUME
+    assert macus_widget._console.toPlainText() == ""
 
-    expected_message = macus_widget.RX_PREFIX + "test\n"
-    assert macus_widget._text_edit.toPlainText()[9:] == expected_message
-    assert macus_widget._text_edit.textColor() == Qt.white
+    macus_widget._pause_button.setChecked(False)
+
+    assert macus_widget._pause_button.text() == macus_widget.BUTTON_PAUSE
+    assert macus_widget._console.toPlainText()[9:] == macus_widget.RX_PREFIX + "test"
+
+
+def test_serial_events_added_to_text_box(macus_widget: MacusWidget, qapp):
+    macus_widget._com_serial._on_tx_callback("cmd")
+    macus_widget._com_serial._on_rx_callback(QSerial.ACK + "cmd")
+    qapp.processEvents()
+    macus_widget._console.flush()
+
+    lines = [line[9:] for line in macus_widget._console.toPlainText().split("\n")]
+    assert lines == [
+        macus_widget.TX_PREFIX + "cmd",
+        macus_widget.RX_PREFIX + QSerial.ACK + "cmd",
+    ]
+    assert last_line_color(macus_widget) == Qt.green
 
 
 def test_timer_routine_popup_not_visible(macus_widget, mocker):
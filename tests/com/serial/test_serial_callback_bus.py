@@ -0,0 +1,63 @@
+import threading
+import pytest
+
+from src.com.serial import SerialCallbackBus, SerialDirection
+
+
+@pytest.fixture
+def bus():
+    return SerialCallbackBus()
+
+
+def test_events_delivered_in_single_batch(bus, qapp, mocker):
+    callback = mocker.Mock()
+    bus.subscribe(callback)
+
+    bus.post_tx("cmd")
+    bus.post_rx("OK: cmd")
+    bus.post_rx("data")
+
+    callback.assert_not_called()
+    qapp.processEvents()
+
+    callback.assert_called_once()
+    batch = callback.call_args.args[0]
+    assert [(e.direction, e.message) for e in batch] == [
+        (SerialDirection.TX, "cmd"),
+        (SerialDirection.RX, "OK: cmd"),
+        (SerialDirection.RX, "data"),
+    ]
+
+
+def test_single_wake_per_batch(bus):
+    bus.post_rx("a")
+    bus.post_rx("b")
+
+    assert bus._scheduled is True
+    assert len(bus._events) == 2
+
+
+def test_empty_drain_not_emitted(bus, mocker):
+    callback = mocker.Mock()
+    bus.subscribe(callback)
+
+    bus._drain()
+
+    callback.assert_not_called()
+
+
+def test_events_posted_from_other_thread(bus, qapp, mocker):
+    callback = mocker.Mock()
+    bus.subscribe(callback)
+
+    def post():
+        for i in range(100):
+            bus.post_rx(str(i))
+
+    thread = threading.Thread(target=post)
+    thread.start()
+    thread.join()
+    qapp.processEvents()
+
+    messages = [e.message for call in callback.call_args_list for e in call.args[0]]
+    assert messages == [str(i) for i in range(100)]
@@ -0,0 +1,177 @@
+import os
+import pytest
+import numpy as np
+from src.data_parser import DerivedChannels
+from src.data_parser.data_parser_string import DataParserString
+
+INPUT_NAMES = ["time", "acc_x", "acc_y", "acc_z"]
+
+CONFIG_FILES_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_init_pass():
+    derived = DerivedChannels({"acc": "sqrt(acc_x ** 2 + acc_y ** 2)"}, INPUT_NAMES)
+
+    assert derived.names == ["acc"]
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "unknown_channel + 1",
+        "unknown_function(acc_x)",
+        "acc_x.real",
+        "__import__('os')",
+        "acc_x if acc_y else acc_z",
+        "acc_x +",
+    ],
+)
+def test_init_invalid_expression(expression):
+    with pytest.raises(ValueError):
+        DerivedChannels({"invalid": expression}, INPUT_NAMES)
+
+
+def test_init_redefined_channel():
+    with pytest.raises(ValueError):
+        DerivedChannels({"acc_x": "acc_y"}, INPUT_NAMES)
+
+
+def test_evaluate_batch():
+    derived = DerivedChannels(
+        {
+            "acc": "sqrt(acc_x ** 2 + acc_y ** 2 + acc_z ** 2)",
+            "acc_double": "2 * acc",
+        },
+        INPUT_NAMES,
+    )
+
+    batch = {
+        "time": [0, 1, 2],
+        "acc_x": [3, 0, 1],
+        "acc_y": [4, 0, 2],
+        "acc_z": [0, 5, 2],
+    }
+    result = derived.evaluate(batch)
+
+    assert np.allclose(result["acc"], [5, 5, 3])
+    assert np.allclose(result["acc_double"], [10, 10, 6])
+
+
+def test_evaluate_constant_expression():
+    derived = DerivedChannels({"one": "1"}, INPUT_NAMES)
+
+    batch = {name: [0, 0, 0] for name in INPUT_NAMES}
+    assert np.allclose(derived.evaluate(batch)["one"], [1, 1, 1])
+
+
+def test_evaluate_windowed_functions():
+    derived = DerivedChannels(
+        {
+            "average": "moving_average(acc_x, 2)",
+            "speed": "derivative(acc_x, time)",
+            "delta": "delta(acc_x)",
+        },
+        INPUT_NAMES,
+    )
+
+    batch = {
+        "time": [0, 2, 4, 6],
+        "acc_x": [2, 4, 8, 8],
+        "acc_y": [0, 0, 0, 0],
+        "acc_z": [0, 0, 0, 0],
+    }
+    result = derived.evaluate(batch)
+
+    assert np.allclose(result["average"], [2, 3, 6, 8])
+    assert np.allclose(result["speed"], [0, 1, 2, 0])
+    assert np.allclose(result["delta"], [0, 2, 4, 0])
+
+
+def test_update_uses_history():
+    derived = DerivedChannels(
+        {"average": "moving_average(acc_x, 3)"}, INPUT_NAMES, history_size=3
+    )
+
+    results = []
+    for i, value in enumerate([3, 6, 9, 12, 15]):
+        sample = {"time": i, "acc_x": value, "acc_y": 0, "acc_z": 0}
+        results.append(derived.update(sample)["average"])
+
+    assert results == pytest.approx([3, 4.5, 6, 9, 12])
+
+
+def test_update_window_limited_to_history():
+    derived = DerivedChannels(
+        {"average": "moving_average(acc_x, 10)"}, INPUT_NAMES, history_size=2
+    )
+    values = [3, 6, 9, 12]
+
+    results = [
+        derived.update({"time": i, "acc_x": value, "acc_y": 0, "acc_z": 0})["average"]
+        for i, value in enumerate(values)
+    ]
+
+    assert results == pytest.approx([3, 4.5, 7.5, 10.5])
+    batch = {"time": np.arange(4), "acc_x": values, "acc_y": 0, "acc_z": 0}
+    assert derived.evaluate(batch)["average"] == pytest.approx(results)
+
+
+def test_update_missing_channel(caplog):
+    derived = DerivedChannels({"sum": "acc_x + acc_y"}, INPUT_NAMES)
+
+    assert derived.update({"acc_x": 1}) == {}
+    assert derived.update({"acc_x": 2}) == {}
+    assert len(caplog.records) == 1
+
+
+def test_from_json_pass():
+    json_file_path = os.path.join(CONFIG_FILES_DIR, "derived_channels_config.json")
+    derived = DerivedChannels.from_JSON(json_file_path, ["time", "value"])
+
+    assert derived.names == ["sum", "value_average"]
+    assert derived.update({"time": 1, "value": 2}) == {"sum": 3, "value_average": 2}
+    assert derived.update({"time": 2, "value": 4}) == {"sum": 6, "value_average": 3}
+
+
+def test_parser_string_with_derived_channels():
+    parser = DataParserString("if", ["time", "value"])
+    parser.set_derived_channels(
+        DerivedChannels({"double": "2 * value"}, ["time", "value"])
+    )
+
+    assert parser.data_names == ["time", "value", "double"]
+    assert parser.parse("1;2.5") == {"time": 1, "value": 2.5, "double": 5.0}
+
+
+def test_update_matches_evaluate():
+    derived = DerivedChannels(
+        {
+            "average": "moving_average(acc_x, 4) + moving_average(acc_y, 2)",
+            "speed": "derivative(moving_average(acc_x, 3), time)",
+            "delta": "delta(acc_x) / 2",
+        },
+        INPUT_NAMES,
+    )
+    rng = np.random.default_rng(0)
+    batch = {
+        "time": np.arange(50) * 0.5,
+        "acc_x": rng.normal(size=50),
+        "acc_y": rng.normal(size=50),
+        "acc_z": np.zeros(50),
+    }
+
+    expected = derived.evaluate(batch)
+    for i in range(50):
+        result = derived.update({name: values[i] for name, values in batch.items()})
+        for name, values in expected.items():
+            assert result[name] == pytest.approx(values[i])
+
+
+def test_clear_history():
+    derived = DerivedChannels({"average": "moving_average(acc_x, 3)"}, INPUT_NAMES)
+    derived.update({"time": 0, "acc_x": 10, "acc_y": 0, "acc_z": 0})
+
+    derived.clear_history()
+
+    sample = {"time": 1, "acc_x": 2, "acc_y": 0, "acc_z": 0}
+    assert derived.update(sample)["average"] == 2
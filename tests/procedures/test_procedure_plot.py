@@ -0,0 +1,57 @@
+import pytest
+
+from src.procedures.procedure_parameters import ProcedureParameters
+from src.procedures.procedure_plot import ProcedurePlot
+
+
+@pytest.fixture
+def plot():
+    plot = ProcedurePlot()
+    plot.set_procedure_parameters(
+        ProcedureParameters("test", [(0, 0), (1000, 100)], 100, 500)
+    )
+    return plot
+
+
+def view_range(plot: ProcedurePlot):
+    return plot._plot_widget.getPlotItem().viewRange()
+
+
+def test_live_samples_drawn_in_batch(plot, mocker):
+    set_data = mocker.spy(plot._live_curve, "setData")
+    ranges = view_range(plot)
+
+    for time in range(10, 100, 10):
+        plot.append_live_velocity(time / 10, time)
+
+    set_data.assert_not_called()
+    plot._live_timer.timeout.emit()
+
+    set_data.assert_called_once()
+    x, y = plot._live_curve.getData()
+    assert x.tolist() == list(range(10, 100, 10))
+    assert view_range(plot) == ranges
+
+
+def test_samples_after_the_end_ignored(plot):
+    plot.append_live_velocity(50, 1001)
+
+    assert plot._live_size == 0
+
+
+def test_restart_clears_live_velocity(plot):
+    plot.append_live_velocity(1, 500)
+    plot.append_live_velocity(2, 100)
+
+    assert plot._live_size == 1
+    assert plot._live_time[0] == 100
+
+
+def test_full_buffer_keeps_newer_samples(plot, mocker):
+    mocker.patch.object(plot, "LIVE_CAPACITY", 4)
+    plot._live_size = 4
+    plot._live_time[:4] = [1, 2, 3, 4]
+
+    plot.append_live_velocity(1, 5)
+
+    assert plot._live_time[: plot._live_size].tolist() == [3, 4, 5]
@@ -0,0 +1,128 @@
+import zlib
+import pytest
+from collections import Counter, deque
+from serial import SerialTimeoutException
+
+from src.com.serial import SerialPort
+from src.procedures.procedure_upload import ProcedureUploader, split_profile
+
+PROFILE = " ".join(f"{t * 10};{t * 100}" for t in range(200))
+
+
+class FirmwareMock:
+    """Serial port answering the upload commands like the firmware, the
+    chunks failures are given as {chunk number: failures count}
+    """
+
+    ACK = SerialPort.ACK
+    NACK = SerialPort.NACK
+    READ_TIMEOUT_S = SerialPort.READ_TIMEOUT_S
+
+    def __init__(self, lost=None, corrupted=None, busy=None, locked=None) -> None:
+        self.chunks: dict[int, str] = {}
+        self.read_timeout_s = self.READ_TIMEOUT_S
+        self.commands: list[str] = []
+        self.max_in_flight = 0
+        self._responses = deque()
+        self._lost = Counter(lost)
+        self._corrupted = Counter(corrupted)
+        self._busy = Counter(busy)
+        self._locked = Counter(locked)
+
+    @staticmethod
+    def _fail(failures: Counter, seq: int) -> bool:
+        if failures[seq] > 0:
+            failures[seq] -= 1
+            return True
+        return False
+
+    def write(self, data: str, reset_buffers: bool = True) -> None:
+        name, _, args = data.partition(" ")
+        if name != ProcedureUploader.CHUNK_COMMAND:
+            self.commands.append(name)
+            return
+
+        seq, crc, chunk = args.split(" ", 2)
+        seq = int(seq)
+        if self._fail(self._busy, seq):
+            raise SerialTimeoutException("Write timeout")
+        if self._fail(self._locked, seq):
+            raise TimeoutError("Can't write to a serial: unable to lock the mutex")
+        if self._fail(self._lost, seq):
+            return
+
+        valid = f"{zlib.crc32(chunk.encode()):08x}" == crc
+        if self._fail(self._corrupted, seq):
+            valid = False
+
+        if valid:
+            self.chunks[seq] = chunk
+        self._responses.append(f"{self.ACK if valid else self.NACK}{seq}")
+        self.max_in_flight = max(self.max_in_flight, len(self._responses))
+
+    def read(self, read_timeout_s: float = 0.1) -> str:
+        self.read_timeout_s = read_timeout_s
+        return self._responses.popleft() if self._responses else ""
+
+    def set_read_timeout(self, read_timeout_s: float = READ_TIMEOUT_S) -> None:
+        self.read_timeout_s = read_timeout_s
+
+    def write_command(self, command_name: str, *argv) -> None:
+        self.write(command_name)
+
+    @property
+    def profile(self) -> str:
+        return " ".join(self.chunks[seq] for seq in sorted(self.chunks))
+
+
+def upload(firmware: FirmwareMock):
+    uploader = ProcedureUploader(firmware)
+    uploader.ACK_TIMEOUT_S = 0.01
+
+    return uploader.upload(PROFILE, "100", "500")
+
+
+def test_split_profile_whole_steps():
+    chunks = split_profile(PROFILE, 64)
+
+    assert all(len(chunk) <= 64 for chunk in chunks)
+    assert " ".join(chunks) == PROFILE
+
+
+def test_upload_pipelined():
+    firmware = FirmwareMock()
+
+    stats = upload(firmware)
+
+    assert firmware.profile == PROFILE
+    assert firmware.commands == [
+        ProcedureUploader.BEGIN_COMMAND,
+        ProcedureUploader.COMMIT_COMMAND,
+    ]
+    assert firmware.max_in_flight == ProcedureUploader.WINDOW
+    assert stats.chunks == len(firmware.chunks)
+    assert stats.retries == 0
+    assert firmware.read_timeout_s == SerialPort.READ_TIMEOUT_S
+
+
+@pytest.mark.parametrize(
+    "failure",
+    [{"lost": {1: 1}}, {"corrupted": {3: 2}}, {"busy": {0: 1}}, {"locked": {2: 1}}],
+)
+def test_failed_chunks_sent_again(failure):
+    firmware = FirmwareMock(**failure)
+
+    stats = upload(firmware)
+
+    assert firmware.profile == PROFILE
+    assert stats.retries == sum(next(iter(failure.values())).values())
+
+
+def test_upload_fails_after_max_attempts():
+    firmware = FirmwareMock(corrupted={2: ProcedureUploader.MAX_ATTEMPTS})
+
+    with pytest.raises(TimeoutError):
+        upload(firmware)
+
+    assert ProcedureUploader.COMMIT_COMMAND not in firmware.commands
+    assert firmware.read_timeout_s == SerialPort.READ_TIMEOUT_S
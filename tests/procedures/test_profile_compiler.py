@@ -0,0 +1,86 @@
+import json
+import os
+import numpy as np
+import pytest
+
+from src.procedures.procedure_parameters import ProcedureParameters
+from src.procedures.profile_compiler import compile_profile
+
+
+def staircase_error(profile, time_ms, velocity) -> float:
+    """Largest difference between the steps and the profile, sampled every 0.1 ms"""
+    t = np.arange(time_ms[0], time_ms[-1], 0.1)
+    index = np.searchsorted(profile.times_ms, t, side="right") - 1
+    return np.max(np.abs(profile.velocities[index] - np.interp(t, time_ms, velocity)))
+
+
+def test_ramp_within_error_bound():
+    time_ms, velocity = [0, 1000, 2000], [0, 10_000, 10_000]
+
+    profile = compile_profile(time_ms, velocity, 500)
+
+    assert profile.steps == 10 + 2  # ramp steps, hold and the end
+    # integer ms and velocity rounding
+    assert staircase_error(profile, time_ms, velocity) <= 500 + 10 * 0.5 + 0.5
+
+
+@pytest.mark.parametrize("max_error", [50, 200, 1000])
+def test_fewer_steps_for_larger_error(max_error):
+    time_ms, velocity = [0, 3000, 6000, 6000], [0, 30_000, -30_000, 0]
+
+    profile = compile_profile(time_ms, velocity, max_error)
+
+    # the ramps share the step at the peak, the end is added
+    up, down = 30_000 / (2 * max_error), 60_000 / (2 * max_error)
+    assert profile.steps == up + down - 1 + 1
+    assert staircase_error(profile, time_ms, velocity) <= max_error + 1
+    assert np.all(np.diff(profile.times_ms) > 0)
+
+
+def test_jump_and_end_kept():
+    profile = compile_profile([0, 100, 100, 200, 200], [0, 0, 500, 500, 0], 100)
+
+    assert profile.command == "0;0 100;500 200;0"
+    assert profile.size_bytes == len(b"0;0 100;500 200;0")
+
+
+def test_steep_ramp_limited_by_step_duration():
+    profile = compile_profile([0, 5], [0, 100_000], 10)
+
+    assert profile.times_ms.tolist() == [0, 1, 2, 3, 4, 5]
+
+
+def test_invalid_error_bound():
+    with pytest.raises(ValueError):
+        compile_profile([0, 1], [0, 1], 0)
+
+
+def test_procedure_profile_args():
+    procedure = ProcedureParameters("test", [(0, 0), (1000, 2000)], 100, 500)
+
+    movement, press, depr = procedure.procedure_profile_args(max_velocity_error=500)
+
+    assert movement == "0;500 500;1500 1000;0"
+    assert (press, depr) == ("100", "500")
+
+
+PROCEDURES_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "config", "procedures.json"
+)
+# steps sent with the former 7 points per ramp
+BASELINE_STEPS = {
+    "procedure_mock": 30,
+    "motion_test": 9,
+    "pressurization_test": 2,
+    "t1": 52,
+    "t2": 52,
+}
+
+
+def test_shipped_procedures_not_longer_than_baseline():
+    with open(PROCEDURES_FILE) as file:
+        procedures = [ProcedureParameters.from_dict(item) for item in json.load(file)]
+
+    for procedure in procedures:
+        profile = procedure.compile_profile()
+        assert profile.steps <= BASELINE_STEPS[procedure.name], procedure.name
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from src.procedures.tracking_analytics import (
+    TrackingAlarm,
+    TrackingAnalytics,
+    TrackingThresholds,
+)
+
+TIME_MS = [0, 1000, 2000, 2000]
+VELOCITY = [0, 10_000, 10_000, 0]
+
+
+@pytest.fixture
+def analytics():
+    analytics = TrackingAnalytics(TrackingThresholds(500, 300, 50))
+    analytics.set_profile(TIME_MS, VELOCITY)
+    return analytics
+
+
+def test_commanded_velocity_interpolated(analytics):
+    times = np.linspace(0, 1999, 50)
+
+    commanded = [analytics.commanded_velocity(t) for t in times]
+
+    np.testing.assert_allclose(commanded, np.interp(times, TIME_MS[:3], VELOCITY[:3]))
+    assert analytics.commanded_velocity(2000) == 0  # jump at the end
+
+
+def test_exact_tracking(analytics):
+    for t in range(0, 2000, 10):
+        analytics.add_sample(t, analytics.commanded_velocity(t))
+
+    stats = analytics.stats
+    assert stats.samples == 200
+    assert (stats.rms_error, stats.max_error, stats.lag_ms) == (0, 0, 0)
+
+
+def test_lag_estimated_on_ramp(analytics):
+    # the motor follows the profile 20 ms late, slope 10 per ms
+    for t in range(20, 1000, 10):
+        analytics.add_sample(t, analytics.commanded_velocity(t - 20))
+
+    stats = analytics.stats
+    assert stats.lag_ms == pytest.approx(20, rel=0.01)
+    assert stats.max_error == pytest.approx(200)
+    assert stats.rms_error == pytest.approx(200)
+
+
+def test_alarm_emitted_once_per_crossing(analytics, mocker):
+    alarm = mocker.stub()
+    analytics.alarm.connect(alarm)
+
+    analytics.add_sample(1500, 10_000 - 600)
+    analytics.add_sample(1510, 10_000 - 700)
+
+    alarms = [call.args[0] for call in alarm.mock_calls]
+    assert alarms == [TrackingAlarm.MAX_ERROR, TrackingAlarm.RMS_ERROR]
+    assert analytics.active_alarms == {TrackingAlarm.MAX_ERROR, TrackingAlarm.RMS_ERROR}
+
+    analytics.add_sample(1520, 10_000)
+    assert TrackingAlarm.MAX_ERROR not in analytics.active_alarms
+
+
+def test_samples_outside_profile_ignored(analytics):
+    analytics.add_sample(-10, 100)
+    analytics.add_sample(2500, 100)
+
+    assert analytics.stats.samples == 0
+
+
+def test_new_run_resets_statistics(analytics):
+    analytics.add_sample(1500, 0)
+    analytics.add_sample(100, analytics.commanded_velocity(100))
+
+    assert analytics.stats.samples == 1
+    assert analytics.stats.max_error == 0
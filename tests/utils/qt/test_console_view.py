@@ -0,0 +1,105 @@
+import pytest
+from PySide6.QtCore import Qt
+
+from src.utils.qt.console_view import ConsoleLine, ConsoleModel, QConsoleView
+
+MAX_LINES = 5
+
+
+@pytest.fixture
+def console():
+    return QConsoleView(MAX_LINES)
+
+
+def test_model_invalid_max_lines():
+    with pytest.raises(ValueError):
+        ConsoleModel(0)
+
+
+def test_model_ring_buffer():
+    model = ConsoleModel(MAX_LINES)
+
+    for i in range(MAX_LINES * 2):
+        model.append(ConsoleLine(str(i)))
+
+    assert len(model) == MAX_LINES
+    assert [line.text for line in model.lines()] == ["5", "6", "7", "8", "9"]
+
+
+def test_model_filter():
+    model = ConsoleModel(MAX_LINES)
+    model.append(ConsoleLine("RX: OK"))
+    model.append(ConsoleLine("TX: cmd"))
+    model.append(ConsoleLine("RX: ERR"))
+
+    assert [line.text for line in model.lines("RX")] == ["RX: OK", "RX: ERR"]
+
+
+def test_lines_displayed_after_flush(console):
+    console.append_line("a")
+    console.append_line("b", Qt.red)
+
+    assert console.toPlainText() == ""
+
+    console.flush()
+
+    assert console.toPlainText() == "a\nb"
+    color = console.document().lastBlock().begin().fragment().charFormat()
+    assert color.foreground().color() == Qt.red
+
+
+def test_formats_are_cached(console):
+    console.append_line("a", Qt.green)
+    console.append_line("b", Qt.green)
+    console.flush()
+
+    assert len(console._formats) == 1
+
+
+def test_line_count_is_bounded(console):
+    for i in range(MAX_LINES * 3):
+        console.append_line(str(i))
+        if i % 2:
+            console.flush()
+    console.flush()
+
+    assert console.document().blockCount() == MAX_LINES
+    assert console.toPlainText() == "10\n11\n12\n13\n14"
+
+
+def test_pause(console):
+    console.set_paused(True)
+    console.append_line("a")
+    console.flush()
+
+    assert console.toPlainText() == ""
+
+    console.set_paused(False)
+
+    assert console.toPlainText() == "a"
+
+
+def test_filter(console):
+    console.append_line("RX: a")
+    console.append_line("TX: b")
+    console.flush()
+
+    console.set_filter("TX")
+    assert console.toPlainText() == "TX: b"
+
+    console.append_line("RX: c")
+    console.append_line("TX: d")
+    console.flush()
+    assert console.toPlainText() == "TX: b\nTX: d"
+
+    console.set_filter("")
+    assert console.toPlainText() == "RX: a\nTX: b\nRX: c\nTX: d"
+
+
+def test_clear_console(console):
+    console.append_line("a")
+    console.flush()
+    console.clear_console()
+
+    assert console.toPlainText() == ""
+    assert len(console.model) == 0
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from PySide6.QtGui import QImage
+
+from src.utils.qt.image_display_window import ImageDisplayWindow
+
+
+@pytest.fixture
+def window():
+    window = ImageDisplayWindow("CAM1", (300, 200), format=QImage.Format.Format_BGR888)
+    window.show()
+    yield window
+    window.hide()
+
+
+def gradient() -> np.ndarray:
+    frame = np.zeros((40, 60, 3), np.uint8)
+    frame[..., 0] = np.arange(60, dtype=np.uint8)
+    return frame
+
+
+def test_cropped_frame_not_copied(window):
+    frame = gradient()[5:25, 10:50]  # padded rows
+
+    window.update_image(frame)
+
+    assert window.frame is frame
+    assert window._image.size().toTuple() == (40, 20)
+    assert window._image.pixelColor(0, 0).blue() == 10
+
+
+def test_rotated_frame_copied(window):
+    frame = np.rot90(gradient())
+
+    window.update_image(frame)
+
+    assert window.frame is not frame
+    assert window.frame.flags.c_contiguous
+    assert window._image.size().toTuple() == (40, 60)
+    assert window._image.pixelColor(0, 0).blue() == 59
+
+
+def test_scaled_image_cached(window, qapp):
+    window.update_image(np.zeros((400, 600, 3), np.uint8))
+    qapp.processEvents()
+    scaled = window._scaled_image
+
+    qapp.processEvents()
+    assert window._scaled_image is scaled
+    assert scaled.width() <= window.width()
+
+    window.update_image(np.zeros((400, 600, 3), np.uint8))
+    assert window._scaled_image is None
+
+
+def test_resize_invalidates_scaled_image(window, qapp):
+    window.update_image(np.zeros((400, 600, 3), np.uint8))
+    qapp.processEvents()
+
+    scaled = window._scaled_image
+
+    window.resize(500, 400)
+    qapp.processEvents()
+
+    assert window._scaled_image is not scaled
+    assert window._scaled_image.width() == 500
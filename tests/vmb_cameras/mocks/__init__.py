@@ -1,2 +1,3 @@
 from tests.vmb_cameras.mocks.vmb_mock import VmbInstance
-from tests.vmb_cameras.mocks.vmb_camera_mock import VmbCameraMock
+from tests.vmb_cameras.mocks.vmb_camera_mock import VmbCameraMock, VmbFeatureMock
+from tests.vmb_cameras.mocks.vmb_frame_mock import VmbFrameMock
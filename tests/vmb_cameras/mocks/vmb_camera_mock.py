@@ -1,10 +1,31 @@
-from typing import Callable
+from typing import Any, Callable
 import numpy as np
+from vmbpy import VmbFeatureError
+
+
+class VmbFeatureMock:
+    def __init__(self, value: Any, writeable: bool = True, valid=None) -> None:
+        self._value = value
+        self._writeable = writeable
+        self._valid = valid  # value validator
+
+    def get(self) -> Any:
+        return self._value
+
+    def set(self, value: Any) -> None:
+        if self._valid and not self._valid(value):
+            raise VmbFeatureError(f"Invalid value {value}")
+        self._value = value
+
+    def is_writeable(self) -> bool:
+        return self._writeable
 
 
 class VmbCameraMock:
-    def __init__(self, camera_id: str) -> None:
+    def __init__(self, camera_id: str, features: dict = None) -> None:
         self._camera_id = camera_id
+        self._on_frame = None
+        self.features: dict[str, VmbFeatureMock] = features or {}
 
     def get_id(self) -> str:
         return self._camera_id
@@ -16,7 +37,21 @@ class VmbCameraMock:
         pass
 
     def start_streaming(self, on_frame: Callable[[np.ndarray], None]) -> None:
-        pass
+        self._on_frame = on_frame
 
     def stop_streaming(self) -> None:
+        self._on_frame = None
+
+    def is_streaming(self) -> bool:
+        return self._on_frame is not None
+
+    def get_feature_by_name(self, name: str) -> VmbFeatureMock:
+        if name not in self.features:
+            raise VmbFeatureError(f"Feature {name} not found")
+        return self.features[name]
+
+    def load_settings(self, file_path: str, persist_type) -> None:
+        pass
+
+    def queue_frame(self, frame) -> None:
         pass
@@ -0,0 +1,39 @@
+import numpy as np
+from vmbpy import FrameStatus, PixelFormat
+
+
+class VmbFrameMock:
+    def __init__(
+        self,
+        data: np.ndarray,
+        frame_id: int = 0,
+        timestamp: int = 0,
+        status: FrameStatus = FrameStatus.Complete,
+        pixel_format: PixelFormat = PixelFormat.BayerRG8,
+    ) -> None:
+        self._data = data
+        self._frame_id = frame_id
+        self._timestamp = timestamp
+        self._status = status
+        self._pixel_format = pixel_format
+
+    def get_id(self) -> int:
+        return self._frame_id
+
+    def get_timestamp(self) -> int:
+        return self._timestamp
+
+    def get_status(self) -> FrameStatus:
+        return self._status
+
+    def get_pixel_format(self) -> PixelFormat:
+        return self._pixel_format
+
+    def get_width(self) -> int:
+        return self._data.shape[1]
+
+    def get_height(self) -> int:
+        return self._data.shape[0]
+
+    def as_numpy_ndarray(self) -> np.ndarray:
+        return self._data
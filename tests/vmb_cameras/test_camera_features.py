@@ -0,0 +1,176 @@
+import pytest
+from vmbpy import PixelFormat
+
+from src.cameras.camera_features import (
+    CaptureProfile,
+    apply_capture_profile,
+    apply_processing_features,
+    get_feature,
+    set_feature,
+)
+from src.cameras.frame_processing import ProcessingConfig
+from tests.vmb_cameras.mocks import VmbCameraMock, VmbFeatureMock
+
+WIDTH = 1936
+HEIGHT = 1216
+
+
+def even(value) -> bool:
+    return value % 2 == 0
+
+
+@pytest.fixture
+def camera():
+    features = {
+        "ReverseX": VmbFeatureMock(False),
+        "ReverseY": VmbFeatureMock(False),
+        "OffsetX": VmbFeatureMock(0, valid=even),
+        "OffsetY": VmbFeatureMock(0, valid=even),
+        "Width": VmbFeatureMock(WIDTH, valid=lambda v: v % 8 == 0),
+        "Height": VmbFeatureMock(HEIGHT, valid=even),
+        "WidthMax": VmbFeatureMock(WIDTH, writeable=False),
+        "HeightMax": VmbFeatureMock(HEIGHT, writeable=False),
+    }
+    return VmbCameraMock("Camera1", features)
+
+
+def test_get_feature(camera):
+    assert get_feature(camera, "Width") == WIDTH
+    assert get_feature(camera, "Unknown", 5) == 5
+
+
+def test_set_feature(camera):
+    assert set_feature(camera, "Width", 800) is True
+    assert get_feature(camera, "Width") == 800
+    assert set_feature(camera, "Width", 801) is False
+    assert set_feature(camera, "WidthMax", 800) is False
+    assert set_feature(camera, "Unknown", 1) is False
+
+
+@pytest.mark.parametrize(
+    "flip, rotate, reverse",
+    [
+        (1, None, (True, False)),
+        (0, None, (False, True)),
+        (-1, None, (True, True)),
+        (None, 1, (True, True)),  # cv2.ROTATE_180
+        (1, 0, (True, False)),  # cv2.ROTATE_90_CLOCKWISE
+    ],
+)
+def test_reverse_features(camera, flip, rotate, reverse):
+    config = ProcessingConfig(rotate=rotate, flip=flip)
+
+    offload = apply_processing_features(camera, config)
+
+    assert (offload.reverse_x, offload.reverse_y) == reverse
+    assert (get_feature(camera, "ReverseX"), get_feature(camera, "ReverseY")) == reverse
+
+
+def test_roi_feature(camera):
+    config = ProcessingConfig(rotate=None, crop=(100, 200, 800, 600))
+
+    offload = apply_processing_features(camera, config)
+
+    assert offload.roi is True
+    assert get_feature(camera, "OffsetX") == 100
+    assert get_feature(camera, "OffsetY") == 200
+    assert get_feature(camera, "Width") == 800
+    assert get_feature(camera, "Height") == 600
+
+
+def test_invalid_roi_restores_full_sensor(camera):
+    config = ProcessingConfig(rotate=None, crop=(100, 200, 802, 600))
+
+    offload = apply_processing_features(camera, config)
+
+    assert offload.roi is False
+    assert get_feature(camera, "OffsetX") == 0
+    assert get_feature(camera, "Width") == WIDTH
+    assert get_feature(camera, "Height") == HEIGHT
+
+
+def test_roi_not_set_when_reversed(camera):
+    config = ProcessingConfig(rotate=None, flip=1, crop=(100, 200, 800, 600))
+
+    offload = apply_processing_features(camera, config)
+
+    assert offload.reverse_x is True
+    assert offload.roi is False
+
+
+def test_camera_features_disabled(camera):
+    config = ProcessingConfig(flip=1, camera_features=False)
+
+    offload = apply_processing_features(camera, config)
+
+    assert offload.reverse_x is False
+    assert get_feature(camera, "ReverseX") is False
+
+
+@pytest.fixture
+def readout_camera(camera):
+    camera.features.update(
+        {
+            "PixelFormat": VmbFeatureMock("BayerRG8"),
+            "BinningHorizontal": VmbFeatureMock(1, valid=lambda v: v in (1, 2)),
+            "BinningVertical": VmbFeatureMock(1, valid=lambda v: v in (1, 2)),
+            "AcquisitionFrameRateEnable": VmbFeatureMock(False),
+            "AcquisitionFrameRate": VmbFeatureMock(30.0),
+        }
+    )
+    return camera
+
+
+def test_capture_profile(readout_camera):
+    profile = CaptureProfile(PixelFormat.Mono8, 2, 15, (0, 0, 400, 300))
+
+    apply_capture_profile(readout_camera, profile, ProcessingConfig())
+
+    assert get_feature(readout_camera, "PixelFormat") == "Mono8"
+    assert get_feature(readout_camera, "BinningHorizontal") == 2
+    assert get_feature(readout_camera, "BinningVertical") == 2
+    assert get_feature(readout_camera, "AcquisitionFrameRateEnable") is True
+    assert get_feature(readout_camera, "AcquisitionFrameRate") == 15
+    assert get_feature(readout_camera, "Width") == 400
+
+
+def test_capture_profile_keeps_settings(readout_camera):
+    config = ProcessingConfig(crop=(100, 200, 800, 600))
+
+    apply_capture_profile(readout_camera, CaptureProfile(roi=(0, 0, 400, 300)), config)
+
+    assert get_feature(readout_camera, "PixelFormat") == "BayerRG8"
+    assert get_feature(readout_camera, "BinningHorizontal") == 1
+    assert get_feature(readout_camera, "AcquisitionFrameRateEnable") is False
+    # the processing crop is used instead of the profile ROI
+    assert get_feature(readout_camera, "Width") == WIDTH
+
+
+def test_binned_crop(readout_camera):
+    config = ProcessingConfig(crop=(102, 200, 800, 602))
+
+    binned = apply_capture_profile(readout_camera, CaptureProfile(binning=2), config)
+
+    assert binned.crop == (50, 100, 400, 300)
+    assert binned.rotate == config.rotate
+
+
+def test_unsupported_binning_restored(readout_camera):
+    config = ProcessingConfig(crop=(100, 200, 800, 600))
+
+    binned = apply_capture_profile(readout_camera, CaptureProfile(binning=4), config)
+
+    assert binned.crop == config.crop
+
+    assert get_feature(readout_camera, "BinningHorizontal") == 1
+    assert get_feature(readout_camera, "BinningVertical") == 1
+
+
+def test_decimation_without_binning(camera):
+    camera.features["DecimationHorizontal"] = VmbFeatureMock(1)
+    camera.features["DecimationVertical"] = VmbFeatureMock(1)
+
+    apply_capture_profile(camera, CaptureProfile(binning=2), ProcessingConfig())
+
+    assert get_feature(camera, "DecimationHorizontal") == 2
+    assert get_feature(camera, "DecimationVertical") == 2
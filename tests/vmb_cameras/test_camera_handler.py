@@ -0,0 +1,254 @@
+import time
+import numpy as np
+import pytest
+from vmbpy import FrameStatus, PixelFormat
+
+from src.cameras.camera_handler import CameraHandler, CameraState
+from src.cameras.camera_features import CaptureProfile
+from src.cameras.frame_dispatch import QueueConfig, QueuePolicy
+from src.cameras.frame_processing import CameraOffload, ColorMode, ProcessingConfig
+from tests.vmb_cameras.mocks import VmbCameraMock, VmbFrameMock
+
+HEIGHT = 4
+WIDTH = 6
+
+
+@pytest.fixture
+def camera():
+    return VmbCameraMock("Camera1")
+
+
+@pytest.fixture
+def handler(camera):
+    return CameraHandler(camera)
+
+
+def register_mock_handler(handler, mocker, raw: bool = False):
+    frame_handler = mocker.Mock(
+        RAW_FRAMES=raw, QUEUE=QueueConfig(8, QueuePolicy.DROP_NEWEST)
+    )
+    handler.register_frame_handler(frame_handler)
+    return frame_handler
+
+
+def bayer_frame(frame_id: int = 0, status=FrameStatus.Complete) -> VmbFrameMock:
+    data = np.full((HEIGHT, WIDTH, 1), frame_id, dtype=np.uint8)
+    return VmbFrameMock(data, frame_id, frame_id * 1000, status)
+
+
+def test_on_frame_copies_to_pool(handler, camera, mocker):
+    queue_spy = mocker.spy(camera, "queue_frame")
+    frame = bayer_frame(7)
+
+    handler._on_frame(camera, None, frame)
+
+    queue_spy.assert_called_once_with(frame)
+    pooled_frame = handler._get_the_newest_frame()
+    assert pooled_frame.data is not frame.as_numpy_ndarray()
+    assert np.array_equal(pooled_frame.data, frame.as_numpy_ndarray())
+    assert pooled_frame.info.frame_id == 7
+    assert pooled_frame.info.timestamp == 7000
+    assert pooled_frame.info.camera_id == "Camera1"
+    assert pooled_frame.info.pixel_format == PixelFormat.BayerRG8
+
+
+def test_on_frame_incomplete(handler, camera, mocker):
+    queue_spy = mocker.spy(camera, "queue_frame")
+    frame = bayer_frame(status=FrameStatus.Incomplete)
+
+    handler._on_frame(camera, None, frame)
+
+    queue_spy.assert_called_once_with(frame)
+    assert handler._get_the_newest_frame() is None
+    assert handler.metrics.counters.frames_incomplete == 1
+
+
+def test_on_frame_drops_oldest_frame(handler, camera):
+    for frame_id in range(handler.FRAME_POOL_SIZE * 2):
+        handler._on_frame(camera, None, bayer_frame(frame_id))
+
+    pooled_frame = handler._get_the_newest_frame()
+    assert pooled_frame.info.frame_id == handler.FRAME_POOL_SIZE * 2 - 1
+    # the dropped frames were returned to the pool
+    assert handler._frame_pool.available == handler.FRAME_POOL_SIZE - 1
+    assert handler.metrics.counters.frames_received == handler.FRAME_POOL_SIZE * 2
+    assert handler.metrics.counters.dropped_queue == handler.FRAME_POOL_SIZE * 2 - 1
+
+
+def test_handle_frames_debayers_and_releases(handler, camera, mocker):
+    frame_handler = register_mock_handler(handler, mocker)
+
+    handler._on_frame(camera, None, bayer_frame(1))
+    handler._handle_frames()
+    handler._dispatch_processed_frames(wait=True)
+    handler._stop_dispatchers()
+
+    frame = frame_handler.add_frame.call_args.args[0]
+    assert frame.shape == (WIDTH, HEIGHT, 3)
+    assert handler._frame_pool.available == handler.FRAME_POOL_SIZE
+
+
+def test_processed_frames_dispatched_in_order(handler, camera, mocker):
+    frame_handler = register_mock_handler(handler, mocker)
+
+    for frame_id in range(1, 6):
+        handler._on_frame(camera, None, bayer_frame(frame_id))
+        handler._handle_frames()
+
+        assert len(handler._processing) <= handler.MAX_FRAMES_IN_PROCESSING
+
+    while handler._processing:
+        handler._dispatch_processed_frames(wait=True)
+    handler._stop_dispatchers()
+
+    frame_ids = [call.args[0][0, 0, 0] for call in frame_handler.add_frame.mock_calls]
+    assert frame_ids == sorted(frame_ids)
+    assert len(frame_ids) == 5
+
+
+def test_processing_error_is_logged(handler, camera, mocker):
+    frame_handler = register_mock_handler(handler, mocker)
+    frame = bayer_frame(1)
+    frame._pixel_format = PixelFormat.Mono12
+
+    handler._on_frame(camera, None, frame)
+    handler._handle_frames()
+    handler._dispatch_processed_frames(wait=True)
+
+    frame_handler.add_frame.assert_not_called()
+    assert handler._frame_pool.available == handler.FRAME_POOL_SIZE
+    assert handler.metrics.counters.dropped_handler == 1
+
+
+def test_raw_frames_skip_processing(handler, camera, mocker):
+    frame_handler = register_mock_handler(handler, mocker, raw=True)
+
+    handler._on_frame(camera, None, bayer_frame(7))
+    handler._handle_frames()
+    handler._stop_dispatchers()
+
+    frame, info = frame_handler.add_frame.call_args.args
+    assert frame.shape == (HEIGHT, WIDTH, 1)
+    assert info.frame_id == 7
+    # no handler needs the processed frame, so it is not submitted
+    assert len(handler._processing) == 0
+    # the pool was extended for the handler queue, the frame was returned
+    pool_size = handler.FRAME_POOL_SIZE + frame_handler.QUEUE.depth
+    assert handler._frame_pool.available == pool_size
+
+
+def test_handlers_get_processing(handler, mocker):
+    frame_handler = register_mock_handler(handler, mocker, raw=True)
+    config = ProcessingConfig(ColorMode.GRAY)
+
+    handler.set_processing_config(config)
+    handler._stop_dispatchers()
+
+    processing, offload = frame_handler.set_processing.call_args.args
+    assert processing is config
+    assert offload == CameraOffload()
+
+
+def test_streaming_commands(handler, camera):
+    handler.start_streaming()
+    handler._process_commands()
+    assert camera.is_streaming() is True
+
+    handler.stop_streaming()
+    handler._process_commands()
+    assert camera.is_streaming() is False
+
+
+def test_stop_streaming_with_running_handler(handler, camera, mocker):
+    handler._handlers.append(mocker.Mock(is_running=True))
+
+    handler.start_streaming()
+    handler.stop_streaming()
+    handler._process_commands()
+
+    assert camera.is_streaming() is True
+
+
+def test_wait_for_frame_woken_up(handler):
+    handler.start_streaming()
+
+    start = time.monotonic()
+    handler._handle_frames(handler.FRAME_WAIT_TIMEOUT_S)
+
+    assert time.monotonic() - start < handler.FRAME_WAIT_TIMEOUT_S
+
+
+def test_wait_for_frame_timeout(handler):
+    start = time.monotonic()
+    handler._handle_frames(0.05)
+
+    assert time.monotonic() - start >= 0.05
+
+
+def test_thread_quit_wakes_the_loop(handler, camera, mocker):
+    mocker.patch.object(handler, "FRAME_WAIT_TIMEOUT_S", 10)
+    handler.start()
+    handler.start_streaming()
+    time.sleep(0.2)  # thread start delay
+
+    assert camera.is_streaming() is True
+
+    start = time.monotonic()
+    handler.quit()
+
+    assert time.monotonic() - start < 1
+    assert camera.is_streaming() is False
+
+
+def test_run_reports_states(handler, mocker):
+    mocker.patch.object(handler, "_thread_loop")
+    states = []
+    handler.state_changed.connect(states.append)
+    initialized = mocker.Mock()
+    handler.initialized.connect(initialized)
+
+    handler.run()
+
+    assert states == [CameraState.OPENING, CameraState.READY, CameraState.STOPPED]
+    initialized.assert_called_once()
+
+
+def test_run_reports_error(handler, camera, mocker):
+    mocker.patch.object(camera, "load_settings", side_effect=RuntimeError("failed"))
+    error = mocker.Mock()
+    handler.error.connect(error)
+
+    handler.run()
+
+    assert handler.state == CameraState.ERROR
+    error.assert_called_once()
+
+
+def test_capture_profile_reloads_settings(handler, camera, mocker):
+    load_settings = mocker.spy(camera, "load_settings")
+    mocker.patch.object(handler, "isRunning", return_value=True)
+    handler.start_streaming()
+    handler._process_commands()
+
+    handler.set_capture_profile(CaptureProfile(fps=10))
+    handler._process_commands()
+
+    load_settings.assert_called_once()
+    assert handler._capture_profile.fps == 10
+    assert camera.is_streaming() is True
+
+
+def test_capture_profile_applied(handler, mocker):
+    mocker.patch.object(handler, "isRunning", return_value=True)
+    applied = mocker.Mock()
+    handler.profile_applied.connect(applied)
+    handler.start_streaming()
+    handler._process_commands()
+
+    handler.set_capture_profile(CaptureProfile(fps=10))
+    assert handler.capture_profile_applied is False
+
+    handler._process_commands()
+    handler._process_commands()
+    assert handler.capture_profile_applied is True
+    applied.assert_called_once_with(handler.id)
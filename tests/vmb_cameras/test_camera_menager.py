@@ -170,6 +170,7 @@ def test_camera_change_handler_calls(mocker, camera_event):
     cameras_menager = CamerasMenagerMock()
     camera = VmbCameraMock("camera_foo")
     cameras_menager._camera_change_handler(camera, camera_event)
+    cameras_menager._process_camera_events(0)
 
     match camera_event:
         case CameraEvent.Detected:
@@ -199,6 +200,7 @@ def test_camera_change_handler_signal(mocker, camera_event):
         cameras_menager._camera_change_handler(camera, CameraEvent.Detected)
 
     cameras_menager._camera_change_handler(camera, camera_event)
+    cameras_menager._process_camera_events(0)
 
     match camera_event:
         case CameraEvent.Detected:
@@ -209,6 +211,60 @@ def test_camera_change_handler_signal(mocker, camera_event):
             assert not stub.called
 
 
+def test_camera_change_handler_only_queues(mocker):
+    spy_detected = mocker.spy(CamerasMenagerMock, "_on_camera_detected")
+
+    cameras_menager = CamerasMenagerMock()
+    cameras_menager._camera_change_handler(
+        VmbCameraMock("camera_foo"), CameraEvent.Detected
+    )
+
+    # handled later by the manager thread
+    assert spy_detected.call_count == 0
+    cameras_menager._process_camera_events(0)
+    assert spy_detected.call_count == 1
+
+
+def test_missing_camera_removed_after_thread_finished(mocker):
+    stub = mocker.stub()
+    cameras_menager = CamerasMenagerMock()
+    cameras_menager.camera_removed.connect(stub)
+    camera = VmbCameraMock("camera_foo")
+    cameras_menager._on_camera_detected(camera)
+    handler = cameras_menager._cameras_handlers["camera_foo"]
+    mocker.patch.object(handler, "isRunning", return_value=True)
+
+    cameras_menager._on_camera_missing(camera)
+    cameras_menager._remove_finished_handlers()
+
+    assert handler._stop_signal.occurs()
+    stub.assert_not_called()
+
+    handler.isRunning.return_value = False
+    cameras_menager._remove_finished_handlers()
+
+    stub.assert_called_once_with(handler)
+    assert cameras_menager._retired_handlers == {}
+
+
+def test_camera_detected_again_waits_for_old_handler(mocker):
+    cameras_menager = CamerasMenagerMock()
+    camera = VmbCameraMock("camera_foo")
+    cameras_menager._on_camera_detected(camera)
+    handler = cameras_menager._cameras_handlers["camera_foo"]
+    mocker.patch.object(handler, "isRunning", return_value=True)
+
+    cameras_menager._on_camera_missing(camera)
+    cameras_menager._on_camera_detected(camera)
+    assert cameras_menager._cameras_handlers == {}
+
+    handler.isRunning.return_value = False
+    cameras_menager._remove_finished_handlers()
+
+    new_handler = cameras_menager._cameras_handlers["camera_foo"]
+    assert new_handler is not handler
+
+
 # def test_start_cameras() -> None:
 #     cameras_menager = CamerasMenagerMock()
 #     vmb = cameras_menager._get_vmb_instance()
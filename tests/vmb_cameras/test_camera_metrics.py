@@ -0,0 +1,87 @@
+import pytest
+
+from src.cameras.camera_metrics import CameraMetrics, ClockOffset, LatencyHistogram
+
+MS = 1_000_000
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for value_ms in range(1, 101):
+        histogram.record(value_ms * MS)
+
+    # relative precision of the buckets is 12.5%
+    assert histogram.percentile(50) == pytest.approx(50, rel=0.125)
+    assert histogram.percentile(99) == pytest.approx(99, rel=0.125)
+    assert histogram.percentile(100) == pytest.approx(100, rel=0.125)
+    assert histogram.summary()["max"] == 100
+    assert histogram.summary()["mean"] == pytest.approx(50.5)
+
+
+def test_histogram_edge_values():
+    histogram = LatencyHistogram()
+
+    assert histogram.percentile(50) == 0.0
+    histogram.record(-5)
+    histogram.record(10**16)  # out of range values go to the last bucket
+
+    assert histogram.count == 2
+    assert histogram.percentile(1) == 0.0
+
+
+def test_bucket_lower_bounds():
+    for value_us in (0, 7, 8, 15, 16, 1000, 123_456):
+        bucket = LatencyHistogram._bucket(value_us)
+        lower = LatencyHistogram._bucket_value(bucket)
+
+        assert lower <= value_us < lower * 1.125 + 1
+
+
+def test_clock_offset_minimum():
+    clock = ClockOffset()
+    assert clock.to_host(0) is None
+
+    for camera_ns, transfer_ns in [(0, 5), (100, 2), (200, 9)]:
+        clock.update(camera_ns, 1000 + camera_ns + transfer_ns)
+
+    assert clock.to_host(300) == 1302
+
+
+def test_clock_offset_follows_drift(monkeypatch):
+    monkeypatch.setattr(ClockOffset, "WINDOW", 2)
+    clock = ClockOffset()
+
+    clock.update(0, 1000)
+    clock.update(0, 1010)  # window restarted from the window minimum
+    clock.update(0, 1050)
+    clock.update(0, 1060)
+
+    assert clock.to_host(0) == 1050
+
+
+def test_metrics_counters_and_latency():
+    metrics = CameraMetrics("CAM1")
+
+    metrics.frame_received(0, 1000 * MS)
+    metrics.count("dropped_queue")
+    metrics.count("dropped_queue")
+    metrics.queue_depth(2)
+    metrics.record_latency("exposure_to_display", 0, 1030 * MS)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["camera_id"] == "CAM1"
+    assert snapshot["frames_received"] == 1
+    assert snapshot["dropped_queue"] == 2
+    assert snapshot["queue_depth_max"] == 2
+    assert snapshot["exposure_to_display"]["p50"] == pytest.approx(30, rel=0.125)
+    assert "dropped 2" in metrics.status_text()
+
+
+def test_metrics_fps():
+    metrics = CameraMetrics("CAM1")
+    start = metrics._fps_window_start
+
+    for frame in range(11):
+        metrics.frame_received(frame * 100 * MS, start + frame * 100 * MS)
+
+    assert metrics.counters.fps == pytest.approx(11)
@@ -0,0 +1,99 @@
+import time
+import pytest
+
+from src.cameras.camera_metrics import CameraMetrics
+from src.cameras.frame_dispatch import (
+    FrameQueue,
+    HandlerDispatcher,
+    QueueConfig,
+    QueuePolicy,
+)
+
+
+def test_queue_drop_oldest():
+    queue = FrameQueue(QueueConfig(2, QueuePolicy.DROP_OLDEST))
+
+    assert queue.put(1) is None
+    assert queue.put(2) is None
+    assert queue.put(3) == 1
+    assert [queue.get(0), queue.get(0)] == [2, 3]
+
+
+def test_queue_drop_newest():
+    queue = FrameQueue(QueueConfig(2, QueuePolicy.DROP_NEWEST))
+
+    queue.put(1)
+    queue.put(2)
+    assert queue.put(3) == 3
+    assert [queue.get(0), queue.get(0)] == [1, 2]
+
+
+@pytest.mark.parametrize("policy", list(QueuePolicy))
+def test_queue_put_does_not_wait(policy):
+    queue = FrameQueue(QueueConfig(1, policy))
+    queue.put(1)
+
+    start = time.monotonic()
+    assert queue.put(2) is not None
+    assert time.monotonic() - start < 0.05
+
+
+def test_queue_closed():
+    queue = FrameQueue(QueueConfig(2))
+    queue.put(1)
+    queue.close()
+
+    assert queue.put(2) == 2
+    assert queue.get() == 1
+    assert queue.get() is None
+
+
+def test_queue_invalid_depth():
+    with pytest.raises(ValueError):
+        FrameQueue(QueueConfig(0))
+
+
+def test_dispatcher_passes_frames_in_order(mocker):
+    frame_handler = mocker.Mock(QUEUE=QueueConfig(8, QueuePolicy.DROP_NEWEST))
+    dispatcher = HandlerDispatcher(frame_handler, "test")
+
+    dispatcher.start()
+    for frame in range(5):
+        dispatcher.put(frame, None)
+    dispatcher.stop()
+
+    frames = [call.args[0] for call in frame_handler.add_frame.mock_calls]
+    assert frames == list(range(5))
+
+
+def test_dispatcher_releases_dropped_frames(mocker):
+    frame_handler = mocker.Mock(QUEUE=QueueConfig(1, QueuePolicy.DROP_OLDEST))
+    metrics = CameraMetrics("CAM1")
+    dispatcher = HandlerDispatcher(frame_handler, "test", metrics)
+    pooled_frames = [mocker.Mock() for _ in range(3)]
+
+    # not started, so the frames stay in the queue
+    for pooled_frame in pooled_frames:
+        dispatcher.put(pooled_frame.data, None, pooled_frame)
+    dispatcher.stop()
+
+    for pooled_frame in pooled_frames:
+        pooled_frame.retain.assert_called_once()
+        pooled_frame.release.assert_called_once()
+    assert metrics.counters.dropped_handler == 2
+    frame_handler.add_frame.assert_not_called()
+
+
+def test_dispatcher_survives_handler_error(mocker):
+    frame_handler = mocker.Mock(QUEUE=QueueConfig(4, QueuePolicy.DROP_NEWEST))
+    frame_handler.add_frame.side_effect = [RuntimeError("failed"), None]
+    pooled_frame = mocker.Mock()
+    dispatcher = HandlerDispatcher(frame_handler, "test")
+
+    dispatcher.start()
+    dispatcher.put(0, None, pooled_frame)
+    dispatcher.put(1, None, pooled_frame)
+    dispatcher.stop()
+
+    assert frame_handler.add_frame.call_count == 2
+    assert pooled_frame.release.call_count == 2
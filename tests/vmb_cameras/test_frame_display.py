@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from src.cameras.frame_handlers import FrameDisplay, FrameDisplayFormats
+
+
+@pytest.fixture
+def display():
+    display = FrameDisplay("CAM1", image_format=FrameDisplayFormats.BGR)
+    display.window.show()
+    display._on_window_size_changed(300, 200)
+    yield display
+    display.window.hide()
+
+
+def frame(value: int = 0) -> np.ndarray:
+    return np.full((1936, 1216, 3), value, dtype=np.uint8)
+
+
+def test_frame_downscaled_to_window(display, qapp):
+    display.add_frame(frame())
+    qapp.processEvents()
+
+    # 1216x1936 fitted to 300x200 keeping the aspect ratio
+    assert display.window.frame.shape == (200, 126, 3)
+    assert display._pending_frame is None
+
+
+def test_small_frame_not_upscaled(display, qapp):
+    small = np.zeros((100, 50, 3), np.uint8)
+
+    display.add_frame(small)
+    qapp.processEvents()
+
+    assert display.window.frame is small
+
+
+def test_preview_rate_limited(display, qapp):
+    display.add_frame(frame(1))
+    display.add_frame(frame(2))  # within the preview interval, dropped
+    qapp.processEvents()
+
+    assert display.window.frame[0, 0, 0] == 1
+
+
+def test_stale_frame_replaced(display, qapp):
+    display._frame_interval_s = 0
+
+    display.add_frame(frame(1))
+    display.add_frame(frame(2))
+    qapp.processEvents()
+
+    assert display.window.frame[0, 0, 0] == 2
+
+
+def test_frames_ignored_when_closed(display, qapp):
+    display.window.hide()
+
+    display.add_frame(frame(1))
+    qapp.processEvents()
+
+    assert display._pending_frame is None
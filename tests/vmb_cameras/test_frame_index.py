@@ -0,0 +1,79 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from src.cameras.frame_index import (
+    FrameIndex,
+    FrameIndexWriter,
+    DATETIME_FORMAT,
+)
+
+START_NS = 1_700_000_000_000_000_000
+FRAME_INTERVAL_NS = 100_000_000  # 10 fps
+
+
+@pytest.fixture
+def index(tmp_path) -> FrameIndex:
+    path = str(tmp_path / "video.csv")
+    writer = FrameIndexWriter(path)
+    # frame 3 was lost before the encoder
+    for file_frame, frame_id in enumerate([0, 1, 2, 4, 5]):
+        time_ns = frame_id * FRAME_INTERVAL_NS
+        writer.write(file_frame, frame_id, time_ns, time_ns, START_NS + time_ns)
+    writer.close()
+
+    return FrameIndex.from_file(path)
+
+
+def test_load_index(index):
+    assert len(index) == 5
+    assert list(index.frame_ids) == [0, 1, 2, 4, 5]
+    assert index.wall_times[0] == pytest.approx(START_NS / 1e9, abs=1e-6)
+
+
+def test_frame_at_nearest(index):
+    start = START_NS / 1e9
+
+    assert index.frame_at(start - 10) == 0
+    assert index.frame_at(start + 0.14) == 1
+    assert index.frame_at(start + 0.36) == 3  # frame id 4
+    assert index.frame_at(start + 10) == 4
+
+
+def test_frame_at_telemetry_datetime(index):
+    text = datetime.fromtimestamp(START_NS / 1e9 + 0.2).strftime(DATETIME_FORMAT)
+
+    assert index.frame_at(text) == 2
+
+
+def test_frame_at_monotonic(index):
+    assert index.frame_at_monotonic(4 * FRAME_INTERVAL_NS + 1) == 3
+
+
+def test_frames_between(index):
+    start = START_NS / 1e9
+
+    np.testing.assert_array_equal(
+        index.frames_between(start + 0.1, start + 0.4), [1, 2, 3]
+    )
+
+
+def test_time_of(index):
+    assert index.time_of(3) == pytest.approx(START_NS / 1e9 + 0.4, abs=1e-6)
+
+    with pytest.raises(IndexError):
+        index.time_of(10)
+
+
+def test_rates(index):
+    assert index.capture_fps == pytest.approx(8.0)
+    assert index.missing_frames == 1
+
+
+def test_invalid_file(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("datetime;pressure\n")
+
+    with pytest.raises(ValueError):
+        FrameIndex.from_file(str(path))
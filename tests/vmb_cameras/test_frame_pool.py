@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from src.cameras.frame_pool import FramePool
+
+SHAPE = (4, 6, 1)
+
+
+@pytest.fixture
+def pool():
+    return FramePool(2)
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        FramePool(0)
+
+
+def test_acquire_preallocated_buffers(pool):
+    frame1 = pool.acquire(SHAPE)
+    frame2 = pool.acquire(SHAPE)
+
+    assert frame1.data.shape == SHAPE
+    assert frame1.data.dtype == np.uint8
+    assert frame1.data is not frame2.data
+    assert pool.available == 0
+    assert pool.acquire(SHAPE) is None
+
+
+def test_buffer_reused_after_release(pool):
+    frame = pool.acquire(SHAPE)
+    buffer = frame.data
+    frame.release()
+
+    assert pool.available == 2
+    assert any(pool.acquire(SHAPE).data is buffer for _ in range(2))
+
+
+def test_reference_counting(pool):
+    frame = pool.acquire(SHAPE)
+    frame.retain()
+
+    frame.release()
+    assert pool.available == 1
+
+    frame.release()
+    assert pool.available == 2
+
+    with pytest.raises(RuntimeError):
+        frame.release()
+
+
+def test_shape_change_reallocates(pool):
+    old_frame = pool.acquire(SHAPE)
+    new_frame = pool.acquire((2, 2, 1))
+
+    assert new_frame.data.shape == (2, 2, 1)
+    assert pool.available == 1
+
+    # buffer with the old shape is not returned to the pool
+    old_frame.release()
+    assert pool.available == 1
@@ -0,0 +1,182 @@
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import numpy as np
+import pytest
+from vmbpy import PixelFormat
+
+from src.cameras.frame_pool import FrameInfo, FramePool
+from src.cameras.frame_processing import (
+    CameraOffload,
+    ColorMode,
+    FrameProcessor,
+    ProcessingConfig,
+)
+
+HEIGHT = 4
+WIDTH = 6
+
+
+def pooled_frame(pool: FramePool, data: np.ndarray, pixel_format: PixelFormat):
+    frame = pool.acquire(data.shape)
+    np.copyto(frame.data, data)
+    frame.info = FrameInfo("Camera1", 0, 0, 0, pixel_format)
+    return frame
+
+
+@pytest.fixture
+def pool():
+    return FramePool(1)
+
+
+@pytest.fixture
+def bayer():
+    return np.random.randint(0, 255, (HEIGHT, WIDTH, 1), np.uint8)
+
+
+@pytest.mark.parametrize(
+    "color, code",
+    [
+        (ColorMode.RGB, cv2.COLOR_BayerRGGB2RGB),
+        (ColorMode.BGR, cv2.COLOR_BayerRGGB2BGR),
+        (ColorMode.GRAY, cv2.COLOR_BayerRGGB2GRAY),
+    ],
+)
+def test_debayer(pool, bayer, color, code):
+    processor = FrameProcessor(ProcessingConfig(color, rotate=None))
+
+    frame = processor.process(pooled_frame(pool, bayer, PixelFormat.BayerRG8))
+
+    assert np.array_equal(frame, cv2.cvtColor(bayer, code))
+    assert pool.available == 1
+
+
+def test_rotate_and_downscale(pool):
+    data = np.zeros((HEIGHT * 2, WIDTH * 2, 3), np.uint8)
+    config = ProcessingConfig(ColorMode.RGB, cv2.ROTATE_90_COUNTERCLOCKWISE, 0.5)
+    processor = FrameProcessor(config)
+
+    frame = processor.process(pooled_frame(pool, data, PixelFormat.Rgb8))
+
+    assert frame.shape == (WIDTH, HEIGHT, 3)
+
+
+def test_no_conversion_copies_the_buffer(pool):
+    data = np.ones((HEIGHT, WIDTH, 1), np.uint8)
+    processor = FrameProcessor(ProcessingConfig(ColorMode.GRAY, rotate=None))
+    raw = pooled_frame(pool, data, PixelFormat.Mono8)
+    buffer = raw.data
+
+    frame = processor.process(raw)
+
+    assert frame.shape == (HEIGHT, WIDTH)
+    assert not np.shares_memory(frame, buffer)
+
+
+def test_unsupported_pixel_format(pool, bayer):
+    processor = FrameProcessor()
+
+    with pytest.raises(ValueError):
+        processor.process(pooled_frame(pool, bayer, PixelFormat.Mono12))
+
+    assert pool.available == 1
+
+
+def test_submit(pool, bayer):
+    processor = FrameProcessor()
+
+    future = processor.submit(pooled_frame(pool, bayer, PixelFormat.BayerRG8))
+
+    assert future.result().shape == (WIDTH, HEIGHT, 3)
+
+
+def sequential(data: np.ndarray, config: ProcessingConfig) -> np.ndarray:
+    """Reference implementation, each step applied separately"""
+    if config.crop:
+        x, y, width, height = config.crop
+        data = data[y : y + height, x : x + width]
+    if config.flip is not None:
+        data = cv2.flip(data, config.flip)
+    if config.rotate is not None:
+        data = cv2.rotate(data, config.rotate)
+    return data
+
+
+@pytest.mark.parametrize("flip", [None, 0, 1, -1])
+@pytest.mark.parametrize(
+    "rotate",
+    [None, cv2.ROTATE_90_CLOCKWISE, cv2.ROTATE_180, cv2.ROTATE_90_COUNTERCLOCKWISE],
+)
+@pytest.mark.parametrize("reverse_x, reverse_y", [(False, False), (True, True)])
+def test_fused_orientation(pool, flip, rotate, reverse_x, reverse_y):
+    data = np.arange(HEIGHT * WIDTH * 3, dtype=np.uint8).reshape(HEIGHT, WIDTH, 3)
+    config = ProcessingConfig(ColorMode.RGB, rotate, flip=flip, crop=(2, 0, 4, 2))
+    offload = CameraOffload(reverse_x, reverse_y)
+
+    # camera reversed the frame before the callback
+    received = data
+    if reverse_x:
+        received = cv2.flip(received, 1)
+    if reverse_y:
+        received = cv2.flip(received, 0)
+
+    processor = FrameProcessor(config, offload)
+    frame = processor.process(pooled_frame(pool, received, PixelFormat.Rgb8))
+
+    # result does not depend on the steps done by the camera
+    assert np.array_equal(frame, sequential(data, config))
+
+
+def test_crop_is_done_on_the_raw_frame(pool, bayer):
+    config = ProcessingConfig(ColorMode.BGR, rotate=None, crop=(2, 0, 4, 2))
+    processor = FrameProcessor(config)
+
+    frame = processor.process(pooled_frame(pool, bayer, PixelFormat.BayerRG8))
+
+    expected = cv2.cvtColor(bayer[0:2, 2:6].copy(), cv2.COLOR_BayerRGGB2BGR)
+    assert np.array_equal(frame, expected)
+
+
+def test_crop_skipped_with_camera_roi(pool, bayer):
+    config = ProcessingConfig(ColorMode.GRAY, rotate=None, crop=(2, 0, 4, 2))
+    processor = FrameProcessor(config, CameraOffload(roi=True))
+
+    frame = processor.process(pooled_frame(pool, bayer, PixelFormat.BayerRG8))
+
+    assert frame.shape == (HEIGHT, WIDTH)
+
+
+def test_resize_output_size(pool):
+    data = np.zeros((HEIGHT * 10, WIDTH * 10, 3), np.uint8)
+    config = ProcessingConfig(
+        ColorMode.RGB, cv2.ROTATE_90_CLOCKWISE, resize=(HEIGHT, WIDTH)
+    )
+    processor = FrameProcessor(config)
+
+    frame = processor.process(pooled_frame(pool, data, PixelFormat.Rgb8))
+
+    assert frame.shape == (WIDTH, HEIGHT, 3)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"flip": 2},
+        {"rotate": 7},
+        {"downscale": 0},
+        {"downscale": 0.5, "resize": (10, 10)},
+        {"crop": (1, 0, 4, 2)},
+    ],
+)
+def test_invalid_config(kwargs):
+    with pytest.raises(ValueError):
+        ProcessingConfig(**kwargs)
+
+
+def test_shared_executor_created_once(mocker):
+    mocker.patch.object(FrameProcessor, "_executor", None)
+
+    with ThreadPoolExecutor(8) as pool:
+        executors = set(pool.map(lambda _: FrameProcessor.executor(), range(32)))
+
+    assert len(executors) == 1
+    executors.pop().shutdown()
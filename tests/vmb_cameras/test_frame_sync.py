@@ -0,0 +1,154 @@
+import time
+import weakref
+import numpy as np
+import pytest
+from vmbpy import PixelFormat
+
+from src.cameras.frame_handlers import FrameSyncGroup
+from src.cameras.frame_pool import FrameInfo
+
+TILE_SIZE = (8, 12)
+TOLERANCE_MS = 5
+MS = 1_000_000
+START_NS = time.monotonic_ns()
+
+
+@pytest.fixture
+def display(mocker):
+    display = mocker.Mock(is_running=False)
+    display.start.side_effect = lambda: setattr(display, "is_running", True)
+    display.stop.side_effect = lambda: setattr(display, "is_running", False)
+    return display
+
+
+@pytest.fixture
+def group(display):
+    return FrameSyncGroup(
+        "MOSAIC", ["CAM1", "CAM2", "CAM3"], TILE_SIZE, TOLERANCE_MS, display
+    )
+
+
+def frame(value: int) -> np.ndarray:
+    return np.full((24, 16, 3), value, np.uint8)
+
+
+def info(time_ms: float) -> FrameInfo:
+    receive_time_ns = START_NS + int(time_ms * MS)
+    return FrameInfo("CAM", 0, 0, receive_time_ns, PixelFormat.BayerRG8)
+
+
+def mosaics(display) -> list[np.ndarray]:
+    return [call.args[0].copy() for call in display.add_frame.mock_calls]
+
+
+def test_taps_follow_the_group(group, mocker):
+    started = mocker.Mock()
+    group.taps[0].started.connect(started)
+
+    assert group.taps[0].is_running is False
+    group.start()
+    assert group.taps[0].is_running is True
+    started.assert_called_once()
+
+    group.stop()
+    assert group.taps[0].is_running is False
+
+
+def test_mosaic_layout(group, display):
+    group.start()
+    group.taps[0].add_frame(frame(10), info(0))
+    group.taps[1].add_frame(frame(20), info(1))
+    group.taps[2].add_frame(frame(30), info(2))
+
+    (mosaic,) = mosaics(display)
+    assert group.mosaic_size == (16, 24)
+    assert mosaic.shape == (24, 16, 3)
+    # frames are downscaled to 8x12 tiles, in rows of 2
+    assert mosaic[0, 0, 0] == 10
+    assert mosaic[0, 8, 0] == 20
+    assert mosaic[12, 0, 0] == 30
+    assert mosaic[12, 8, 0] == 0  # empty tile
+    assert display.add_frame.call_args.args[1].camera_id == "MOSAIC"
+
+
+def test_frames_out_of_tolerance_not_grouped(group, display):
+    group.start()
+    group.taps[0].add_frame(frame(10), info(0))
+    group.taps[1].add_frame(frame(20), info(1))
+    group.taps[2].add_frame(frame(30), info(20))
+
+    assert mosaics(display) == []
+
+    group.taps[0].add_frame(frame(11), info(21))
+    group.taps[1].add_frame(frame(21), info(22))
+
+    (mosaic,) = mosaics(display)
+    assert mosaic[0, 0, 0] == 11
+    assert mosaic[0, 8, 0] == 21
+
+
+def test_stale_camera_not_waited_for(group, display):
+    group.start()
+    group.taps[0].add_frame(frame(10), info(0))
+
+    for time_ms in (2000, 2100):
+        group.taps[1].add_frame(frame(20), info(time_ms))
+        group.taps[2].add_frame(frame(30), info(time_ms + 1))
+
+    frames = mosaics(display)
+    assert len(frames) == 2
+    assert frames[-1][0, 0, 0] == 0
+
+
+def test_writer_gets_the_mosaic(group, display, mocker):
+    writer = mocker.Mock(is_running=False)
+    writer.start.side_effect = lambda: setattr(writer, "is_running", True)
+    group.set_writer(writer)
+
+    group.start_recording()
+    assert group.is_running is True
+    for index in range(3):
+        group.taps[index].add_frame(frame(index), info(index))
+
+    writer.add_frame.assert_called_once()
+    display.add_frame.assert_not_called()
+
+
+def test_outputs_called_without_the_mutex(group, display):
+    def add_frame(mosaic, mosaic_info):
+        assert group._mutex.tryLock()
+        group._mutex.unlock()
+
+    display.add_frame.side_effect = add_frame
+    group.start()
+    for index in range(3):
+        group.taps[index].add_frame(frame(10), info(index))
+
+    display.add_frame.assert_called_once()
+
+
+def test_held_mosaic_not_reused(group, display):
+    shown = []
+    display.add_frame.side_effect = lambda mosaic, mosaic_info: shown.append(mosaic)
+    group.start()
+
+    for value in range(1, FrameSyncGroup.MOSAIC_BUFFERS + 3):
+        for index in range(3):
+            group.taps[index].add_frame(frame(value), info(value * 100 + index))
+
+    # the display keeps every mosaic, none of them was overwritten
+    assert [mosaic[0, 0, 0] for mosaic in shown] == list(
+        range(1, FrameSyncGroup.MOSAIC_BUFFERS + 3)
+    )
+
+
+def test_released_mosaic_reused(group, display):
+    group.start()
+    display.add_frame = lambda mosaic, mosaic_info: None  # no call history
+    buffers = [weakref.ref(buffer) for buffer in group._mosaics]
+
+    for value in range(1, FrameSyncGroup.MOSAIC_BUFFERS + 3):
+        for index in range(3):
+            group.taps[index].add_frame(frame(value), info(value * 100 + index))
+
+    assert all(ref() is buffer for ref, buffer in zip(buffers, group._mosaics))
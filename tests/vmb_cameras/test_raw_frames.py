@@ -0,0 +1,164 @@
+import os
+import cv2
+import numpy as np
+import pytest
+from vmbpy import PixelFormat
+
+from src.cameras.frame_handlers import RawFrameWriter
+from src.cameras.frame_pool import FrameInfo
+from src.cameras.frame_index import FrameIndex, index_path
+from src.cameras.frame_processing import CameraOffload, ColorMode, ProcessingConfig
+from src.cameras.raw_frames import (
+    RawChunkWriter,
+    read_raw_chunk,
+    encode_raw_recording,
+)
+
+HEIGHT = 16
+WIDTH = 24
+
+
+def raw_frame(frame_id: int) -> np.ndarray:
+    return np.full((HEIGHT, WIDTH, 1), frame_id, dtype=np.uint8)
+
+
+def frame_info(frame_id: int, period_ns: int = 1000) -> FrameInfo:
+    return FrameInfo(
+        "CAM1",
+        frame_id,
+        frame_id * period_ns,
+        frame_id * 10,
+        PixelFormat.BayerRG8,
+        1_700_000_000_000_000_000 + frame_id,
+    )
+
+
+def test_chunk_roundtrip(tmp_path):
+    path = str(tmp_path / "chunk.raw")
+    writer = RawChunkWriter(path, (HEIGHT, WIDTH, 1), 4, "BayerRG8", "CAM1")
+
+    for frame_id in range(3):
+        writer.append(raw_frame(frame_id), frame_info(frame_id))
+
+    # the frame count is readable before the chunk is closed
+    header, records = read_raw_chunk(path)
+    assert header.frame_count == 3
+    writer.close()
+
+    header, records = read_raw_chunk(path)
+    assert (header.width, header.height, header.channels) == (WIDTH, HEIGHT, 1)
+    assert header.pixel_format == "BayerRG8"
+    assert header.camera_id == "CAM1"
+    assert list(records["frame_id"]) == [0, 1, 2]
+    assert list(records["timestamp"]) == [0, 1000, 2000]
+    assert records["camera_id"][1] == b"CAM1"
+    np.testing.assert_array_equal(records["frame"][2], raw_frame(2))
+
+
+def test_chunk_full(tmp_path):
+    writer = RawChunkWriter(str(tmp_path / "chunk.raw"), (HEIGHT, WIDTH, 1), 1, "", "")
+    writer.append(raw_frame(0), frame_info(0))
+
+    assert writer.is_full
+    with pytest.raises(RuntimeError):
+        writer.append(raw_frame(1), frame_info(1))
+
+
+def test_raw_frame_writer_chunks(tmp_path):
+    writer = RawFrameWriter("CAM1", str(tmp_path), frames_per_chunk=2)
+    writer.start()
+    recording_dir = writer.recording_dir
+
+    for frame_id in range(5):
+        writer.add_frame(raw_frame(frame_id), frame_info(frame_id))
+    writer.stop()
+
+    chunks = sorted(os.listdir(recording_dir))
+    assert chunks == ["chunk_00000.raw", "chunk_00001.raw", "chunk_00002.raw"]
+    header, records = read_raw_chunk(os.path.join(recording_dir, chunks[-1]))
+    assert header.frame_count == 1
+    assert records["frame_id"][0] == 4
+
+
+def test_chunk_stores_processing(tmp_path):
+    path = str(tmp_path / "chunk.raw")
+    processing = ProcessingConfig(
+        ColorMode.GRAY, None, 1.0, 0, (2, 4, 8, 6), (4, 3), False
+    )
+    offload = CameraOffload(reverse_x=True, roi=True)
+    RawChunkWriter(path, (HEIGHT, WIDTH, 1), 1, "BayerRG8", "CAM1", processing, offload)
+
+    header, _ = read_raw_chunk(path)
+
+    assert header.processing == processing
+    assert header.offload == offload
+
+
+def test_chunk_preallocated(tmp_path):
+    path = str(tmp_path / "chunk.raw")
+    writer = RawChunkWriter(path, (HEIGHT, WIDTH, 1), 8, "BayerRG8", "CAM1")
+    writer.close()
+
+    stat = os.stat(path)
+    if hasattr(os, "posix_fallocate"):
+        assert stat.st_blocks * 512 >= stat.st_size
+
+
+def record(tmp_path, frames: int, period_ns: int = 100_000_000, **kwargs) -> str:
+    writer = RawFrameWriter("CAM1", str(tmp_path), frames_per_chunk=3)
+    writer.set_processing(
+        kwargs.get("processing", ProcessingConfig()),
+        kwargs.get("offload", CameraOffload()),
+    )
+    writer.start()
+    recording_dir = writer.recording_dir
+
+    for frame_id in range(frames):
+        frame = kwargs.get("frame", raw_frame(frame_id))
+        writer.add_frame(frame, frame_info(frame_id, period_ns))
+    writer.stop()
+
+    return recording_dir
+
+
+def test_encode_raw_recording(tmp_path):
+    processing = ProcessingConfig(ColorMode.BGR, cv2.ROTATE_90_COUNTERCLOCKWISE)
+    recording_dir = record(tmp_path, 4, processing=processing)
+
+    # the chunks are concatenated, the fps is from the camera timestamps
+    videos = encode_raw_recording(recording_dir)
+
+    assert len(videos) == 1
+    capture = cv2.VideoCapture(videos[0])
+    assert int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) == 4
+    assert int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)) == HEIGHT
+    assert capture.get(cv2.CAP_PROP_FPS) == pytest.approx(10)
+    capture.release()
+    index = FrameIndex.from_file(index_path(videos[0]))
+    assert list(index.file_frames) == [0, 1, 2, 3]
+    assert list(index.frame_ids) == [0, 1, 2, 3]
+    assert list(index.host_monotonic_ns) == [0, 10, 20, 30]
+
+
+def test_encode_uses_camera_offload(tmp_path):
+    # left half dark, the camera already reversed the frame
+    frame = np.zeros((HEIGHT, WIDTH, 1), np.uint8)
+    frame[:, WIDTH // 2 :] = 255
+    processing = ProcessingConfig(ColorMode.GRAY, None, flip=1)
+    recording_dir = record(
+        tmp_path,
+        2,
+        processing=processing,
+        offload=CameraOffload(reverse_x=True),
+        frame=frame,
+    )
+
+    videos = encode_raw_recording(recording_dir)
+
+    capture = cv2.VideoCapture(videos[0])
+    _, video_frame = capture.read()
+    capture.release()
+    gray = video_frame[..., 0].astype(int)
+    # not flipped again
+    assert gray[:, : WIDTH // 2 - 2].mean() < 64
+    assert gray[:, WIDTH // 2 + 2 :].mean() > 192
@@ -0,0 +1,168 @@
+import time
+import pytest
+from vmbpy import CameraEvent, FrameStatus, PixelFormat
+
+from src.cameras import CamerasManager
+from src.cameras.camera_handler import CameraHandler
+from src.cameras.frame_dispatch import QueueConfig, QueuePolicy
+from src.cameras.synthetic_vmb import SyntheticConfig, SyntheticVmbSystem
+
+WIDTH = 64
+HEIGHT = 48
+
+
+@pytest.fixture
+def config():
+    return SyntheticConfig(["CAM1", "CAM2"], WIDTH, HEIGHT, fps=200)
+
+
+def wait_until(condition, timeout_s: float = 5) -> bool:
+    end = time.monotonic() + timeout_s
+    while not condition() and time.monotonic() < end:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_config_from_spec():
+    config = SyntheticConfig.from_spec("camera_ids=A,B fps=60 incomplete_rate=0.5")
+
+    assert config.camera_ids == ["A", "B"]
+    assert config.fps == 60.0
+    assert config.incomplete_rate == 0.5
+    with pytest.raises(ValueError):
+        SyntheticConfig.from_spec("unknown=1")
+
+
+def test_camera_streams_bayer_frames(config):
+    camera = SyntheticVmbSystem(config).get_all_cameras()[0]
+    frames = []
+
+    def on_frame(cam, stream, frame):
+        frames.append((frame.get_id(), frame.as_numpy_ndarray().copy()))
+        cam.queue_frame(frame)
+
+    camera.start_streaming(on_frame)
+    assert wait_until(lambda: len(frames) >= 3)
+    camera.stop_streaming()
+
+    frame_id, data = frames[0]
+    assert data.shape == (HEIGHT, WIDTH, 1)
+    assert [frame[0] for frame in frames[:3]] == [0, 1, 2]
+    assert (frames[1][1] != data).any()
+
+
+def test_frames_lost_without_queued_buffers(config):
+    config.buffer_count = 2
+    camera = SyntheticVmbSystem(config).get_all_cameras()[0]
+    frames = []
+
+    camera.start_streaming(lambda cam, stream, frame: frames.append(frame))
+    assert wait_until(lambda: camera.frames_lost > 0)
+    camera.stop_streaming()
+
+    assert len(frames) == 2
+
+
+def test_incomplete_frames(config):
+    config.incomplete_rate = 1.0
+    camera = SyntheticVmbSystem(config).get_all_cameras()[0]
+    statuses = []
+
+    def on_frame(cam, stream, frame):
+        statuses.append(frame.get_status())
+        cam.queue_frame(frame)
+
+    camera.start_streaming(on_frame)
+    assert wait_until(lambda: len(statuses) >= 2)
+    camera.stop_streaming()
+
+    assert set(statuses) == {FrameStatus.Incomplete}
+
+
+def test_features_change_the_frames(config):
+    camera = SyntheticVmbSystem(config).get_all_cameras()[0]
+    camera.get_feature_by_name("BinningHorizontal").set(2)
+    camera.get_feature_by_name("PixelFormat").set(PixelFormat.Mono8.name)
+    frames = []
+
+    def on_frame(cam, stream, frame):
+        frames.append(frame)
+
+    camera.start_streaming(on_frame, buffer_count=1)
+    assert wait_until(lambda: frames)
+    camera.stop_streaming()
+
+    assert frames[0].as_numpy_ndarray().shape == (HEIGHT // 2, WIDTH // 2, 1)
+    assert frames[0].get_pixel_format() == PixelFormat.Mono8
+
+
+def test_hotplug_events(config, mocker):
+    vmb = SyntheticVmbSystem(config)
+    handler = mocker.Mock()
+    vmb.register_camera_change_handler(handler)
+
+    vmb.unplug("CAM1")
+    assert [camera.get_id() for camera in vmb.get_all_cameras()] == ["CAM2"]
+    vmb.plug("CAM1")
+
+    events = [call.args[1] for call in handler.mock_calls]
+    assert events == [CameraEvent.Missing, CameraEvent.Detected]
+
+
+def test_manager_uses_synthetic_cameras(monkeypatch):
+    monkeypatch.setenv(CamerasManager.SYNTHETIC_CAMERAS_ENV, "camera_ids=CAM1")
+
+    vmb = CamerasManager()._get_vmb_instance()
+
+    assert isinstance(vmb, SyntheticVmbSystem)
+    assert vmb.get_all_cameras()[0].get_id() == "CAM1"
+
+
+def test_camera_handler_pipeline(config, mocker):
+    camera = SyntheticVmbSystem(config).get_all_cameras()[0]
+    handler = CameraHandler(camera)
+    frame_handler = mocker.Mock(
+        RAW_FRAMES=False, QUEUE=QueueConfig(8, QueuePolicy.DROP_NEWEST)
+    )
+    handler.register_frame_handler(frame_handler)
+
+    handler.start()
+    handler.start_streaming()
+    assert wait_until(lambda: frame_handler.add_frame.call_count >= 5)
+    handler.quit()
+
+    frame, info = frame_handler.add_frame.call_args.args
+    assert frame.shape == (WIDTH, HEIGHT, 3)  # debayered and rotated
+    assert info.camera_id == "CAM1"
+    assert handler.metrics.counters.frames_received >= 5
+
+
+def test_unplugged_camera_does_not_stall_others(config, mocker, qapp):
+    vmb = SyntheticVmbSystem(config)
+    manager = CamerasManager()
+    mocker.patch.object(manager, "_get_vmb_instance", return_value=vmb)
+    frame_handler = mocker.Mock(
+        RAW_FRAMES=False, QUEUE=QueueConfig(8, QueuePolicy.DROP_OLDEST)
+    )
+
+    removed = []
+    manager.camera_removed.connect(removed.append)
+
+    manager.start()
+    assert wait_until(lambda: len(manager._cameras_handlers) == 2)
+    handlers = dict(manager._cameras_handlers)
+    handlers["CAM2"].register_frame_handler(frame_handler)
+    for handler in handlers.values():
+        handler.start()
+        handler.start_streaming()
+
+    vmb.unplug("CAM1")
+    # camera_removed is queued to the GUI thread
+    assert wait_until(lambda: qapp.processEvents() or removed)
+    assert removed == [handlers["CAM1"]]
+    assert handlers["CAM1"].isRunning() is False
+
+    frames = frame_handler.add_frame.call_count
+    assert wait_until(lambda: frame_handler.add_frame.call_count > frames + 5)
+    manager.quit()
+    handlers["CAM1"].quit()
@@ -0,0 +1,208 @@
+import os
+import time
+import cv2
+import numpy as np
+import pytest
+from multiprocessing.shared_memory import SharedMemory
+
+from src.cameras.video_encoder import FrameRing, VideoEncoder, segment_path
+from src.cameras.frame_index import FrameIndex, index_path
+
+WIDTH = 64
+HEIGHT = 48
+FPS = 10
+
+
+@pytest.fixture
+def encoder():
+    encoder = VideoEncoder("test", (HEIGHT, WIDTH, 3), slot_count=4)
+    yield encoder
+    encoder.shutdown()
+
+
+def wait_for_free_slots(encoder: VideoEncoder, timeout_s: float = 5) -> None:
+    end = time.monotonic() + timeout_s
+    while encoder.back_pressure > 0 and time.monotonic() < end:
+        time.sleep(0.01)
+
+
+def test_not_started(encoder):
+    assert encoder.is_alive is False
+    assert encoder.back_pressure == 0.0
+
+    with pytest.raises(RuntimeError):
+        encoder.open("file.mp4", FPS, (WIDTH, HEIGHT))
+
+
+def test_encode_video(encoder, tmp_path):
+    path = str(tmp_path / "video.mp4")
+    frame = np.full((HEIGHT, WIDTH, 3), 128, np.uint8)
+
+    encoder.start_process()
+    encoder.open(path, FPS, (WIDTH, HEIGHT))
+    for frame_id in range(10):
+        wait_for_free_slots(encoder)
+        row = (frame_id, frame_id * 100, frame_id * 10, time.time_ns())
+        assert encoder.write(frame, row) is True
+    encoder.close()
+    encoder.shutdown()
+
+    assert encoder.frames_sent == 10
+    assert encoder.dropped_frames == 0
+    capture = cv2.VideoCapture(path)
+    assert int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) == 10
+    capture.release()
+    index = FrameIndex.from_file(index_path(path))
+    assert list(index.file_frames) == list(range(10))
+    assert list(index.camera_timestamps_ns) == [i * 100 for i in range(10)]
+
+
+def write_frames(encoder: VideoEncoder, count: int) -> None:
+    frame = np.full((HEIGHT, WIDTH, 3), 128, np.uint8)
+    for frame_id in range(count):
+        wait_for_free_slots(encoder)
+        encoder.write(frame, (frame_id, frame_id * 100, frame_id * 10, 0))
+
+
+def frame_count(path: str) -> int:
+    capture = cv2.VideoCapture(path)
+    count = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    capture.release()
+    return count
+
+
+def test_segmented_video(encoder, tmp_path):
+    path = str(tmp_path / "video.mp4")
+
+    encoder.start_process()
+    encoder.open(path, FPS, (WIDTH, HEIGHT), segment_frames=4)
+    write_frames(encoder, 10)
+    encoder.close()
+    encoder.shutdown()
+
+    assert encoder.frames_written == 10
+    assert [frame_count(segment_path(path, n)) for n in range(3)] == [4, 4, 2]
+    # the segment opened ahead was removed
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        os.path.basename(file)
+        for n in range(3)
+        for file in (segment_path(path, n), index_path(segment_path(path, n)))
+    )
+    index = FrameIndex.from_file(index_path(segment_path(path, 1)))
+    assert list(index.camera_timestamps_ns) == [400, 500, 600, 700]
+
+
+def test_segments_stopped_on_low_disk_space(encoder, tmp_path):
+    path = str(tmp_path / "video.mp4")
+
+    encoder.start_process()
+    encoder.open(path, FPS, (WIDTH, HEIGHT), segment_frames=4, min_free_bytes=2**62)
+    write_frames(encoder, 10)
+    encoder.close()
+    encoder.shutdown()
+
+    assert encoder.frames_written == 4
+    assert frame_count(segment_path(path, 0)) == 4
+    assert not os.path.exists(segment_path(path, 1))
+
+
+def test_frames_dropped_when_slots_are_busy(encoder, tmp_path, mocker):
+    encoder.start_process()
+    encoder.open(str(tmp_path / "video.mp4"), FPS, (WIDTH, HEIGHT))
+    mocker.patch.object(encoder, "_poll")  # slots are not returned
+    frame = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+
+    results = [encoder.write(frame) for _ in range(6)]
+
+    assert results == [True] * 4 + [False] * 2
+    assert encoder.dropped_frames == 2
+
+
+def test_invalid_frame_shape(encoder):
+    with pytest.raises(ValueError):
+        encoder.write(np.zeros((HEIGHT, WIDTH), np.uint8))
+
+
+def test_shutdown_releases_shared_memory(encoder):
+    encoder.start_process()
+    shm_name = encoder._shm.name
+    encoder.shutdown()
+
+    assert encoder.is_alive is False
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=shm_name)
+
+
+def test_frame_ring_limits():
+    frame = np.full((HEIGHT, WIDTH, 3), 128, np.uint8)
+    ring = FrameRing(3, 10**6)
+
+    for frame_id in range(5):
+        ring.push(frame, (frame_id,))
+
+    assert len(ring) == 3
+    decoded, row = ring.pop()
+    assert row == (2,)
+    assert decoded.shape == frame.shape
+    assert np.abs(decoded.astype(int) - 128).max() <= 2
+
+    ring = FrameRing(3, max_bytes=1)
+    ring.push(frame, (0,))
+    ring.push(frame, (1,))
+    assert len(ring) == 1  # the newest frame is kept
+
+
+def test_armed_frames_start_the_video(encoder, tmp_path):
+    path = str(tmp_path / "video.mp4")
+
+    encoder.start_process()
+    encoder.arm(max_frames=4, max_bytes=2**20)
+    write_frames(encoder, 10)  # only the last 4 are kept
+    encoder.open(path, FPS, (WIDTH, HEIGHT))
+    write_frames(encoder, 3)
+    encoder.close()
+    encoder.shutdown()
+
+    assert encoder.frames_written == 7
+    index = FrameIndex.from_file(index_path(path))
+    assert list(index.camera_timestamps_ns) == [600, 700, 800, 900, 0, 100, 200]
+
+
+def test_armed_rgb_frames_converted(tmp_path):
+    path = str(tmp_path / "video.mp4")
+    red = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+    red[..., 0] = 255  # RGB
+    encoder = VideoEncoder("rgb", (HEIGHT, WIDTH, 3), slot_count=4)
+
+    try:
+        encoder.start_process()
+        encoder.arm(4, 2**20, cv2.COLOR_RGB2BGR)
+        for _ in range(2):
+            wait_for_free_slots(encoder)
+            encoder.write(red)
+        encoder.open(path, FPS, (WIDTH, HEIGHT), cv2.COLOR_RGB2BGR)
+        encoder.close()
+    finally:
+        encoder.shutdown()
+
+    assert encoder.frames_written == 2
+    capture = cv2.VideoCapture(path)
+    ok, frame = capture.read()
+    capture.release()
+    assert ok
+    blue, _, red_channel = frame.reshape(-1, 3).mean(axis=0)
+    assert red_channel > 200 and blue < 50
+
+
+def test_write_waits_for_free_slot(encoder, tmp_path):
+    frame = np.zeros((HEIGHT, WIDTH, 3), np.uint8)
+
+    encoder.start_process()
+    encoder.open(str(tmp_path / "video.mp4"), FPS, (WIDTH, HEIGHT))
+    results = [encoder.write(frame, timeout_s=5) for _ in range(20)]
+    encoder.close()
+    encoder.shutdown()
+
+    assert all(results)
+    assert encoder.dropped_frames == 0
+    assert encoder.frames_written == 20
@@ -0,0 +1,70 @@
+import shutil
+import numpy as np
+import pytest
+
+from src.cameras.frame_handlers import VideoWriter
+from src.cameras.frame_processing import ColorMode
+
+FRAME_SIZE = (8, 6)
+
+
+@pytest.fixture
+def writer(tmp_path, mocker):
+    writer = VideoWriter("CAM1", 10, FRAME_SIZE, str(tmp_path), ColorMode.BGR, 60)
+    mocker.patch.object(writer, "_encoder")
+    yield writer
+    writer.shutdown()
+
+
+def test_start_opens_segmented_video(writer):
+    writer.start()
+
+    assert writer.is_running is True
+    path, fps, frame_size, conversion, segment_frames, _ = (
+        writer._encoder.open.call_args.args
+    )
+    assert path.endswith(".mp4")
+    assert (fps, frame_size, conversion, segment_frames) == (10, FRAME_SIZE, None, 600)
+
+
+def test_frames_resized_to_video_size(writer):
+    writer.start()
+    writer.add_frame(np.zeros((12, 16, 3), np.uint8))
+
+    frame = writer._encoder.write.call_args.args[0]
+    assert frame.shape == (6, 8, 3)
+
+
+def test_not_started_without_free_space(writer, mocker):
+    usage = shutil.disk_usage(".")
+    mocker.patch("shutil.disk_usage", return_value=usage._replace(free=0))
+    writer._min_free_bytes = 1
+
+    writer.start()
+
+    assert writer.is_running is False
+    writer._encoder.open.assert_not_called()
+
+
+def test_armed_writer_wants_frames(writer):
+    writer.arm(2, 16)
+
+    assert writer.is_running is False
+    assert writer.wants_frames is True
+    writer._encoder.arm.assert_called_once_with(20, 16 * 2**20, None)
+
+    writer.add_frame(np.zeros((6, 8, 3), np.uint8))
+    writer._encoder.write.assert_called_once()
+
+
+def test_writer_rearmed_after_recording(writer):
+    writer.arm(2, 16)
+    writer.start()
+    writer.stop()
+
+    assert writer._encoder.arm.call_count == 2
+    assert writer.wants_frames is True
+
+    writer.disarm()
+    assert writer.wants_frames is False
+    writer._encoder.disarm.assert_called_once()